@@ -0,0 +1,110 @@
+"""
+Ramificação automática de acerto/erro de golpes.
+
+A chance de acerto vem da precisão do golpe e dos estágios de precisão do atacante e de
+evasão do alvo (tabela 3/3 de stat_stages), em vez de ser digitada em cada transição. O
+ramo de acerto recebe a ação do golpe (ex: o efeito de dano de damage.add_damage_effect)
+e o ramo de erro mantém o estado como está.
+"""
+
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+from stat_stages import hit_fraction
+from state import State, OUTCOME_UNRESOLVED
+from state_tree import StateTree
+from transition import Action
+
+
+# Ação do ramo de acerto: fixa, ou criada a partir do estado de origem
+HitAction = Union[Action, Callable[[State], Action]]
+
+
+class AccuracyRule:
+    """
+    Gera os ramos de acerto e erro de um golpe usado de um slot contra outro.
+
+    Também serve como regra de TreeExpander (ver expander.Rule); para a expansão
+    paralela, hit_action precisa ser uma Action ou uma função de módulo.
+    """
+
+    def __init__(self, attacker_slot: str, target_slot: str, accuracy: int, hit_action: HitAction):
+        """
+        Inicializa a regra.
+
+        Args:
+            attacker_slot: Slot do Pokémon que usa o golpe
+            target_slot: Slot do Pokémon alvo
+            accuracy: Precisão do golpe em percentual (1-100)
+            hit_action: Ação aplicada quando o golpe acerta, ou função (estado) -> ação
+        """
+        if not 1 <= accuracy <= 100:
+            raise ValueError(f"Invalid accuracy: {accuracy}")
+        self.attacker_slot = attacker_slot
+        self.target_slot = target_slot
+        self.accuracy = accuracy
+        self.hit_action = hit_action
+        self.miss_action = Action()
+
+    def _hit_fraction(self, state: State) -> Optional[Tuple[int, int]]:
+        """Chance de acerto em um estado como fração (None se algum dos slots está vazio)."""
+        attacker = state.pokemons.get(self.attacker_slot)
+        target = state.pokemons.get(self.target_slot)
+        if attacker is None or target is None:
+            return None
+        return hit_fraction(self.accuracy, attacker, target)
+
+    def hit_probability(self, state: State) -> Optional[float]:
+        """Retorna a chance de acerto em um estado (None se algum dos slots está vazio)."""
+        fraction = self._hit_fraction(state)
+        return None if fraction is None else fraction[0] / fraction[1]
+
+    def __call__(self, state: State) -> Iterable[Tuple[float, Action]]:
+        """Gera os pares (probabilidade, ação) de acerto e de erro; ramos com chance 0 são omitidos."""
+        fraction = self._hit_fraction(state)
+        if fraction is None:
+            return []
+        numerator, denominator = fraction
+        branches = []
+        if numerator > 0:
+            action = self.hit_action if isinstance(self.hit_action, Action) else self.hit_action(state)
+            branches.append((numerator / denominator, action))
+        if numerator < denominator:
+            # A partir da fração, para que acerto + erro não acumulem erro de arredondamento
+            branches.append(((denominator - numerator) / denominator, self.miss_action))
+        return branches
+
+
+def branch_accuracy(tree: StateTree, rule: AccuracyRule, states: Optional[List[State]] = None,
+                    turn: Optional[int] = None, advance_turn: bool = True) -> int:
+    """
+    Cria os filhos de acerto e erro de todos os estados de uma camada em uma passada.
+
+    Todas as inserções acontecem em um único tree.batch(), então os índices e caches da
+    árvore são atualizados uma vez para a camada inteira. As probabilidades já somam 1 em
+    cada estado e não são renormalizadas. Estados já decididos (ver State.get_outcome) ou
+    sem Pokémon em algum dos slots não são ramificados.
+
+    Args:
+        tree: Árvore a expandir
+        rule: Golpe, slots e ação de acerto
+        states: Estados a ramificar (None = folhas atuais da árvore)
+        turn: Se informado, só ramifica os estados deste turno
+        advance_turn: Se os filhos ficam no turno seguinte (False = mesmo turno, para
+            ramificar outro golpe do mesmo turno em seguida)
+
+    Returns:
+        Número de estados adicionados
+    """
+    if states is None:
+        states = tree.get_leaf_states()
+    if turn is not None:
+        states = [state for state in states if state.turn == turn]
+
+    added = 0
+    with tree.batch(normalize=False):
+        for parent in states:
+            if parent.get_outcome() != OUTCOME_UNRESOLVED:
+                continue
+            for probability, action in rule(parent):
+                tree.add_child(parent, probability, action, advance_turn)
+                added += 1
+    return added
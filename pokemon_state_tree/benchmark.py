@@ -0,0 +1,340 @@
+"""
+Benchmarks de memória e desempenho das estruturas de dados da árvore de estados.
+
+Uso:
+    python benchmark.py
+"""
+
+import gc
+import multiprocessing
+import pickle
+import sys
+import time
+from enum import Enum
+from typing import Dict
+
+from pokemon import Pokemon, MajorStatus, MinorStatus
+from state import State, Weather
+from state_tree import StateTree
+from transition import Action, Transition
+from columnar import ColumnarTree
+from expander import TreeExpander, splice_subtree, _expand_subtree
+
+
+def deep_sizeof(obj, seen=None) -> int:
+    """
+    Calcula o tamanho aproximado em bytes de um objeto e de tudo que ele referencia.
+
+    Objetos compartilhados (enums, strings e inteiros pequenos) não são contados,
+    pois não pertencem a uma instância específica.
+    """
+    if seen is None:
+        seen = set()
+    if obj is None or id(obj) in seen or isinstance(obj, (Enum, str, bool, type)):
+        return 0
+    if isinstance(obj, int) and -5 <= obj <= 256:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    if hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+    for cls in type(obj).__mro__:
+        for slot in getattr(cls, "__slots__", ()):
+            if slot != "__dict__" and hasattr(obj, slot):
+                size += deep_sizeof(getattr(obj, slot), seen)
+    return size
+
+
+def _make_state(template: Dict[str, Pokemon]) -> State:
+    """Cria um estado de batalha dupla com os quatro slots preenchidos a partir de um modelo."""
+    state = State(battle_type="double")
+    for slot, pokemon in template.items():
+        state.add_pokemon(slot, pokemon)
+    return state
+
+
+class _DictPokemon:
+    """Referência: o Pokémon antes do empacotamento (atributos em __dict__ e estágios em um dict)."""
+
+    def __init__(self, name: str, item: str = None, is_mega: bool = False):
+        self.name = name
+        self.item = item
+        self.is_mega = is_mega
+        self.hp_min_percent = 100
+        self.hp_max_percent = 100
+        self.major_status = MajorStatus.NONE
+        self.minor_status = MinorStatus.NONE
+        self.stats = {stat: 0 for stat in Pokemon.STAT_NAMES}
+
+
+class _DictState:
+    """Referência: o estado antes do empacotamento (atributos em __dict__, Pokémon de _DictPokemon)."""
+
+    def __init__(self, state_id: int, turn: int, battle_type: str):
+        self.id = state_id
+        self.turn = turn
+        self.name = f"Turn {turn}"
+        self.weather = Weather.NONE
+        self.battle_type = battle_type
+        self.pokemons = {"Self": None, "Enemy": None, "Self2": None, "Enemy2": None}
+
+
+def bench_pokemon_memory(count: int = 10000) -> None:
+    """Compara os bytes de estados inteiros (4 slots, Pokémon exclusivos) com a referência em dicts."""
+    slots = ["Self", "Enemy", "Self2", "Enemy2"]
+    template = {slot: Pokemon(f"Pokemon {slot}", item="Leftovers") for slot in slots}
+    template["Enemy"].set_stat("ATK", -1)
+    template["Enemy"].set_major_status(MajorStatus.BURN)
+
+    states = []
+    for i in range(count):
+        state = _make_state(template)
+        state.id = 1000 + i
+        states.append(state)
+    seen = set()
+    state_bytes = sum(deep_sizeof(s, seen) for s in states)
+    seen = set()
+    pokemon_bytes = sum(deep_sizeof(p, seen) for s in states for p in s.get_active_pokemons().values())
+
+    # Mesmos estados na representação antiga, uma cópia de cada Pokémon por slot
+    reference = []
+    for i in range(count):
+        state = _DictState(1000 + i, 0, "double")
+        for slot in slots:
+            pokemon = _DictPokemon(f"Pokemon {slot}", item="Leftovers")
+            if slot == "Enemy":
+                pokemon.stats["ATK"] = -1
+                pokemon.major_status = MajorStatus.BURN
+            state.pokemons[slot] = pokemon
+        reference.append(state)
+    seen = set()
+    reference_bytes = sum(deep_sizeof(s, seen) for s in reference)
+    seen = set()
+    reference_pokemon_bytes = sum(deep_sizeof(p, seen) for s in reference for p in s.pokemons.values())
+
+    print(f"Memória ({count} estados com 4 Pokémon exclusivos):")
+    print(f"  referência (dicts): {reference_bytes / count:,.0f} bytes/estado "
+          f"({reference_pokemon_bytes / count:,.0f} de Pokémon)")
+    print(f"  atual:              {state_bytes / count:,.0f} bytes/estado "
+          f"({pokemon_bytes / count:,.0f} de Pokémon)")
+    print(f"  redução:            {reference_bytes / state_bytes:.1f}x por estado, "
+          f"{reference_pokemon_bytes / pokemon_bytes:.1f}x nos Pokémon")
+
+
+def bench_child_creation(count: int = 50000) -> None:
+    """Compara a criação de estados filhos copiando vs compartilhando (copy-on-write) os Pokémon."""
+    parent = _make_state({slot: Pokemon(f"Pokemon {slot}") for slot in ["Self", "Enemy", "Self2", "Enemy2"]})
+
+    start = time.perf_counter()
+    copied = []
+    for _ in range(count):
+        child = State(turn=1, battle_type="double")
+        for slot, pokemon in parent.get_active_pokemons().items():
+            child.add_pokemon(slot, pokemon)
+        copied.append(child)
+    copy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    shared = []
+    for _ in range(count):
+        child = State(turn=1, battle_type="double")
+        child.share_pokemons_from(parent)
+        shared.append(child)
+    share_time = time.perf_counter() - start
+
+    seen = set()
+    copy_bytes = sum(deep_sizeof(s, seen) for s in copied)
+    seen = set(id(p) for p in parent.get_active_pokemons().values())
+    share_bytes = sum(deep_sizeof(s, seen) for s in shared)
+
+    print(f"Criação de filhos ({count} estados):")
+    print(f"  cópia:         {copy_time * 1000:,.0f} ms, {copy_bytes / count:,.0f} bytes/estado")
+    print(f"  copy-on-write: {share_time * 1000:,.0f} ms, {share_bytes / count:,.0f} bytes/estado")
+
+
+def bench_action_execution(count: int = 20000) -> None:
+    """Compara a execução efeito a efeito com a execução compilada de uma ação."""
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -10, -5)
+    action.add_pokemon_stat_change("Enemy", "ATK", -1)
+    action.add_pokemon_hp_change("Enemy", -6, -6)
+    action.add_pokemon_stat_change("Enemy", "ATK", -1)
+    action.add_pokemon_status_change("Enemy", MajorStatus.BURN)
+    action.add_pokemon_stat_change("Self", "SPE", 1)
+    action.add_pokemon_hp_change("Self", -3, -3)
+    action.add_weather_change(Weather.SANDSTORM)
+
+    template = {"Self": Pokemon("Pokemon Self"), "Enemy": Pokemon("Pokemon Enemy")}
+    sequential_states = [_make_state(template) for _ in range(count)]
+    compiled_states = [_make_state(template) for _ in range(count)]
+
+    start = time.perf_counter()
+    for state in sequential_states:
+        action.execute_sequential(state)
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for state in compiled_states:
+        action.execute(state)
+    compiled_time = time.perf_counter() - start
+
+    print(f"Execução de ação com {len(action.effects)} efeitos ({count} estados):")
+    print(f"  efeito a efeito: {sequential_time * 1000:,.0f} ms")
+    print(f"  compilada:       {compiled_time * 1000:,.0f} ms")
+
+
+def bench_batch_execution(count: int = 50000) -> None:
+    """Compara executar uma ação estado a estado com a execução em lote (objetos e colunas)."""
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -10, -5)
+    action.add_pokemon_stat_change("Enemy", "ATK", -1)
+    action.add_pokemon_hp_change("Self", -3, -3)
+
+    def make_tree() -> StateTree:
+        # Pokémon exclusivos em cada estado, com vidas variadas
+        tree = StateTree(State(battle_type="double"))
+        for i in range(count):
+            state = State(turn=1, battle_type="double")
+            for slot in ("Self", "Enemy"):
+                pokemon = Pokemon(f"Pokemon {slot}")
+                pokemon.set_hp_range(40 + i % 61, 100)
+                state.add_pokemon(slot, pokemon)
+            tree.add_state(state)
+        return tree
+
+    looped = make_tree().get_states_by_turn(1)
+    start = time.perf_counter()
+    for state in looped:
+        action.execute(state)
+    loop_time = time.perf_counter() - start
+
+    batched = make_tree().get_states_by_turn(1)
+    start = time.perf_counter()
+    action.execute_batch(batched)
+    batch_time = time.perf_counter() - start
+
+    store = ColumnarTree.from_tree(make_tree())
+    rows = range(1, len(store))
+    start = time.perf_counter()
+    store.execute_action(action, rows)
+    columnar_time = time.perf_counter() - start
+    # Os três caminhos chegam aos mesmos valores
+    assert all(a.canonical_key() == b.canonical_key() == store.get_state(row).canonical_key()
+               for row, a, b in zip(rows, looped, batched))
+
+    print(f"Ação em lote ({count} estados com Pokémon exclusivos):")
+    print(f"  estado a estado: {loop_time * 1000:,.0f} ms")
+    print(f"  execute_batch:   {batch_time * 1000:,.0f} ms ({loop_time / batch_time:.1f}x)")
+    print(f"  colunar:         {columnar_time * 1000:,.0f} ms ({loop_time / columnar_time:.1f}x)")
+
+
+def _bench_rule(state: State):
+    """Regra de expansão dos benchmarks: quatro faixas de dano no inimigo (função de módulo, serializável)."""
+    branches = []
+    for damage, probability in ((10, 0.3), (20, 0.3), (35, 0.2), (0, 0.2)):
+        action = Action()
+        action.add_pokemon_hp_change("Enemy", -damage, -damage)
+        action.add_pokemon_hp_change("Self", -3, -3)
+        branches.append((probability, action))
+    return branches
+
+
+def bench_parallel_expansion(turns: int = 6) -> None:
+    """
+    Compara a expansão serial com a paralela e mede a parte serial da paralela.
+
+    O enxerto das subárvores no processo principal não é paralelizável, então
+    tempo serial / tempo de enxerto é o limite do ganho com processos suficientes.
+    """
+    def make_tree() -> StateTree:
+        tree = StateTree(_make_state({"Self": Pokemon("Pokemon Self"), "Enemy": Pokemon("Pokemon Enemy")}))
+        TreeExpander(tree, [_bench_rule]).expand(2)
+        return tree
+
+    tree = make_tree()
+    start = time.perf_counter()
+    serial_added = TreeExpander(tree, [_bench_rule]).expand(turns)
+    serial_time = time.perf_counter() - start
+
+    # Subárvores expandidas e serializadas neste processo, para medir só a recepção e o enxerto
+    tree = make_tree()
+    leaves = tree.get_leaf_states()
+    packed = [pickle.dumps(_expand_subtree((leaf, [_bench_rule], turns, 0.0, None, None))) for leaf in leaves]
+    gc.disable()
+    start = time.perf_counter()
+    for leaf, data in zip(leaves, packed):
+        splice_subtree(tree, leaf, pickle.loads(data))
+    splice_time = time.perf_counter() - start
+    gc.enable()
+
+    processes = multiprocessing.cpu_count()
+    tree = make_tree()
+    start = time.perf_counter()
+    parallel_added = TreeExpander(tree, [_bench_rule]).expand_parallel(turns, processes=processes)
+    parallel_time = time.perf_counter() - start
+    assert parallel_added == serial_added
+
+    print(f"Expansão de {turns} turnos ({serial_added} estados):")
+    print(f"  serial:                {serial_time * 1000:,.0f} ms")
+    print(f"  paralela ({processes} processos): {parallel_time * 1000:,.0f} ms "
+          f"({serial_time / parallel_time:.1f}x)")
+    print(f"  recepção e enxerto:    {splice_time * 1000:,.0f} ms "
+          f"(limite de {serial_time / splice_time:.1f}x com processos suficientes)")
+
+
+def bench_columnar_storage(depth: int = 7) -> None:
+    """Compara a memória e o cálculo de alcance da StateTree com o armazenamento colunar."""
+    actions = []
+    for damage, probability in ((10, 0.3), (20, 0.3), (35, 0.2), (0, 0.2)):
+        action = Action()
+        action.add_pokemon_hp_change("Enemy", -damage, -damage)
+        action.add_pokemon_hp_change("Self", -5, -5)
+        actions.append((probability, action))
+
+    tree = StateTree(_make_state({"Self": Pokemon("Pokemon Self"), "Enemy": Pokemon("Pokemon Enemy")}))
+    layer = [tree.root_state]
+    for _ in range(depth):
+        next_layer = []
+        for parent in layer:
+            for probability, action in actions:
+                child = State(turn=parent.turn + 1, battle_type=parent.battle_type)
+                child.share_pokemons_from(parent)
+                action.execute(child)
+                tree.add_state(child)
+                tree.add_transition(Transition(parent, child, probability))
+                next_layer.append(child)
+        layer = next_layer
+
+    store = ColumnarTree.from_tree(tree)
+    seen = set()
+    tree_bytes = deep_sizeof(list(tree.states.values()), seen) + deep_sizeof(tree.transitions, seen)
+
+    start = time.perf_counter()
+    tree.get_reach_probabilities()
+    tree_time = time.perf_counter() - start
+    start = time.perf_counter()
+    store.get_reach_probabilities()
+    store_time = time.perf_counter() - start
+
+    print(f"Armazenamento ({len(store)} estados):")
+    print(f"  objetos:  {tree_bytes / len(store):,.0f} bytes/estado, alcance em {tree_time * 1000:,.0f} ms")
+    print(f"  colunar:  {store.nbytes() / len(store):,.0f} bytes/estado, alcance em {store_time * 1000:,.0f} ms")
+
+
+def main() -> None:
+    """Executa todos os benchmarks."""
+    bench_pokemon_memory()
+    bench_child_creation()
+    bench_action_execution()
+    bench_batch_execution()
+    bench_parallel_expansion()
+    bench_columnar_storage()
+
+
+if __name__ == "__main__":
+    main()
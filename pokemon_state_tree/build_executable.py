@@ -70,6 +70,9 @@ def build_executable():
     if icon_file and os.path.exists(icon_file):
         cmd.extend(["--icon", icon_file])
     
+    # Tabela de espécies (stats base e tipos), lida por pokemon_data ao lado dos módulos
+    cmd.extend(["--add-data", f"species_data.bin{os.pathsep}."])
+    
     cmd.extend([
         "--distpath", output_dir,
         "--workpath", build_dir,
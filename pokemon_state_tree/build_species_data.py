@@ -0,0 +1,60 @@
+"""
+Script para gerar a tabela de espécies (species_data.bin) a partir de um CSV.
+
+O CSV deve ter o cabeçalho: name,hp,atk,def,satk,sdef,spe,type1,type2
+(type2 vazio para espécies de tipo único). Os nomes seguem POKEMON_LIST; a tabela
+precisa ser gerada de novo sempre que POKEMON_LIST ou o CSV mudarem. Os dados de
+origem ficam em species_data.csv, ao lado deste script; os dois arquivos são versionados.
+
+Uso: python build_species_data.py [species_data.csv]
+"""
+
+import csv
+import os
+import sys
+from pokemon_data import SPECIES_FILE, SPECIES_ID, SpeciesTable
+
+
+SPECIES_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "species_data.csv")
+
+
+def build_species_table(csv_path: str = SPECIES_CSV) -> SpeciesTable:
+    """
+    Lê um CSV de stats base e tipos e monta a tabela de espécies.
+
+    Args:
+        csv_path: Caminho do CSV
+
+    Returns:
+        Tabela preenchida (espécies ausentes do CSV ficam sem dados)
+    """
+    table = SpeciesTable()
+    unknown = []
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            species_id = SPECIES_ID.get(row["name"].strip().lower())
+            if species_id is None:
+                unknown.append(row["name"])
+                continue
+            base_stats = [int(row[column]) for column in ("hp", "atk", "def", "satk", "sdef", "spe")]
+            types = [row[column].strip() for column in ("type1", "type2") if row.get(column, "").strip()]
+            table.set_species(species_id, base_stats, types)
+    if unknown:
+        print(f"⚠ {len(unknown)} nomes fora de POKEMON_LIST ignorados: {', '.join(unknown[:10])}")
+    return table
+
+
+def save_species_table(table: SpeciesTable, path: str = SPECIES_FILE) -> None:
+    """Salva a tabela no formato binário lido por pokemon_data.get_species_table."""
+    with open(path, "wb") as f:
+        f.write(table.to_bytes())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print(__doc__)
+        sys.exit(1)
+    species_table = build_species_table(sys.argv[1] if len(sys.argv) == 2 else SPECIES_CSV)
+    save_species_table(species_table)
+    filled = sum(species_table.has_data(i) for i in range(len(species_table)))
+    print(f"✓ Tabela de espécies criada: {filled}/{len(species_table)} espécies em {SPECIES_FILE}")
@@ -0,0 +1,375 @@
+"""
+Armazenamento colunar (struct-of-arrays) de árvores de estados muito grandes.
+
+Cada campo de um estado vira uma coluna (array.array com o menor tipo que comporta os
+valores) e as transições ficam em formato CSR: as transições de saída do estado i ocupam
+as posições edge_start[i]:edge_start[i + 1] das colunas de transição. Objetos State e
+Pokemon são criados sob demanda, como cópias de uma linha, e consultas sobre a árvore
+inteira percorrem as colunas diretamente.
+
+A ColumnarTree não substitui a StateTree: é um instantâneo para análise e edição em massa
+de árvores grandes demais para objetos. A estrutura (estados e transições) é fixa depois
+de from_tree; só o conteúdo das linhas pode mudar, com execute_action (uma ação em muitas
+linhas) ou set_state (gravar de volta uma cópia de get_state editada). Para mudar a
+estrutura, ou para abrir a árvore na interface gráfica, recrie uma StateTree com to_tree,
+edite-a e, se preciso, converta-a de novo com from_tree. A ColumnarTree não publica
+eventos (ver events).
+"""
+
+from array import array
+from typing import Callable, Dict, Iterable, List, Optional
+from pokemon import Pokemon, MajorStatus, MinorStatus
+from state import State, Weather, SLOTS, OUTCOMES, OUTCOME_SELF_FAINTED, OUTCOME_ENEMY_FAINTED, \
+    OUTCOME_BOTH_FAINTED, OUTCOME_UNRESOLVED
+from state_tree import StateTree
+from transition import Action, Transition
+
+
+WEATHERS = list(Weather)
+MAJOR_STATUSES = list(MajorStatus)
+MINOR_STATUSES = list(MinorStatus)
+_MAJOR_INDEX = {status: i for i, status in enumerate(MAJOR_STATUSES)}
+_MINOR_INDEX = {status: i for i, status in enumerate(MINOR_STATUSES)}
+BATTLE_TYPES = ["single", "double"]
+
+
+class _StringTable:
+    """Tabela de strings (espécies, itens...) indexadas por inteiros pequenos."""
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self.index: Dict[Optional[str], int] = {}
+
+    def add(self, value: Optional[str]) -> int:
+        """Retorna o índice de um valor, adicionando-o se necessário."""
+        i = self.index.get(value)
+        if i is None:
+            i = self.index[value] = len(self.values)
+            self.values.append(value)
+        return i
+
+
+class _SlotColumns:
+    """Colunas de um slot de Pokémon (uma linha por estado; species = -1 quando vazio)."""
+
+    __slots__ = ("species", "item", "is_mega", "hp_min", "hp_max", "major", "minor", "stages")
+
+    def __init__(self):
+        self.species = array("h")
+        self.item = array("h")
+        self.is_mega = array("b")
+        self.hp_min = array("b")
+        self.hp_max = array("b")
+        self.major = array("b")
+        self.minor = array("b")
+        self.stages = array("I")  # Estágios empacotados como em Pokemon._stages
+
+
+class ColumnarTree:
+    """Árvore de estados armazenada em colunas, com transições em formato CSR."""
+
+    def __init__(self):
+        """Cria um armazenamento vazio (use from_tree para preenchê-lo)."""
+        self.ids = array("q")
+        self.turn = array("i")
+        self.weather = array("b")
+        self.battle_type = array("b")
+        # Nomes personalizados (None = nome padrão "Turn N")
+        self.names: List[Optional[str]] = []
+        self.slots: Dict[str, _SlotColumns] = {slot: _SlotColumns() for slot in SLOTS}
+
+        self.edge_start = array("q", [0])
+        self.edge_target = array("q")
+        self.edge_probability = array("d")
+        self.edge_choice = array("b")
+        self.edge_action = array("i")
+        self.actions: List[Action] = []
+
+        self._species = _StringTable()
+        self._items = _StringTable()
+        self._index: Optional[Dict[int, int]] = None
+
+    # ==================== CONSTRUÇÃO ====================
+
+    @staticmethod
+    def from_tree(tree: StateTree) -> "ColumnarTree":
+        """
+        Converte uma StateTree para o formato colunar.
+
+        Os estados são ordenados em largura a partir da raiz (a raiz é a linha 0). Ações
+        compartilhadas por várias transições são guardadas uma única vez.
+        """
+        store = ColumnarTree()
+        order = [tree.root_state]
+        row = {tree.root_state.id: 0}
+        for state in order:
+            for t in tree.get_transitions_from(state.id):
+                if t.to_state.id not in row:
+                    row[t.to_state.id] = len(order)
+                    order.append(t.to_state)
+        # Estados desconectados da raiz
+        for state in tree.states.values():
+            if state.id not in row:
+                row[state.id] = len(order)
+                order.append(state)
+
+        action_index: Dict[int, int] = {}
+        for state in order:
+            store._append_state(state)
+            for t in tree.get_transitions_from(state.id):
+                i = action_index.get(id(t.action))
+                if i is None:
+                    i = action_index[id(t.action)] = len(store.actions)
+                    store.actions.append(t.action)
+                store.edge_target.append(row[t.to_state.id])
+                store.edge_probability.append(t.probability)
+                store.edge_choice.append(t.is_choice)
+                store.edge_action.append(i)
+            store.edge_start.append(len(store.edge_target))
+        return store
+
+    def _append_state(self, state: State) -> None:
+        """Adiciona uma linha com os campos de um estado."""
+        self.ids.append(state.id)
+        self.turn.append(state.turn)
+        self.weather.append(WEATHERS.index(state.weather))
+        self.battle_type.append(BATTLE_TYPES.index(state.battle_type))
+        self.names.append(None if state.name == f"Turn {state.turn}" else state.name)
+
+        for slot in SLOTS:
+            columns = self.slots[slot]
+            for name, value in zip(_SlotColumns.__slots__, self._pokemon_values(state.pokemons.get(slot))):
+                getattr(columns, name).append(value)
+        self._index = None
+
+    def _pokemon_values(self, pokemon: Optional[Pokemon]) -> tuple:
+        """Valores das colunas de um slot para um Pokémon (na ordem de _SlotColumns.__slots__)."""
+        if pokemon is None:
+            return -1, -1, 0, 0, 0, 0, 0, Pokemon.NEUTRAL_STAGES
+        return (self._species.add(pokemon.name), self._items.add(pokemon.item), pokemon.is_mega,
+                pokemon.hp_min_percent, pokemon.hp_max_percent, _MAJOR_INDEX[pokemon.major_status],
+                _MINOR_INDEX[pokemon.minor_status], pokemon._stages)
+
+    def to_tree(self) -> StateTree:
+        """
+        Recria uma StateTree (com objetos State e Transition) a partir das colunas.
+
+        Os estados mantêm seus IDs e as transições que compartilhavam uma ação em from_tree
+        voltam a compartilhá-la. Use a árvore recriada para editar a estrutura ou para
+        exibi-la na interface gráfica.
+        """
+        states = [self.get_state(i) for i in range(len(self))]
+        tree = StateTree(states[0])
+        transitions = [Transition(state, states[self.edge_target[k]], self.edge_probability[k],
+                                  bool(self.edge_choice[k]), self.actions[self.edge_action[k]])
+                       for i, state in enumerate(states)
+                       for k in range(self.edge_start[i], self.edge_start[i + 1])]
+        tree.add_subtree(states[1:], transitions)
+        return tree
+
+    # ==================== VISÕES ====================
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def row_of(self, state_id: int) -> int:
+        """Retorna a linha de um estado pelo seu ID."""
+        if self._index is None:
+            self._index = {state_id: i for i, state_id in enumerate(self.ids)}
+        return self._index[state_id]
+
+    def get_pokemon(self, row: int, slot: str) -> Optional[Pokemon]:
+        """Cria o Pokémon de um slot de uma linha (uma cópia; alterá-lo não altera as colunas)."""
+        columns = self.slots[slot]
+        species = columns.species[row]
+        if species < 0:
+            return None
+        pokemon = Pokemon(self._species.values[species], item=self._items.values[columns.item[row]],
+                          is_mega=bool(columns.is_mega[row]))
+        pokemon.hp_min_percent = columns.hp_min[row]
+        pokemon.hp_max_percent = columns.hp_max[row]
+        pokemon.major_status = MAJOR_STATUSES[columns.major[row]]
+        pokemon.minor_status = MINOR_STATUSES[columns.minor[row]]
+        pokemon._stages = columns.stages[row]
+        return pokemon
+
+    def get_state(self, row: int) -> State:
+        """Cria o State de uma linha (uma cópia; alterá-lo não altera as colunas, ver set_state)."""
+        state = State(name=self.names[row], turn=self.turn[row],
+                      battle_type=BATTLE_TYPES[self.battle_type[row]], state_id=self.ids[row])
+        state.set_weather(WEATHERS[self.weather[row]])
+        for slot in SLOTS:
+            pokemon = self.get_pokemon(row, slot)
+            if pokemon is not None:
+                state.share_pokemon(slot, pokemon)
+        return state
+
+    def get_children(self, row: int) -> List[int]:
+        """Retorna as linhas dos filhos de uma linha."""
+        return list(self.edge_target[self.edge_start[row]:self.edge_start[row + 1]])
+
+    # ==================== CONSULTAS ====================
+
+    def select_rows(self, predicate: Callable[[int], bool]) -> List[int]:
+        """Retorna as linhas que satisfazem um filtro (que recebe o número da linha)."""
+        return [row for row in range(len(self)) if predicate(row)]
+
+    def get_leaf_rows(self) -> List[int]:
+        """Retorna as linhas sem transições de saída."""
+        start = self.edge_start
+        return [row for row in range(len(self)) if start[row] == start[row + 1]]
+
+    def get_outcomes(self) -> List[str]:
+        """Classifica todas as linhas pelo desfecho (mesma regra de State.get_outcome)."""
+        self_fainted = self._side_fainted(("Self", "Self2"))
+        enemy_fainted = self._side_fainted(("Enemy", "Enemy2"))
+        outcomes = []
+        for s, e in zip(self_fainted, enemy_fainted):
+            if s and e:
+                outcomes.append(OUTCOME_BOTH_FAINTED)
+            elif s:
+                outcomes.append(OUTCOME_SELF_FAINTED)
+            elif e:
+                outcomes.append(OUTCOME_ENEMY_FAINTED)
+            else:
+                outcomes.append(OUTCOME_UNRESOLVED)
+        return outcomes
+
+    def _side_fainted(self, slots: tuple) -> List[bool]:
+        """Para cada linha, se todos os Pokémon em campo de um lado estão com 0% de vida."""
+        first, second = (self.slots[slot] for slot in slots)
+        return [(a >= 0 or b >= 0) and (a < 0 or ha == 0) and (b < 0 or hb == 0)
+                for a, ha, b, hb in zip(first.species, first.hp_max, second.species, second.hp_max)]
+
+    def get_reach_probabilities(self) -> array:
+        """
+        Calcula a probabilidade de alcançar cada linha a partir da raiz (linha 0).
+
+        Passada topológica sobre as colunas CSR; transições que fecham ciclos são ignoradas.
+
+        Returns:
+            array de probabilidades, indexado pela linha
+        """
+        size = len(self)
+        start, target, probability = self.edge_start, self.edge_target, self.edge_probability
+        indegree = array("q", bytes(8 * size))
+        for child in target:
+            indegree[child] += 1
+
+        reach = array("d", bytes(8 * size))
+        if size:
+            reach[0] = 1.0
+        ready = [row for row in range(size) if indegree[row] == 0]
+        done = 0
+        visited = bytearray(size)
+        while done < size:
+            if not ready:
+                # Apenas linhas em ciclos restaram: liberar a de menor número
+                ready.append(next(row for row in range(size) if not visited[row]))
+            row = ready.pop()
+            if visited[row]:
+                continue
+            visited[row] = 1
+            done += 1
+            p = reach[row]
+            for k in range(start[row], start[row + 1]):
+                child = target[k]
+                if not visited[child]:
+                    reach[child] += p * probability[k]
+                    indegree[child] -= 1
+                    if indegree[child] == 0:
+                        ready.append(child)
+        return reach
+
+    def get_outcome_probabilities(self) -> Dict[str, float]:
+        """Retorna a probabilidade total de terminar em cada desfecho."""
+        reach = self.get_reach_probabilities()
+        outcomes = self.get_outcomes()
+        mass = {outcome: 0.0 for outcome in OUTCOMES}
+        for row in self.get_leaf_rows():
+            mass[outcomes[row]] += reach[row]
+        return mass
+
+    # ==================== EDIÇÃO ====================
+
+    def execute_action(self, action: Action, rows: Optional[Iterable[int]] = None) -> int:
+        """
+        Executa uma ação direto sobre as colunas de várias linhas.
+
+        O resultado em cada linha é o mesmo de Action.execute no estado correspondente.
+        Cada passo do plano da ação é calculado uma vez por combinação distinta de vida,
+        status e estágios na coluna do slot, e os novos valores são escritos nas demais
+        linhas com a mesma combinação, sem criar objetos State ou Pokemon por linha.
+
+        Args:
+            action: Ação a executar
+            rows: Linhas a modificar (None = todas)
+
+        Returns:
+            Número de combinações distintas de valores efetivamente calculadas
+        """
+        rows = range(len(self)) if rows is None else list(dict.fromkeys(rows))
+        steps, weather, guards = action.compile_plan()
+        scratch = Pokemon("")
+        computed = 0
+        for step in steps:
+            columns = self.slots.get(step[0])
+            if columns is None:
+                continue
+            guard = guards.get(step[0])
+            species, hp_min, hp_max = columns.species, columns.hp_min, columns.hp_max
+            major, minor, stages = columns.major, columns.minor, columns.stages
+            changes: Dict[tuple, tuple] = {}
+            for row in rows:
+                if species[row] < 0:
+                    continue
+                key = (hp_min[row], hp_max[row], major[row], minor[row], stages[row])
+                values = changes.get(key)
+                if values is None:
+                    scratch.hp_min_percent, scratch.hp_max_percent = key[0], key[1]
+                    scratch.major_status = MAJOR_STATUSES[key[2]]
+                    scratch.minor_status = MINOR_STATUSES[key[3]]
+                    scratch._stages = key[4]
+                    Action.apply_step(scratch, step, guard)
+                    values = changes[key] = (scratch.hp_min_percent, scratch.hp_max_percent,
+                                             _MAJOR_INDEX[scratch.major_status],
+                                             _MINOR_INDEX[scratch.minor_status], scratch._stages)
+                hp_min[row], hp_max[row], major[row], minor[row], stages[row] = values
+            computed += len(changes)
+
+        if weather is not None:
+            code = WEATHERS.index(weather)
+            for row in rows:
+                self.weather[row] = code
+        return computed
+
+    def set_state(self, row: int, state: State) -> None:
+        """
+        Grava o conteúdo de um estado (ex: uma cópia de get_state editada) em uma linha.
+
+        Nome, turno, clima, tipo de batalha e Pokémon são copiados; o ID e as transições
+        da linha não mudam.
+
+        Args:
+            row: Linha a sobrescrever
+            state: Estado com o novo conteúdo
+        """
+        self.turn[row] = state.turn
+        self.weather[row] = WEATHERS.index(state.weather)
+        self.battle_type[row] = BATTLE_TYPES.index(state.battle_type)
+        self.names[row] = None if state.name == f"Turn {state.turn}" else state.name
+        for slot in SLOTS:
+            columns = self.slots[slot]
+            for name, value in zip(_SlotColumns.__slots__, self._pokemon_values(state.pokemons.get(slot))):
+                getattr(columns, name)[row] = value
+
+    def nbytes(self) -> int:
+        """Bytes ocupados pelas colunas (sem contar as tabelas de strings e ações)."""
+        columns = [self.ids, self.turn, self.weather, self.battle_type, self.edge_start,
+                   self.edge_target, self.edge_probability, self.edge_choice, self.edge_action]
+        for slot_columns in self.slots.values():
+            columns.extend(getattr(slot_columns, name) for name in _SlotColumns.__slots__)
+        return sum(column.itemsize * len(column) for column in columns) + 8 * len(self.names)
+
+    def __repr__(self) -> str:
+        return f"ColumnarTree(states={len(self)}, transitions={len(self.edge_target)})"
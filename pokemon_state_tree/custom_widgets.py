@@ -255,6 +255,9 @@ class PokemonStatusFrame(ttk.Frame):
         # Atualizar dados do pokémon com valores editados
         from pokemon import MajorStatus, MinorStatus
         
+        # Trabalhar sobre uma cópia: o Pokémon exibido pode ser compartilhado entre estados
+        self.pokemon = self.pokemon.copy()
+        
         # Atualizar status
         major_str = self.major_var.get()
         minor_str = self.minor_var.get()
@@ -0,0 +1,252 @@
+"""
+Calculadora de faixas de dano.
+
+Segue a fórmula de dano das gerações 5 em diante: dano base a partir do nível, do poder
+do golpe e da razão ataque/defesa (com os estágios de stats do Pokémon), seguido dos
+modificadores de alvo múltiplo, clima, crítico, variação aleatória (16 valores, de 85%
+a 100%), STAB, efetividade, queimadura e itens. O resultado é a distribuição completa de
+16 valores, em percentual da vida máxima do defensor, pronta para virar um efeito de
+vida de uma Action.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from pokemon import Pokemon, MajorStatus
+from pokemon_data import BASE_STATS, get_base_stats, get_types
+from stat_stages import apply_stage
+from state import Weather
+from transition import Action
+from type_chart import effectiveness as type_effectiveness
+
+
+PHYSICAL = "physical"
+SPECIAL = "special"
+
+# Fatores da variação aleatória do dano: 85% a 100%
+RANDOM_FACTORS = tuple(range(85, 101))
+
+
+@dataclass
+class Move:
+    """Golpe usado no cálculo de dano."""
+    name: str
+    power: int
+    move_type: str
+    category: str = PHYSICAL  # PHYSICAL ou SPECIAL
+    is_spread: bool = False   # Atinge mais de um alvo (dano reduzido em batalhas duplas)
+
+
+@dataclass
+class BattleStats:
+    """Stats efetivos (sem estágios) e tipos de um Pokémon em batalha."""
+    stats: Dict[str, int]                 # HP, ATK, DEF, SATK, SDEF, SPE
+    types: Tuple[str, ...] = ()
+    level: int = 50
+
+    @staticmethod
+    def from_species(name: str, level: int = 50, iv: int = 31, ev: int = 0) -> "BattleStats":
+        """
+        Calcula os stats de uma espécie a partir da tabela de espécies (natureza neutra).
+
+        Args:
+            name: Nome da espécie
+            level: Nível
+            iv: IV de todos os stats
+            ev: EV de todos os stats
+
+        Returns:
+            Stats e tipos da espécie
+        """
+        base_stats = get_base_stats(name)
+        if base_stats is None:
+            raise ValueError(f"No species data for {name}")
+        stats = {}
+        for stat, base in zip(BASE_STATS, base_stats):
+            value = (2 * base + iv + ev // 4) * level // 100
+            stats[stat] = value + level + 10 if stat == "HP" else value + 5
+        return BattleStats(stats, get_types(name), level)
+
+
+def _poke_round(value: float) -> int:
+    """Arredondamento do jogo: metades são arredondadas para baixo."""
+    return int(value) + (1 if value - int(value) > 0.5 else 0)
+
+
+def _attack_and_defense(attacker: Pokemon, attacker_stats: BattleStats, defender: Pokemon,
+                        defender_stats: BattleStats, move: Move, weather: Weather,
+                        critical: bool) -> Tuple[int, int]:
+    """Calcula os stats de ataque e defesa usados no golpe, já com estágios, itens e clima."""
+    attack_stat, defense_stat = ("ATK", "DEF") if move.category == PHYSICAL else ("SATK", "SDEF")
+    attack_stage = attacker.get_stat(attack_stat)
+    defense_stage = defender.get_stat(defense_stat)
+    if critical:
+        # Críticos ignoram estágios desfavoráveis ao atacante
+        attack_stage = max(attack_stage, 0)
+        defense_stage = min(defense_stage, 0)
+
+    attack = apply_stage(attacker_stats.stats[attack_stat], attack_stage)
+    defense = apply_stage(defender_stats.stats[defense_stat], defense_stage)
+
+    if attacker.item == ("Choice Band" if move.category == PHYSICAL else "Choice Specs"):
+        attack = attack * 3 // 2
+    if move.category == SPECIAL:
+        if defender.item == "Assault Vest":
+            defense = defense * 3 // 2
+        if weather == Weather.SANDSTORM and "Rock" in defender_stats.types:
+            defense = defense * 3 // 2
+    return max(1, attack), max(1, defense)
+
+
+def damage_rolls(attacker: Pokemon, attacker_stats: BattleStats, defender: Pokemon,
+                 defender_stats: BattleStats, move: Move, weather: Weather = Weather.NONE,
+                 effectiveness: Optional[float] = None, critical: bool = False,
+                 double_battle: bool = False) -> List[float]:
+    """
+    Calcula os 16 valores possíveis de dano de um golpe.
+
+    Args:
+        attacker: Pokémon atacante (estágios, item, status)
+        attacker_stats: Stats e tipos do atacante
+        defender: Pokémon defensor (estágios, item)
+        defender_stats: Stats e tipos do defensor
+        move: Golpe usado
+        weather: Clima atual
+        effectiveness: Multiplicador de efetividade de tipo (None = calculado pelos tipos do defensor)
+        critical: Se o golpe é crítico
+        double_battle: Se a batalha é dupla (reduz golpes de alvo múltiplo)
+
+    Returns:
+        Lista com os 16 valores de dano, em percentual da vida máxima do defensor
+    """
+    attack, defense = _attack_and_defense(attacker, attacker_stats, defender, defender_stats,
+                                          move, weather, critical)
+    base = _base_damage(attacker_stats.level, move.power, attack, defense)
+    modifiers = _damage_modifiers(attacker, attacker_stats, move, weather, critical, double_battle)
+    if effectiveness is None:
+        effectiveness = _type_effectiveness(move, defender_stats)
+    max_hp = defender_stats.stats["HP"]
+    return [100.0 * damage / max_hp for damage in _apply_modifiers(base, modifiers, effectiveness, attacker)]
+
+
+def _type_effectiveness(move: Move, defender_stats: BattleStats) -> float:
+    """Efetividade do golpe pelos tipos do defensor (1.0 se os tipos não são conhecidos)."""
+    if not defender_stats.types:
+        return 1.0
+    return type_effectiveness(move.move_type, defender_stats.types)
+
+
+def _base_damage(level: int, power: int, attack: int, defense: int) -> int:
+    """Dano base da fórmula, antes dos modificadores."""
+    return (2 * level // 5 + 2) * power * attack // defense // 50 + 2
+
+
+def _damage_modifiers(attacker: Pokemon, attacker_stats: BattleStats, move: Move, weather: Weather,
+                      critical: bool, double_battle: bool) -> Tuple[float, float, float, bool]:
+    """Modificadores que não dependem do defensor: (antes da variação, STAB, final, queimado)."""
+    pre_random = 1.0
+    if move.is_spread and double_battle:
+        pre_random *= 0.75
+    if weather == Weather.SUNNY:
+        pre_random *= {"Fire": 1.5, "Water": 0.5}.get(move.move_type, 1.0)
+    elif weather == Weather.RAIN:
+        pre_random *= {"Water": 1.5, "Fire": 0.5}.get(move.move_type, 1.0)
+    if critical:
+        pre_random *= 1.5
+
+    stab = 1.5 if move.move_type in attacker_stats.types else 1.0
+    final = 1.3 if attacker.item == "Life Orb" else 1.0
+    burned = attacker.major_status == MajorStatus.BURN and move.category == PHYSICAL
+    return pre_random, stab, final, burned
+
+
+def _apply_modifiers(base: int, modifiers: Tuple[float, float, float, bool], effectiveness: float,
+                     attacker: Pokemon) -> List[int]:
+    """Aplica os modificadores ao dano base para cada um dos 16 fatores aleatórios."""
+    pre_random, stab, final, burned = modifiers
+    if effectiveness == 0:
+        return [0] * len(RANDOM_FACTORS)
+    if attacker.item == "Expert Belt" and effectiveness > 1:
+        final *= 1.2
+
+    damage = _poke_round(base * pre_random)
+    rolls = []
+    for factor in RANDOM_FACTORS:
+        roll = damage * factor // 100
+        roll = _poke_round(roll * stab)
+        roll = int(roll * effectiveness)
+        if burned:
+            roll = _poke_round(roll * 0.5)
+        roll = _poke_round(roll * final)
+        rolls.append(max(1, roll))
+    return rolls
+
+
+def damage_matrix(attackers: Sequence[Tuple[Pokemon, BattleStats]], defenders: Sequence[Tuple[Pokemon, BattleStats]],
+                  move: Move, weather: Weather = Weather.NONE,
+                  effectiveness: Optional[Sequence[Sequence[float]]] = None,
+                  critical: bool = False, double_battle: bool = False) -> List[List[List[float]]]:
+    """
+    Calcula as faixas de dano de um golpe para todos os pares atacante × defensor.
+
+    Os modificadores de cada atacante são calculados uma única vez e os 16 fatores são
+    aplicados em um único laço por par, então uma matriz Box × treinador inteira sai de
+    uma chamada.
+
+    Args:
+        attackers: Pares (Pokémon, stats) dos atacantes
+        defenders: Pares (Pokémon, stats) dos defensores
+        move: Golpe usado por todos os atacantes
+        weather: Clima atual
+        effectiveness: Matriz [atacante][defensor] de efetividade (None = calculada pelos tipos dos defensores)
+        critical: Se os golpes são críticos
+        double_battle: Se a batalha é dupla
+
+    Returns:
+        Matriz [atacante][defensor] com os 16 valores de dano em percentual
+    """
+    # Com um único golpe, a efetividade só depende do defensor
+    default_effectiveness = [_type_effectiveness(move, defender_stats) for _, defender_stats in defenders]
+    matrix = []
+    for i, (attacker, attacker_stats) in enumerate(attackers):
+        modifiers = _damage_modifiers(attacker, attacker_stats, move, weather, critical, double_battle)
+        row = []
+        for j, (defender, defender_stats) in enumerate(defenders):
+            attack, defense = _attack_and_defense(attacker, attacker_stats, defender, defender_stats,
+                                                  move, weather, critical)
+            base = _base_damage(attacker_stats.level, move.power, attack, defense)
+            multiplier = default_effectiveness[j] if effectiveness is None else effectiveness[i][j]
+            max_hp = defender_stats.stats["HP"]
+            row.append([100.0 * damage / max_hp
+                        for damage in _apply_modifiers(base, modifiers, multiplier, attacker)])
+        matrix.append(row)
+    return matrix
+
+
+def damage_range(rolls: Iterable[float]) -> Tuple[int, int]:
+    """
+    Converte os valores de dano em uma faixa inteira (mínimo, máximo) em percentual.
+
+    O mínimo é arredondado para baixo e o máximo para cima, para que a faixa de vida
+    resultante sempre contenha o valor real.
+    """
+    rolls = list(rolls)
+    return int(min(rolls)), -int(-max(rolls) // 1)
+
+
+def add_damage_effect(action: Action, slot: str, rolls: Iterable[float]) -> Tuple[int, int]:
+    """
+    Adiciona a uma ação o efeito de vida correspondente a uma distribuição de dano.
+
+    A vida mínima do alvo cai pelo dano máximo e a vida máxima cai pelo dano mínimo.
+
+    Args:
+        action: Ação que recebe o efeito
+        slot: Slot do Pokémon atingido
+        rolls: Valores de dano em percentual (ex: retorno de damage_rolls)
+
+    Returns:
+        Faixa de dano (mínimo, máximo) aplicada
+    """
+    low, high = damage_range(rolls)
+    action.add_pokemon_hp_change(slot, -high, -low)
+    return low, high
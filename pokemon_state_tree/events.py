@@ -0,0 +1,69 @@
+"""
+Barramento de eventos de mutação da árvore de estados.
+
+A StateTree, seus estados e suas transições publicam eventos granulares (estado
+adicionado, probabilidade alterada, Pokémon alterado...), para que consumidores como a
+visualização, índices e caches de análise se atualizem incrementalmente em vez de
+recalcular tudo. Sem assinantes, publicar um evento custa apenas uma busca em dicionário.
+"""
+
+from typing import Callable, Dict, List
+
+
+STATE_ADDED = "state_added"                # state
+STATE_REMOVED = "state_removed"            # state
+TRANSITION_ADDED = "transition_added"      # transition
+TRANSITION_REMOVED = "transition_removed"  # transition
+PROBABILITY_CHANGED = "probability_changed"  # transition, old_probability
+POKEMON_CHANGED = "pokemon_changed"        # state, slot
+WEATHER_CHANGED = "weather_changed"        # state, old_weather
+
+EVENT_TYPES = (STATE_ADDED, STATE_REMOVED, TRANSITION_ADDED, TRANSITION_REMOVED,
+               PROBABILITY_CHANGED, POKEMON_CHANGED, WEATHER_CHANGED)
+
+# Um assinante recebe o tipo do evento e os dados como argumentos nomeados
+Subscriber = Callable[..., None]
+
+
+class EventBus:
+    """Distribui eventos de mutação para os assinantes de cada tipo."""
+
+    def __init__(self):
+        self._subscribers: Dict[str, List[Subscriber]] = {}
+
+    def subscribe(self, callback: Subscriber, *event_types: str) -> None:
+        """
+        Registra um assinante.
+
+        Args:
+            callback: Função chamada como callback(event_type, **dados)
+            event_types: Tipos de evento assinados (nenhum = todos)
+        """
+        for event_type in event_types or EVENT_TYPES:
+            if event_type not in EVENT_TYPES:
+                raise ValueError(f"Unknown event type: {event_type}")
+            self._subscribers.setdefault(event_type, []).append(callback)
+
+    def unsubscribe(self, callback: Subscriber, *event_types: str) -> None:
+        """Remove um assinante dos tipos de evento indicados (nenhum = todos)."""
+        for event_type in event_types or EVENT_TYPES:
+            subscribers = self._subscribers.get(event_type)
+            if subscribers and callback in subscribers:
+                subscribers.remove(callback)
+                if not subscribers:
+                    del self._subscribers[event_type]
+
+    def has_subscribers(self, event_type: str) -> bool:
+        """Verifica se algum assinante recebe um tipo de evento."""
+        return event_type in self._subscribers
+
+    def emit(self, event_type: str, **data) -> None:
+        """Publica um evento para os assinantes do seu tipo."""
+        subscribers = self._subscribers.get(event_type)
+        if subscribers:
+            for callback in list(subscribers):
+                callback(event_type, **data)
+
+    def __repr__(self) -> str:
+        counts = {event_type: len(subscribers) for event_type, subscribers in self._subscribers.items()}
+        return f"EventBus(subscribers={counts})"
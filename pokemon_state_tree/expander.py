@@ -0,0 +1,287 @@
+"""
+Expansão automática (sem interface gráfica) de uma árvore de estados.
+
+Um conjunto de regras gera, para cada estado, as possíveis transições com suas ações.
+A árvore cresce em largura, um turno por vez: os candidatos de um turno são gerados sob
+demanda e só os sobreviventes da poda viram estados, então o número de candidatos
+avaliados pode ser muito maior que a memória ocupada.
+"""
+
+import gc
+import heapq
+import multiprocessing
+import zobrist
+from itertools import count
+from typing import Callable, Iterable, List, Optional, Tuple
+from pokemon import Pokemon
+from state import State, Weather, SLOTS, OUTCOME_UNRESOLVED
+from state_tree import StateTree
+from transition import Action, Transition
+
+
+# Uma regra recebe um estado e gera pares (probabilidade da transição, ação do filho).
+# Para a expansão paralela, as regras precisam ser funções de módulo (serializáveis).
+Rule = Callable[[State], Iterable[Tuple[float, Action]]]
+
+
+class TreeExpander:
+    """Expande uma StateTree turno a turno com poda por probabilidade, feixe e orçamento de nós."""
+
+    def __init__(self, tree: StateTree, rules: List[Rule], epsilon: float = 0.0,
+                 beam_width: Optional[int] = None, node_budget: Optional[int] = None):
+        """
+        Inicializa o expansor.
+
+        Args:
+            tree: Árvore a expandir
+            rules: Regras que geram as transições de cada estado
+            epsilon: Candidatos com probabilidade acumulada (desde a raiz) menor que esta são podados
+            beam_width: Máximo de estados novos por turno (os mais prováveis são mantidos)
+            node_budget: Máximo de estados na árvore
+        """
+        self.tree = tree
+        self.rules = rules
+        self.epsilon = epsilon
+        self.beam_width = beam_width
+        self.node_budget = node_budget
+        self.candidates_generated = 0
+        self.candidates_pruned = 0
+
+    def expand(self, turns: int, states: Optional[List[State]] = None) -> int:
+        """
+        Expande a árvore por um número de turnos.
+
+        Estados já decididos (ver State.get_outcome) não são expandidos. As transições
+        podadas não são recriadas nem renormalizadas: a massa de probabilidade delas
+        simplesmente deixa de aparecer na árvore.
+
+        Args:
+            turns: Número de turnos a expandir
+            states: Estados de partida (None = folhas atuais da árvore)
+
+        Returns:
+            Número de estados adicionados
+        """
+        if states is None:
+            states = self.tree.get_leaf_states()
+        layer = [(state, self.tree.get_reach_probability(state.id)) for state in states]
+        added = 0
+
+        for _ in range(turns):
+            capacity = self._capacity()
+            if not layer or capacity == 0:
+                break
+            layer = self._expand_layer(layer, capacity)
+            added += len(layer)
+        return added
+
+    def expand_parallel(self, turns: int, states: Optional[List[State]] = None,
+                        processes: Optional[int] = None) -> int:
+        """
+        Expande em paralelo as subárvores independentes abaixo de cada estado de partida.
+
+        Cada estado de partida é enviado a um processo de um multiprocessing.Pool, que
+        expande a subárvore em uma árvore própria e a devolve compactada (ver pack_subtree).
+        O processo principal recria os estados e os insere em bloco ao enxertá-los
+        (splice_subtree), então os IDs são alocados só aqui e não colidem. O feixe e o orçamento de nós são divididos
+        igualmente entre as subárvores, o que aproxima (mas não reproduz exatamente) a
+        poda global de expand().
+
+        Args:
+            turns: Número de turnos a expandir
+            states: Estados de partida (None = folhas atuais da árvore)
+            processes: Número de processos (None = número de CPUs)
+
+        Returns:
+            Número de estados adicionados
+        """
+        if states is None:
+            states = self.tree.get_leaf_states()
+        anchors = [state for state in states if state.get_outcome() == OUTCOME_UNRESOLVED]
+        if not anchors or turns <= 0:
+            return 0
+
+        share = len(anchors)
+        beam_width = None if self.beam_width is None else max(1, self.beam_width // share)
+        node_budget = None
+        if self.node_budget is not None:
+            remaining = self.node_budget - len(self.tree.states)
+            if remaining <= 0:
+                return 0
+            node_budget = max(1, remaining // share) + 1  # +1: a raiz da subárvore
+
+        tasks = []
+        for anchor in anchors:
+            reach = self.tree.get_reach_probability(anchor.id)
+            epsilon = self.epsilon / reach if reach > 0.0 else self.epsilon
+            tasks.append((anchor, self.rules, turns, epsilon, beam_width, node_budget))
+
+        added = 0
+        chunksize = max(1, len(tasks) // (4 * (processes or multiprocessing.cpu_count())))
+        with multiprocessing.Pool(processes) as pool:
+            # Receber e enxertar as subárvores é a parte serial: o coletor de lixo fica
+            # pausado (só neste processo) enquanto ela cria milhares de objetos, que não
+            # formam ciclos descartáveis
+            gc_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                for anchor, packed in zip(anchors, pool.imap(_expand_subtree, tasks, chunksize)):
+                    added += splice_subtree(self.tree, anchor, packed)
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        return added
+
+    def _capacity(self) -> Optional[int]:
+        """Número máximo de estados que o próximo turno pode adicionar (None = ilimitado)."""
+        limits = []
+        if self.beam_width is not None:
+            limits.append(self.beam_width)
+        if self.node_budget is not None:
+            limits.append(max(0, self.node_budget - len(self.tree.states)))
+        return min(limits) if limits else None
+
+    def _candidates(self, layer: List[Tuple[State, float]]):
+        """Gera os candidatos de um turno: (probabilidade acumulada, pai, probabilidade, ação)."""
+        epsilon = self.epsilon
+        for parent, reach in layer:
+            if parent.get_outcome() != OUTCOME_UNRESOLVED:
+                continue
+            for rule in self.rules:
+                for probability, action in rule(parent):
+                    self.candidates_generated += 1
+                    cumulative = reach * probability
+                    if cumulative <= 0.0 or cumulative < epsilon:
+                        self.candidates_pruned += 1
+                        continue
+                    yield cumulative, parent, probability, action
+
+    def _expand_layer(self, layer: List[Tuple[State, float]], capacity: Optional[int]) -> List[Tuple[State, float]]:
+        """Gera os candidatos de um turno, aplica o feixe e cria os estados sobreviventes."""
+        if capacity is None:
+            survivors = list(self._candidates(layer))
+        else:
+            # Heap de mínimo com os `capacity` candidatos mais prováveis vistos até agora
+            tiebreak = count()
+            survivors = []
+            for cumulative, parent, probability, action in self._candidates(layer):
+                entry = (cumulative, -next(tiebreak), parent, probability, action)
+                if len(survivors) < capacity:
+                    heapq.heappush(survivors, entry)
+                elif entry[0] > survivors[0][0]:
+                    # O candidato menos provável do feixe é descartado
+                    heapq.heapreplace(survivors, entry)
+                    self.candidates_pruned += 1
+                else:
+                    self.candidates_pruned += 1
+            survivors = [(cumulative, parent, probability, action)
+                         for cumulative, _, parent, probability, action in sorted(survivors, reverse=True)]
+
+        add_child = self.tree.add_child
+        return [(add_child(parent, probability, action), cumulative)
+                for cumulative, parent, probability, action in survivors]
+
+
+def _expand_subtree(task: tuple) -> tuple:
+    """Expande uma subárvore em um processo de trabalho e a devolve compactada."""
+    anchor, rules, turns, epsilon, beam_width, node_budget = task
+    # Raiz local com ID novo, para não colidir com os IDs gerados neste processo
+    root = State(name=anchor.name, turn=anchor.turn, battle_type=anchor.battle_type)
+    root.set_weather(anchor.weather)
+    root.share_pokemons_from(anchor)
+    tree = StateTree(root)
+    TreeExpander(tree, rules, epsilon, beam_width, node_budget).expand(turns, [root])
+    return pack_subtree(tree)
+
+
+def pack_subtree(tree: StateTree) -> tuple:
+    """
+    Compacta uma árvore em tuplas simples, sem IDs, para transferência entre processos.
+
+    Pokémon iguais e ações compartilhadas por várias transições são guardados uma única vez.
+
+    Returns:
+        Tupla (pokémon, ações, estados, transições), onde:
+        pokémon são chaves canônicas, ações são listas de Action.to_list(), estados são
+        (nome, turno, clima, tipo de batalha, índice do Pokémon de cada slot ou -1, hash dos
+        Pokémon) com a raiz no índice 0, e transições são (origem, destino, probabilidade,
+        is_choice, ação)
+    """
+    pokemon_index = {}
+    pokemons = []
+    action_index = {}
+    actions = []
+    state_index = {}
+    states = []
+    edges = []
+
+    order = [tree.root_state]
+    state_index[tree.root_state.id] = 0
+    for state in order:
+        slots = []
+        for slot in SLOTS:
+            pokemon = state.pokemons.get(slot)
+            if pokemon is None:
+                slots.append(-1)
+                continue
+            index = pokemon_index.get(id(pokemon))
+            if index is None:
+                # Pokémon iguais viram uma única instância compartilhada (copy-on-write) no destino
+                key = pokemon.canonical_key()
+                index = pokemon_index.get(key)
+                if index is None:
+                    index = pokemon_index[key] = len(pokemons)
+                    pokemons.append(key)
+                pokemon_index[id(pokemon)] = index
+            slots.append(index)
+        # Contribuição dos Pokémon para o hash (as chaves Zobrist são iguais em todos os processos)
+        pokemons_hash = (state.zobrist_hash ^ zobrist.battle_type_key(state.battle_type)
+                         ^ zobrist.weather_key(state.weather))
+        states.append((state.name, state.turn, state.weather.name, state.battle_type, tuple(slots), pokemons_hash))
+
+        for t in tree.get_transitions_from(state.id):
+            child_id = t.to_state.id
+            if child_id not in state_index:
+                state_index[child_id] = len(order)
+                order.append(t.to_state)
+            index = action_index.get(id(t.action))
+            if index is None:
+                index = action_index[id(t.action)] = len(actions)
+                actions.append(t.action.to_list())
+            edges.append((state_index[state.id], state_index[child_id], t.probability, t.is_choice, index))
+
+    return pokemons, actions, states, edges
+
+
+def splice_subtree(tree: StateTree, anchor: State, packed: tuple) -> int:
+    """
+    Enxerta uma subárvore compactada (ver pack_subtree) abaixo de um estado da árvore.
+
+    A raiz da subárvore corresponde ao próprio anchor; os demais estados são recriados
+    e inseridos de uma vez com StateTree.add_subtree (IDs novos alocados em bloco).
+    Pokémon iguais aos da raiz reutilizam as instâncias do anchor.
+
+    Returns:
+        Número de estados adicionados
+    """
+    pokemon_keys, action_lists, packed_states, edges = packed
+
+    pokemons: List[Optional[Pokemon]] = [None] * len(pokemon_keys)
+    for slot, index in zip(SLOTS, packed_states[0][4]):
+        if index >= 0 and anchor.pokemons.get(slot) is not None:
+            pokemons[index] = anchor.pokemons[slot]
+    for index, key in enumerate(pokemon_keys):
+        if pokemons[index] is None:
+            pokemons[index] = Pokemon.from_canonical_key(key)
+    actions = [Action.from_list(data) for data in action_lists]
+
+    states = [anchor]
+    for name, turn, weather, battle_type, slots, pokemons_hash in packed_states[1:]:
+        state = State(name=name, turn=turn, battle_type=battle_type)
+        state.set_weather(Weather[weather])
+        state.share_pokemons({slot: pokemons[index] for slot, index in zip(SLOTS, slots) if index >= 0},
+                             pokemons_hash)
+        states.append(state)
+    transitions = [Transition(states[from_index], states[to_index], probability, is_choice, actions[action_index])
+                   for from_index, to_index, probability, is_choice, action_index in edges]
+    return tree.add_subtree(states[1:], transitions)
@@ -0,0 +1,173 @@
+"""
+Solver expectimax sobre uma árvore de estados.
+
+Estados com transições de decisão (Transition.is_choice) são nós de escolha: o jogador
+escolhe a transição de maior valor. Os demais estados com filhos são nós de chance, cujo
+valor é a média dos filhos ponderada pelas probabilidades. Folhas (ou estados no limite de
+profundidade) são avaliados por uma função de avaliação plugável.
+"""
+
+import time
+from typing import Callable, Dict, Optional, Tuple
+from state import State, OUTCOME_SELF_FAINTED, OUTCOME_ENEMY_FAINTED, OUTCOME_BOTH_FAINTED
+from state_tree import StateTree
+from transition import Transition
+
+
+Evaluator = Callable[[State], float]
+
+
+def hp_evaluator(state: State) -> float:
+    """
+    Avalia um estado pela vida dos Pokémon, do ponto de vista do jogador (lado Self).
+
+    Vale 1.0 se só o inimigo foi derrotado, -1.0 se só o jogador foi derrotado, 0.0 se
+    ambos foram. Caso contrário, é a diferença entre a vida média (ponto médio da faixa
+    min-max) dos dois lados, em [-1.0, 1.0].
+    """
+    outcome = state.get_outcome()
+    if outcome == OUTCOME_ENEMY_FAINTED:
+        return 1.0
+    if outcome == OUTCOME_SELF_FAINTED:
+        return -1.0
+    if outcome == OUTCOME_BOTH_FAINTED:
+        return 0.0
+    return (_side_hp(state, ("Self", "Self2")) - _side_hp(state, ("Enemy", "Enemy2"))) / 100.0
+
+
+def _side_hp(state: State, slots: Tuple[str, ...]) -> float:
+    """Vida média (ponto médio da faixa min-max) dos Pokémon em campo de um lado."""
+    pokemons = [state.pokemons[slot] for slot in slots if state.pokemons[slot] is not None]
+    if not pokemons:
+        return 0.0
+    return sum(p.hp_min_percent + p.hp_max_percent for p in pokemons) / (2 * len(pokemons))
+
+
+class _TimeUp(Exception):
+    """Interrompe uma busca quando o orçamento de tempo acaba."""
+
+
+class ExpectimaxSolver:
+    """Resolve uma StateTree escolhendo a melhor decisão em cada nó de escolha."""
+
+    def __init__(self, tree: StateTree, evaluator: Evaluator = hp_evaluator):
+        """
+        Inicializa o solver.
+
+        Args:
+            tree: Árvore a resolver
+            evaluator: Função que avalia folhas e estados no limite de profundidade
+        """
+        self.tree = tree
+        self.evaluator = evaluator
+        # Memoização: (ID do estado, profundidade restante) ->
+        # (valor, melhor transição, se a busca abaixo foi cortada pela profundidade)
+        self._memo: Dict[Tuple, Tuple[float, Optional[Transition], bool]] = {}
+        self._deadline: Optional[float] = None
+        self._cutoff = False
+        self.nodes_searched = 0
+
+    def clear_cache(self) -> None:
+        """Descarta os valores memoizados (necessário depois de editar a árvore)."""
+        self._memo.clear()
+
+    def solve(self, state_id: Optional[int] = None, depth: Optional[int] = None) -> Tuple[float, Optional[Transition]]:
+        """
+        Calcula o valor expectimax de um estado e a melhor decisão nele.
+
+        Cada estado é resolvido uma única vez por profundidade, mesmo quando alcançado por
+        vários caminhos. Estados com o mesmo conteúdo não são confundidos: duplicatas com
+        subárvores diferentes (que merge_duplicates não une) têm valores próprios.
+
+        Args:
+            state_id: Estado de partida (None = raiz)
+            depth: Número máximo de transições a seguir (None = até as folhas)
+
+        Returns:
+            Tupla (valor, melhor transição de decisão ou None se o estado não é de escolha)
+        """
+        state = self.tree.root_state if state_id is None else self.tree.states[state_id]
+        return self._search(state, depth, set())
+
+    def solve_iterative(self, time_budget: float, state_id: Optional[int] = None,
+                        max_depth: Optional[int] = None) -> Tuple[float, Optional[Transition], int]:
+        """
+        Aprofundamento iterativo: resolve com profundidade 1, 2, 3... até esgotar o tempo.
+
+        A profundidade 1 é sempre concluída; uma iteração interrompida pelo tempo é
+        descartada e o resultado da última iteração completa é retornado.
+
+        Args:
+            time_budget: Tempo máximo em segundos
+            state_id: Estado de partida (None = raiz)
+            max_depth: Profundidade máxima (None = sem limite)
+
+        Returns:
+            Tupla (valor, melhor transição, profundidade concluída)
+        """
+        state = self.tree.root_state if state_id is None else self.tree.states[state_id]
+        deadline = time.perf_counter() + time_budget
+        self._cutoff = False
+        value, best = self._search(state, 1, set())
+        depth = 1
+
+        try:
+            self._deadline = deadline
+            # Parar quando uma iteração não foi limitada pela profundidade (resultado exato)
+            while self._cutoff and (max_depth is None or depth < max_depth):
+                self._cutoff = False
+                value, best = self._search(state, depth + 1, set())
+                depth += 1
+        except _TimeUp:
+            pass
+        finally:
+            self._deadline = None
+        return value, best, depth
+
+    def _search(self, state: State, depth: Optional[int], on_path: set) -> Tuple[float, Optional[Transition]]:
+        """Busca recursiva; on_path contém os estados do caminho atual (para ignorar ciclos)."""
+        outgoing = self.tree.get_transitions_from(state.id)
+        if not outgoing:
+            return self.evaluator(state), None
+        if depth == 0:
+            self._cutoff = True
+            return self.evaluator(state), None
+
+        key = (state.id, depth)
+        cached = self._memo.get(key)
+        if cached is not None:
+            if depth is not None and cached[2]:
+                self._cutoff = True
+            return cached[0], cached[1]
+
+        self.nodes_searched += 1
+        if self._deadline is not None and self.nodes_searched % 256 == 0 and time.perf_counter() > self._deadline:
+            raise _TimeUp()
+
+        child_depth = None if depth is None else depth - 1
+        cutoff, self._cutoff = self._cutoff, False
+        on_path.add(state.id)
+        if any(t.is_choice for t in outgoing):
+            best = None
+            value = float("-inf")
+            for t in outgoing:
+                if t.is_choice and t.to_state.id not in on_path:
+                    child_value = self._search(t.to_state, child_depth, on_path)[0]
+                    if child_value > value:
+                        value, best = child_value, t
+            if best is None:
+                value = self.evaluator(state)
+        else:
+            best = None
+            total = 0.0
+            weighted = 0.0
+            for t in outgoing:
+                if t.probability > 0.0 and t.to_state.id not in on_path:
+                    weighted += t.probability * self._search(t.to_state, child_depth, on_path)[0]
+                    total += t.probability
+            value = weighted / total if total > 0.0 else self.evaluator(state)
+        on_path.discard(state.id)
+
+        self._memo[key] = (value, best, self._cutoff)
+        self._cutoff = self._cutoff or cutoff
+        return value, best
@@ -505,13 +505,8 @@ class PokemonStateTreeGUI:
         
         if new_name:
             try:
-                # Determinar o próximo ID
-                all_states = self.tree.get_all_states()
-                new_id = max([s.id for s in all_states], default=0) + 1
-                
-                # Criar novo estado
-                new_state = State(
-                    id=new_id,
+                # Criar novo estado (com um ID da árvore)
+                new_state = self.tree.create_state(
                     name=new_name,
                     turn=turn,
                     battle_type="single"
@@ -618,11 +613,8 @@ class PokemonStateTreeGUI:
         # Herdar battle_type do estado anterior
         new_state = State(turn=next_turn, battle_type=self.selected_state.battle_type)
         
-        # Copiar Pokémon do estado anterior como ponto de partida (default)
-        for slot in ["Self", "Enemy", "Self2", "Enemy2"]:
-            pokemon = self.selected_state.get_pokemon(slot)
-            if pokemon:
-                new_state.add_pokemon(slot, pokemon)
+        # Compartilhar Pokémon do estado anterior como ponto de partida (copy-on-write)
+        new_state.share_pokemons_from(self.selected_state)
         
         if self.tree.add_state(new_state):
             # Criar transição automática
@@ -671,11 +663,8 @@ class PokemonStateTreeGUI:
             new_state = State(name=state_name, turn=self.selected_state.turn, 
                             battle_type=battle_type_var.get())
             
-            # Copiar Pokémon do estado atual como default
-            for slot in ["Self", "Enemy", "Self2", "Enemy2"]:
-                pokemon = self.selected_state.get_pokemon(slot)
-                if pokemon:
-                    new_state.add_pokemon(slot, pokemon)
+            # Compartilhar Pokémon do estado atual como default (copy-on-write)
+            new_state.share_pokemons_from(self.selected_state)
             
             if not self.tree.add_state(new_state):
                 messagebox.showerror("Error", "Could not add state")
@@ -795,7 +784,6 @@ class PokemonStateTreeGUI:
         
         # Reset da árvore
         State.reset_turn_counter()
-        State.reset_id_counter()
         
         initial_state = State(battle_type=self.selected_trainer.battle_type)
         self.tree = StateTree(initial_state)
@@ -958,7 +946,10 @@ class PokemonStateTreeGUI:
         
         transitions = self.tree.get_transitions_from(self.selected_state.id)
         for trans in transitions:
-            text = f"{trans.to_state.name} (prob: {trans.probability:.1%})"
+            if trans.is_choice:
+                text = f"{trans.to_state.name} (choice)"
+            else:
+                text = f"{trans.to_state.name} (prob: {trans.probability:.1%})"
             self.transitions_listbox.insert(tk.END, text)
     
     def add_transition_dialog(self) -> None:
@@ -969,7 +960,7 @@ class PokemonStateTreeGUI:
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Add Transition")
-        dialog.geometry("400x200")
+        dialog.geometry("400x240")
         
         ttk.Label(dialog, text="To State:").pack(padx=10, pady=5)
         to_states = [s.name for s in self.tree.get_all_states() if s.id != self.selected_state.id]
@@ -981,6 +972,9 @@ class PokemonStateTreeGUI:
         prob_entry.insert(0, "1.0")
         prob_entry.pack(padx=10, pady=5)
         
+        choice_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(dialog, text="Player choice", variable=choice_var).pack(padx=10, pady=5)
+        
         def add():
             to_state_name = to_var.get()
             to_state = next((s for s in self.tree.get_all_states() if s.name == to_state_name), None)
@@ -995,7 +989,7 @@ class PokemonStateTreeGUI:
                 messagebox.showerror("Error", "Invalid probability")
                 return
             
-            transition = Transition(self.selected_state, to_state, prob)
+            transition = Transition(self.selected_state, to_state, prob, is_choice=choice_var.get())
             self.tree.add_transition(transition)
             self.tree.auto_adjust_probabilities(self.selected_state.id)
             
@@ -1031,7 +1025,7 @@ class PokemonStateTreeGUI:
         
         dialog = tk.Toplevel(self.root)
         dialog.title("Edit Transition")
-        dialog.geometry("300x150")
+        dialog.geometry("300x190")
         
         ttk.Label(dialog, text=f"From: {trans.from_state.name}").pack(padx=10, pady=5)
         ttk.Label(dialog, text=f"To: {trans.to_state.name}").pack(padx=10, pady=5)
@@ -1041,12 +1035,18 @@ class PokemonStateTreeGUI:
         prob_entry.insert(0, str(trans.probability))
         prob_entry.pack(padx=10, pady=5)
         
+        choice_var = tk.BooleanVar(value=trans.is_choice)
+        ttk.Checkbutton(dialog, text="Player choice", variable=choice_var).pack(padx=10, pady=5)
+        
         def update():
             try:
-                trans.probability = float(prob_entry.get())
-                self.tree.auto_adjust_probabilities(self.selected_state.id)
+                probability = float(prob_entry.get())
+                trans.is_choice = choice_var.get()
+                changes = self.tree.update_transition_probability(trans, probability)
                 self.refresh_state_editor()
-                self.status_var.set("Transition updated")
+                summary = ", ".join(f"{outcome} {delta:+.1%}" for outcome, delta in changes.items()
+                                    if abs(delta) >= 0.0005)
+                self.status_var.set(f"Transition updated ({summary})" if summary else "Transition updated")
                 dialog.destroy()
             except ValueError:
                 messagebox.showerror("Error", "Invalid probability")
@@ -1334,7 +1334,9 @@ class PokemonStateTreeGUI:
                 data["transitions"].append({
                     "from": trans.from_state.id,
                     "to": trans.to_state.id,
-                    "probability": trans.probability
+                    "probability": trans.probability,
+                    "is_choice": trans.is_choice,
+                    "action": trans.action.to_list()
                 })
             
             # Salvar Box
@@ -1382,7 +1384,6 @@ class PokemonStateTreeGUI:
                 data = json.load(f)
             
             # Limpar estruturas
-            State.reset_id_counter()
             State.reset_turn_counter()
             self.tree = StateTree(State())
             self.box = Box("Main Box")
@@ -1410,13 +1411,16 @@ class PokemonStateTreeGUI:
                 state.set_weather(Weather[state_data.get("weather", "NONE").upper().replace(" ", "_")])
                 state_map[state_data["id"]] = state
             
-            # Carregar Transições
-            for trans_data in data.get("transitions", []):
-                from_state = state_map.get(trans_data["from"])
-                to_state = state_map.get(trans_data["to"])
-                if from_state and to_state:
-                    trans = Transition(from_state, to_state, trans_data.get("probability", 1.0))
-                    self.tree.add_transition(trans)
+            # Carregar Transições (probabilidades salvas são mantidas, sem renormalizar)
+            with self.tree.batch(normalize=False):
+                for trans_data in data.get("transitions", []):
+                    from_state = state_map.get(trans_data["from"])
+                    to_state = state_map.get(trans_data["to"])
+                    if from_state and to_state:
+                        trans = Transition(from_state, to_state, trans_data.get("probability", 1.0),
+                                           is_choice=trans_data.get("is_choice", False))
+                        trans.action = Action.from_list(trans_data.get("action", []))
+                        self.tree.add_transition(trans)
             
             # Carregar Enemy Library
             for trainer_name, pokemons_data in data.get("enemy_library", {}).items():
@@ -0,0 +1,145 @@
+"""
+Cadeia de Markov absorvente construída a partir de uma árvore de estados.
+
+Cada estado vira uma linha de uma matriz de transição esparsa (formato CSR). As folhas
+são estados absorventes, classificados pelo desfecho (ver State.get_outcome); os demais
+são transientes. O solver calcula, para todo estado, a probabilidade de terminar em cada
+desfecho, com um custo linear no número de transições.
+"""
+
+from array import array
+from typing import Dict, List
+from state import OUTCOMES
+from state_tree import StateTree
+
+
+class AbsorbingChain:
+    """Matriz de transição esparsa de uma StateTree e as probabilidades de absorção."""
+
+    def __init__(self, tree: StateTree):
+        """
+        Monta a matriz esparsa a partir da árvore.
+
+        Args:
+            tree: Árvore (ou DAG, depois de fundir estados) de origem
+        """
+        self.state_ids: List[int] = self._solve_order(tree)
+        self.index: Dict[int, int] = {state_id: i for i, state_id in enumerate(self.state_ids)}
+
+        # Linhas em formato CSR: as transições do estado i ocupam row_start[i]:row_start[i + 1]
+        self.row_start = array("q", [0])
+        self.columns = array("q")
+        self.probabilities = array("d")
+        # Índice do desfecho de cada estado absorvente (-1 nos transientes)
+        self.absorbing = array("b")
+
+        outcome_index = {outcome: i for i, outcome in enumerate(OUTCOMES)}
+        for state_id in self.state_ids:
+            outgoing = tree.get_transitions_from(state_id)
+            if outgoing:
+                self.absorbing.append(-1)
+                for t in outgoing:
+                    self.columns.append(self.index[t.to_state.id])
+                    self.probabilities.append(t.probability)
+            else:
+                self.absorbing.append(outcome_index[tree.states[state_id].get_outcome()])
+            self.row_start.append(len(self.columns))
+
+        # Probabilidades de absorção: uma coluna por desfecho, indexada pelo estado
+        self._absorption: List[array] = []
+
+    @staticmethod
+    def _solve_order(tree: StateTree) -> List[int]:
+        """
+        Ordena os estados dos filhos para os pais (pós-ordem de uma busca em profundidade).
+
+        Em um DAG, processar nessa ordem resolve o sistema em uma única passada.
+        """
+        order = []
+        visited = set()
+        roots = [tree.root_state.id] + [state_id for state_id in tree.states if state_id != tree.root_state.id]
+        for root_id in roots:
+            if root_id in visited:
+                continue
+            visited.add(root_id)
+            stack = [(root_id, iter(tree.get_transitions_from(root_id)))]
+            while stack:
+                state_id, outgoing = stack[-1]
+                t = next(outgoing, None)
+                if t is None:
+                    stack.pop()
+                    order.append(state_id)
+                    continue
+                child_id = t.to_state.id
+                if child_id not in visited:
+                    visited.add(child_id)
+                    stack.append((child_id, iter(tree.get_transitions_from(child_id))))
+        return order
+
+    def solve(self, tolerance: float = 1e-12, max_iterations: int = 1000) -> int:
+        """
+        Calcula as probabilidades de absorção de todos os estados.
+
+        Usa varreduras de Gauss-Seidel na ordem filhos-antes-dos-pais: em um DAG a primeira
+        varredura já é exata e a segunda só confirma a convergência; ciclos (se existirem)
+        convergem nas varreduras seguintes. Massa de probabilidade não atribuída (transições
+        de saída que somam menos de 1) não é redistribuída.
+
+        Args:
+            tolerance: Maior variação aceita entre duas varreduras
+            max_iterations: Número máximo de varreduras
+
+        Returns:
+            Número de varreduras realizadas
+        """
+        size = len(self.state_ids)
+        absorption = [array("d", bytes(8 * size)) for _ in OUTCOMES]
+        for i, outcome in enumerate(self.absorbing):
+            if outcome >= 0:
+                absorption[outcome][i] = 1.0
+
+        row_start, columns, probabilities = self.row_start, self.columns, self.probabilities
+        transient = [i for i in range(size) if self.absorbing[i] < 0]
+        iterations = 0
+        while iterations < max_iterations:
+            iterations += 1
+            change = 0.0
+            for column in absorption:
+                for i in transient:
+                    value = 0.0
+                    for k in range(row_start[i], row_start[i + 1]):
+                        value += probabilities[k] * column[columns[k]]
+                    delta = abs(value - column[i])
+                    if delta > change:
+                        change = delta
+                    column[i] = value
+            if change <= tolerance:
+                break
+
+        self._absorption = absorption
+        return iterations
+
+    def get_absorption_probabilities(self, state_id: int) -> Dict[str, float]:
+        """
+        Retorna a probabilidade de, partindo de um estado, terminar em cada desfecho.
+
+        Args:
+            state_id: ID do estado de partida
+
+        Returns:
+            Dicionário desfecho -> probabilidade
+        """
+        if not self._absorption:
+            self.solve()
+        i = self.index[state_id]
+        return {outcome: column[i] for outcome, column in zip(OUTCOMES, self._absorption)}
+
+    def get_all_absorption_probabilities(self) -> Dict[int, Dict[str, float]]:
+        """Retorna as probabilidades de absorção de todos os estados (state_id -> desfecho -> probabilidade)."""
+        if not self._absorption:
+            self.solve()
+        return {state_id: {outcome: column[i] for outcome, column in zip(OUTCOMES, self._absorption)}
+                for i, state_id in enumerate(self.state_ids)}
+
+    def __repr__(self) -> str:
+        return f"AbsorbingChain(states={len(self.state_ids)}, transitions={len(self.columns)})"
@@ -0,0 +1,238 @@
+"""
+Codificação compacta de estados em inteiros.
+
+Cada slot de Pokémon é codificado em um inteiro: os 64 bits baixos guardam a batalha
+(espécie, faixa de vida, status, mega e os 8 estágios de stats) e os bits acima deles
+guardam o índice do item. Um estado inteiro vira uma tupla pequena de inteiros
+(cabeçalho + 4 slots), barata de comparar e de usar como chave de dicionário.
+
+Espécies de POKEMON_LIST têm códigos fixos, mas itens e espécies fora da lista recebem
+códigos na ordem em que aparecem em cada processo. Para enviar estados codificados a
+outro processo, envie também get_name_tables() e converta-os no destino com
+translate_packed.
+
+Layout dos 64 bits baixos de um slot:
+    bit  0       presente (0 = slot vazio; nesse caso o código inteiro é 0)
+    bit  1       mega
+    bits 2-12    espécie (ID de pokemon_data)
+    bits 13-19   vida mínima (0-100)
+    bits 20-26   vida máxima (0-100)
+    bits 27-29   status principal
+    bits 30-31   status secundário
+    bits 32-63   estágios de stats (mesmo empacotamento de Pokemon._stages)
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+from pokemon import Pokemon, MajorStatus, MinorStatus
+from pokemon_data import POKEMON_LIST, SPECIES_ID
+from state import State, Weather, SLOTS
+
+
+PackedState = Tuple[int, ...]
+
+SPECIES_BITS = 11
+HP_BITS = 7
+MAJOR_BITS = 3
+MINOR_BITS = 2
+
+MEGA_SHIFT = 1
+SPECIES_SHIFT = 2
+HP_MIN_SHIFT = SPECIES_SHIFT + SPECIES_BITS
+HP_MAX_SHIFT = HP_MIN_SHIFT + HP_BITS
+MAJOR_SHIFT = HP_MAX_SHIFT + HP_BITS
+MINOR_SHIFT = MAJOR_SHIFT + MAJOR_BITS
+STAGES_SHIFT = 32
+ITEM_SHIFT = 64
+
+SPECIES_MASK = (1 << SPECIES_BITS) - 1
+HP_MASK = (1 << HP_BITS) - 1
+MAJOR_MASK = (1 << MAJOR_BITS) - 1
+MINOR_MASK = (1 << MINOR_BITS) - 1
+STAGES_MASK = (1 << 32) - 1
+
+MAJOR_STATUSES = list(MajorStatus)
+MINOR_STATUSES = list(MinorStatus)
+MAJOR_CODES = {status: i for i, status in enumerate(MAJOR_STATUSES)}
+MINOR_CODES = {status: i for i, status in enumerate(MINOR_STATUSES)}
+WEATHERS = list(Weather)
+WEATHER_CODES = {weather: i for i, weather in enumerate(WEATHERS)}
+BATTLE_TYPES = ["single", "double"]
+
+# Espécies fora de POKEMON_LIST e itens recebem índices na ordem em que aparecem.
+# Esses índices só valem neste processo; espécies de POKEMON_LIST têm IDs fixos.
+_species_names: List[str] = list(POKEMON_LIST)
+_extra_species: Dict[str, int] = {}
+_item_names: List[Optional[str]] = [None]
+_item_codes: Dict[Optional[str], int] = {None: 0}
+# Bits fixos (presente, mega, espécie, item) por (espécie, item, mega)
+_identity_codes: Dict[Tuple, int] = {}
+
+
+def _species_code(name: str) -> int:
+    """Retorna o código de uma espécie (o ID de pokemon_data, se existir)."""
+    code = SPECIES_ID.get(name.lower())
+    if code is not None and _species_names[code] == name:
+        return code
+    code = _extra_species.get(name)
+    if code is None:
+        code = _extra_species[name] = len(_species_names)
+        if code > SPECIES_MASK:
+            raise ValueError(f"Too many species to encode: {name}")
+        _species_names.append(name)
+    return code
+
+
+def _item_code(item: Optional[str]) -> int:
+    """Retorna o código de um item (0 = sem item)."""
+    code = _item_codes.get(item)
+    if code is None:
+        code = _item_codes[item] = len(_item_names)
+        _item_names.append(item)
+    return code
+
+
+def encode_pokemon(pokemon: Optional[Pokemon]) -> int:
+    """
+    Codifica um Pokémon (ou um slot vazio) em um inteiro.
+
+    Args:
+        pokemon: Pokémon a codificar, ou None
+
+    Returns:
+        Código do slot (0 para slot vazio)
+    """
+    if pokemon is None:
+        return 0
+    identity = _identity_codes.get((pokemon.name, pokemon.item, pokemon.is_mega))
+    if identity is None:
+        identity = _identity_codes[(pokemon.name, pokemon.item, pokemon.is_mega)] = (
+            1
+            | pokemon.is_mega << MEGA_SHIFT
+            | _species_code(pokemon.name) << SPECIES_SHIFT
+            | _item_code(pokemon.item) << ITEM_SHIFT)
+    return (identity
+            | pokemon.hp_min_percent << HP_MIN_SHIFT
+            | pokemon.hp_max_percent << HP_MAX_SHIFT
+            | MAJOR_CODES[pokemon.major_status] << MAJOR_SHIFT
+            | MINOR_CODES[pokemon.minor_status] << MINOR_SHIFT
+            | pokemon._stages << STAGES_SHIFT)
+
+
+def decode_pokemon(code: int) -> Optional[Pokemon]:
+    """
+    Recria um Pokémon a partir do seu código.
+
+    Args:
+        code: Código retornado por encode_pokemon
+
+    Returns:
+        Novo Pokémon, ou None para slot vazio
+    """
+    if not code & 1:
+        return None
+    pokemon = Pokemon(_species_names[code >> SPECIES_SHIFT & SPECIES_MASK],
+                      item=_item_names[code >> ITEM_SHIFT],
+                      is_mega=bool(code >> MEGA_SHIFT & 1))
+    pokemon.hp_min_percent = code >> HP_MIN_SHIFT & HP_MASK
+    pokemon.hp_max_percent = code >> HP_MAX_SHIFT & HP_MASK
+    pokemon.major_status = MAJOR_STATUSES[code >> MAJOR_SHIFT & MAJOR_MASK]
+    pokemon.minor_status = MINOR_STATUSES[code >> MINOR_SHIFT & MINOR_MASK]
+    pokemon._stages = code >> STAGES_SHIFT & STAGES_MASK
+    return pokemon
+
+
+def pack_state(state: State) -> PackedState:
+    """
+    Codifica o conteúdo de batalha de um estado em uma tupla de inteiros.
+
+    O cabeçalho guarda turno, clima e tipo de batalha; em seguida vêm os códigos dos
+    slots na ordem de SLOTS. ID e nome do estado não fazem parte do conteúdo.
+
+    Args:
+        state: Estado a codificar
+
+    Returns:
+        Tupla (cabeçalho, Self, Enemy, Self2, Enemy2)
+    """
+    header = state.turn << 3 | WEATHER_CODES[state.weather] << 1 | (state.battle_type == "double")
+    pokemons = state.pokemons
+    return (header,
+            encode_pokemon(pokemons["Self"]),
+            encode_pokemon(pokemons["Enemy"]),
+            encode_pokemon(pokemons["Self2"]),
+            encode_pokemon(pokemons["Enemy2"]))
+
+
+def unpack_state(packed: PackedState, name: str = None) -> State:
+    """
+    Recria um estado (sem ID, ver StateTree.add_state) a partir da sua codificação.
+
+    Args:
+        packed: Tupla retornada por pack_state
+        name: Nome do estado (None = nome padrão do turno)
+
+    Returns:
+        Novo estado
+    """
+    header = packed[0]
+    state = State(name=name, turn=header >> 3, battle_type=BATTLE_TYPES[header & 1])
+    state.set_weather(WEATHERS[header >> 1 & 3])
+    for slot, code in zip(SLOTS, packed[1:]):
+        if code:
+            state.share_pokemon(slot, decode_pokemon(code))
+    return state
+
+
+def get_name_tables() -> Tuple[Tuple[str, ...], Tuple[Optional[str], ...]]:
+    """
+    Retorna as tabelas de nomes deste processo, para acompanhar estados codificados.
+
+    Deve ser chamada depois de codificar os estados, para incluir todos os nomes usados.
+
+    Returns:
+        Tupla (espécies fora de POKEMON_LIST, itens), na ordem dos seus códigos
+    """
+    return tuple(_species_names[len(POKEMON_LIST):]), tuple(_item_names)
+
+
+def translate_packed(packed_states: Iterable[PackedState],
+                     tables: Tuple[Tuple[str, ...], Tuple[Optional[str], ...]]) -> List[PackedState]:
+    """
+    Converte estados codificados em outro processo para os códigos deste processo.
+
+    Args:
+        packed_states: Estados codificados no processo de origem
+        tables: get_name_tables() do processo de origem
+
+    Returns:
+        Os mesmos estados, com os códigos de espécie e item deste processo
+    """
+    extra_species, item_names = tables
+    base = len(POKEMON_LIST)
+    species_map = {base + i: _species_code(name) for i, name in enumerate(extra_species)}
+    item_map = {i: _item_code(item) for i, item in enumerate(item_names)}
+    identity_mask = ~(SPECIES_MASK << SPECIES_SHIFT) & ((1 << ITEM_SHIFT) - 1)
+
+    translated = []
+    for packed in packed_states:
+        slots = []
+        for code in packed[1:]:
+            if code:
+                species = code >> SPECIES_SHIFT & SPECIES_MASK
+                species = species_map.get(species, species)
+                code = (code & identity_mask | species << SPECIES_SHIFT
+                        | item_map[code >> ITEM_SHIFT] << ITEM_SHIFT)
+            slots.append(code)
+        translated.append((packed[0], *slots))
+    return translated
+
+
+def packed_turn(packed: PackedState) -> int:
+    """Retorna o turno de um estado codificado, sem decodificá-lo."""
+    return packed[0] >> 3
+
+
+def packed_hp(packed: PackedState, slot: str) -> Tuple[int, int]:
+    """Retorna a faixa de vida (mínima, máxima) de um slot de um estado codificado, sem decodificá-lo."""
+    code = packed[1 + SLOTS.index(slot)]
+    return code >> HP_MIN_SHIFT & HP_MASK, code >> HP_MAX_SHIFT & HP_MASK
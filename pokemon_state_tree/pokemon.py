@@ -1,5 +1,5 @@
 from enum import Enum
-from typing import Optional
+from typing import Dict, Optional
 
 
 class MajorStatus(Enum):
@@ -27,6 +27,15 @@ class Pokemon:
     STAT_MIN = -6
     STAT_MAX = 6
 
+    # Cada estágio ocupa 4 bits de um inteiro (valor + 6, de 0 a 12), na ordem de STAT_NAMES
+    STAT_BITS = 4
+    STAT_MASK = (1 << STAT_BITS) - 1
+    STAT_SHIFT = dict(zip(STAT_NAMES, range(0, len(STAT_NAMES) * STAT_BITS, STAT_BITS)))
+    NEUTRAL_STAGES = 0x66666666  # Todos os 8 estágios em 0
+
+    __slots__ = ("name", "item", "is_mega", "hp_min_percent", "hp_max_percent",
+                 "major_status", "minor_status", "_stages", "_shared")
+
     def __init__(self, name: str, item: Optional[str] = None, is_mega: bool = False):
         """
         Inicializa um Pokémon.
@@ -44,17 +53,23 @@ class Pokemon:
         self.major_status = MajorStatus.NONE
         self.minor_status = MinorStatus.NONE
         
-        # Stats inicializados em 0 (sem modificação)
-        self.stats = {
-            "HP": 0,
-            "ATK": 0,
-            "DEF": 0,
-            "SATK": 0,
-            "SDEF": 0,
-            "SPE": 0,
-            "ACC": 0,
-            "EVA": 0
-        }
+        # Stats inicializados em 0 (sem modificação), empacotados em um único inteiro
+        self._stages = Pokemon.NEUTRAL_STAGES
+        
+        # Marcado quando a instância é compartilhada entre estados (copy-on-write)
+        self._shared = False
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Retorna um dicionário (cópia) com os estágios de todos os stats."""
+        return {stat: self.get_stat(stat) for stat in self.STAT_NAMES}
+
+    @stats.setter
+    def stats(self, values: Dict[str, int]) -> None:
+        """Define os estágios a partir de um dicionário stat -> valor."""
+        self._stages = Pokemon.NEUTRAL_STAGES
+        for stat, value in values.items():
+            self.set_stat(stat, value)
 
     def set_hp_range(self, min_percent: int, max_percent: int) -> None:
         """
@@ -90,21 +105,24 @@ class Pokemon:
         Returns:
             True se o stat foi definido com sucesso, False caso contrário
         """
-        if stat_name not in self.stats:
+        shift = self.STAT_SHIFT.get(stat_name)
+        if shift is None:
             return False
         
-        value = max(self.STAT_MIN, min(self.STAT_MAX, value))
-        self.stats[stat_name] = value
+        value = max(self.STAT_MIN, min(self.STAT_MAX, int(value)))
+        self._stages = (self._stages & ~(self.STAT_MASK << shift)) | ((value - self.STAT_MIN) << shift)
         return True
 
     def get_stat(self, stat_name: str) -> Optional[int]:
         """Obtém o valor de um stat."""
-        return self.stats.get(stat_name)
+        shift = self.STAT_SHIFT.get(stat_name)
+        if shift is None:
+            return None
+        return ((self._stages >> shift) & self.STAT_MASK) + self.STAT_MIN
 
     def reset_stats(self) -> None:
         """Reseta todos os stats para 0."""
-        for stat in self.stats:
-            self.stats[stat] = 0
+        self._stages = Pokemon.NEUTRAL_STAGES
 
     def reset_status(self) -> None:
         """Reseta todos os status."""
@@ -124,6 +142,28 @@ class Pokemon:
         """Define o status de Mega Evolução."""
         self.is_mega = is_mega
 
+    def canonical_key(self) -> tuple:
+        """
+        Retorna uma tupla que identifica a situação de batalha do Pokémon.
+        
+        Dois Pokémon com a mesma chave são indistinguíveis para a árvore de estados
+        (mesma espécie, item, mega, faixa de vida, status e estágios de stats).
+        """
+        return (self.name, self.item, self.is_mega, self.hp_min_percent, self.hp_max_percent,
+                self.major_status, self.minor_status, self._stages)
+
+    @staticmethod
+    def from_canonical_key(key: tuple) -> "Pokemon":
+        """Recria um Pokémon a partir de uma tupla retornada por canonical_key()."""
+        name, item, is_mega, hp_min, hp_max, major_status, minor_status, stages = key
+        pokemon = Pokemon(name, item=item, is_mega=is_mega)
+        pokemon.hp_min_percent = hp_min
+        pokemon.hp_max_percent = hp_max
+        pokemon.major_status = major_status
+        pokemon.minor_status = minor_status
+        pokemon._stages = stages
+        return pokemon
+
     def __repr__(self) -> str:
         mega_text = " (Mega)" if self.is_mega else ""
         item_text = f" @ {self.item}" if self.item else ""
@@ -136,5 +176,5 @@ class Pokemon:
         new_pokemon.hp_max_percent = self.hp_max_percent
         new_pokemon.major_status = self.major_status
         new_pokemon.minor_status = self.minor_status
-        new_pokemon.stats = self.stats.copy()
+        new_pokemon._stages = self._stages
         return new_pokemon
@@ -1,7 +1,14 @@
 """
 Lista completa de Pokémon das gerações 1-8 com variações (Mega, Alola, Galar, etc).
+
+Também dá acesso à tabela de espécies (stats base e tipos), guardada em um arquivo
+binário de colunas de largura fixa e carregada só no primeiro uso.
 """
 
+import os
+import struct
+from array import array
+
 # Lista completa de Pokémon com variações
 POKEMON_LIST = [
     # Generation 1
@@ -457,6 +464,145 @@ POKEMON_LIST = [
 # Dicionário para busca rápida
 POKEMON_DICT = {name.lower(): name for name in POKEMON_LIST}
 
+# ID de cada espécie: posição (da primeira ocorrência) em POKEMON_LIST
+SPECIES_ID = {}
+for _species_id, _name in enumerate(POKEMON_LIST):
+    SPECIES_ID.setdefault(_name.lower(), _species_id)
+del _species_id, _name
+
+
+def get_species_id(name: str):
+    """Retorna o ID (posição em POKEMON_LIST) de uma espécie, ou None se o nome não existe."""
+    return SPECIES_ID.get(name.lower())
+
+
+# ==================== TABELA DE ESPÉCIES ====================
+
+# Tipos na ordem da tabela de efetividade; o código de um tipo é sua posição
+TYPES = ("Normal", "Fire", "Water", "Electric", "Grass", "Ice", "Fighting", "Poison", "Ground",
+         "Flying", "Psychic", "Bug", "Rock", "Ghost", "Dragon", "Dark", "Steel", "Fairy")
+TYPE_ID = {name: i for i, name in enumerate(TYPES)}
+NO_TYPE = 255  # Segundo tipo de espécies de tipo único
+
+BASE_STATS = ("HP", "ATK", "DEF", "SATK", "SDEF", "SPE")
+
+SPECIES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "species_data.bin")
+# Cabeçalho: identificador, versão e número de espécies; em seguida as colunas
+_SPECIES_HEADER = struct.Struct("<4sHH")
+_SPECIES_MAGIC = b"PSTB"
+_SPECIES_VERSION = 1
+
+
+class SpeciesTable:
+    """
+    Stats base e tipos de todas as espécies, em colunas indexadas pelo ID da espécie.
+
+    Cada espécie ocupa 6 bytes de stats base (na ordem de BASE_STATS) e 2 bytes de tipos
+    (códigos de TYPES, NO_TYPE no segundo tipo de espécies de tipo único). Formas Mega e
+    regionais são entradas próprias de POKEMON_LIST e, portanto, linhas próprias. Espécies
+    sem dados têm todos os stats iguais a 0.
+    """
+
+    __slots__ = ("base_stats", "types")
+
+    def __init__(self, base_stats: array = None, types: array = None):
+        """Cria uma tabela (vazia, se as colunas não forem informadas)."""
+        self.base_stats = base_stats if base_stats is not None else array("B", bytes(6 * len(POKEMON_LIST)))
+        self.types = types if types is not None else array("B", [NO_TYPE] * (2 * len(POKEMON_LIST)))
+
+    def __len__(self) -> int:
+        return len(self.types) // 2
+
+    def has_data(self, species_id: int) -> bool:
+        """Verifica se a tabela tem os dados de uma espécie."""
+        return self.base_stats[6 * species_id] != 0
+
+    def get_base_stats(self, species_id: int) -> tuple:
+        """Retorna os stats base (HP, ATK, DEF, SATK, SDEF, SPE) de uma espécie."""
+        return tuple(self.base_stats[6 * species_id:6 * species_id + 6])
+
+    def get_type_ids(self, species_id: int) -> tuple:
+        """Retorna os códigos dos tipos de uma espécie (1 ou 2 códigos)."""
+        first, second = self.types[2 * species_id], self.types[2 * species_id + 1]
+        return (first,) if second == NO_TYPE else (first, second)
+
+    def get_types(self, species_id: int) -> tuple:
+        """Retorna os nomes dos tipos de uma espécie."""
+        return tuple(TYPES[code] for code in self.get_type_ids(species_id))
+
+    def set_species(self, species_id: int, base_stats, types) -> None:
+        """
+        Define os dados de uma espécie.
+
+        Args:
+            species_id: ID da espécie
+            base_stats: 6 stats base na ordem de BASE_STATS (1-255)
+            types: 1 ou 2 nomes de tipos
+        """
+        if len(base_stats) != 6 or not all(1 <= value <= 255 for value in base_stats):
+            raise ValueError(f"Invalid base stats: {base_stats}")
+        if not 1 <= len(types) <= 2:
+            raise ValueError(f"Invalid types: {types}")
+        self.base_stats[6 * species_id:6 * species_id + 6] = array("B", base_stats)
+        self.types[2 * species_id] = TYPE_ID[types[0]]
+        self.types[2 * species_id + 1] = TYPE_ID[types[1]] if len(types) == 2 else NO_TYPE
+
+    def to_bytes(self) -> bytes:
+        """Serializa a tabela no formato de SPECIES_FILE."""
+        return (_SPECIES_HEADER.pack(_SPECIES_MAGIC, _SPECIES_VERSION, len(self))
+                + self.base_stats.tobytes() + self.types.tobytes())
+
+    @staticmethod
+    def from_bytes(data: bytes) -> "SpeciesTable":
+        """Recria uma tabela a partir de SpeciesTable.to_bytes."""
+        magic, version, count = _SPECIES_HEADER.unpack_from(data)
+        if magic != _SPECIES_MAGIC or version != _SPECIES_VERSION:
+            raise ValueError("Not a species table file")
+        if count != len(POKEMON_LIST):
+            raise ValueError(f"Species table has {count} species, expected {len(POKEMON_LIST)}: rebuild it")
+        offset = _SPECIES_HEADER.size
+        base_stats = array("B", data[offset:offset + 6 * count])
+        types = array("B", data[offset + 6 * count:offset + 8 * count])
+        return SpeciesTable(base_stats, types)
+
+
+_species_table = None
+
+
+def get_species_table() -> SpeciesTable:
+    """
+    Retorna a tabela de espécies, carregando SPECIES_FILE no primeiro uso.
+
+    O arquivo é gerado por build_species_data.py a partir de species_data.csv e vem com
+    o projeto; sem ele, a tabela fica vazia (nenhuma espécie tem dados).
+    """
+    global _species_table
+    if _species_table is None:
+        if os.path.exists(SPECIES_FILE):
+            with open(SPECIES_FILE, "rb") as f:
+                _species_table = SpeciesTable.from_bytes(f.read())
+        else:
+            _species_table = SpeciesTable()
+    return _species_table
+
+
+def get_base_stats(name: str):
+    """Retorna os stats base (HP, ATK, DEF, SATK, SDEF, SPE) de uma espécie, ou None se não há dados."""
+    species_id = SPECIES_ID.get(name.lower())
+    table = get_species_table()
+    if species_id is None or not table.has_data(species_id):
+        return None
+    return table.get_base_stats(species_id)
+
+
+def get_types(name: str):
+    """Retorna os tipos de uma espécie, ou None se não há dados."""
+    species_id = SPECIES_ID.get(name.lower())
+    table = get_species_table()
+    if species_id is None or not table.has_data(species_id):
+        return None
+    return table.get_types(species_id)
+
 
 def get_pokemon_list() -> list:
     """Retorna a lista de Pokémon base (sem variantes Mega, Alola, Galar, etc)."""
@@ -0,0 +1,116 @@
+"""
+Tabelas de multiplicadores dos estágios de stats (-6 a +6).
+
+Os multiplicadores são frações inteiras pré-calculadas, indexadas pelo código do estágio
+usado em Pokemon._stages (estágio + 6, de 0 a 12), então aplicar um estágio é uma
+indexação e uma multiplicação/divisão inteira, sem conta de ponto flutuante:
+
+    stats de batalha (ATK, DEF, SATK, SDEF, SPE): tabela 2/2 (ex: +1 = 3/2, -2 = 2/4)
+    precisão e evasão (ACC, EVA): tabela 3/3 (ex: +1 = 4/3, -2 = 3/5)
+"""
+
+from typing import Dict, List, Sequence, Tuple
+from pokemon import Pokemon
+
+
+BATTLE_STATS = ("ATK", "DEF", "SATK", "SDEF", "SPE")
+
+# Numeradores e denominadores indexados pelo código do estágio (estágio + 6)
+_STAGES = range(Pokemon.STAT_MIN, Pokemon.STAT_MAX + 1)
+STAT_NUMERATORS = tuple(max(2, 2 + stage) for stage in _STAGES)
+STAT_DENOMINATORS = tuple(max(2, 2 - stage) for stage in _STAGES)
+ACCURACY_NUMERATORS = tuple(max(3, 3 + stage) for stage in _STAGES)
+ACCURACY_DENOMINATORS = tuple(max(3, 3 - stage) for stage in _STAGES)
+
+_STAT_SHIFT = Pokemon.STAT_SHIFT
+_STAT_MASK = Pokemon.STAT_MASK
+_STAGE_OFFSET = -Pokemon.STAT_MIN
+
+
+def stat_multiplier(stage: int) -> Tuple[int, int]:
+    """Retorna o multiplicador de um estágio de stat de batalha como fração (numerador, denominador)."""
+    code = stage + _STAGE_OFFSET
+    return STAT_NUMERATORS[code], STAT_DENOMINATORS[code]
+
+
+def accuracy_multiplier(stage: int) -> Tuple[int, int]:
+    """Retorna o multiplicador de um estágio de precisão/evasão como fração (numerador, denominador)."""
+    code = stage + _STAGE_OFFSET
+    return ACCURACY_NUMERATORS[code], ACCURACY_DENOMINATORS[code]
+
+
+def apply_stage(stat: int, stage: int) -> int:
+    """Aplica um estágio (-6 a +6) a um stat de batalha, com arredondamento para baixo."""
+    code = stage + _STAGE_OFFSET
+    return stat * STAT_NUMERATORS[code] // STAT_DENOMINATORS[code]
+
+
+def effective_stats(pokemon: Pokemon, stats: Dict[str, int]) -> Dict[str, int]:
+    """
+    Aplica os estágios de um Pokémon aos seus stats de batalha.
+
+    Os estágios são lidos direto do inteiro empacotado (Pokemon._stages).
+
+    Args:
+        pokemon: Pokémon com os estágios
+        stats: Stats sem estágios (HP e stats ausentes de BATTLE_STATS são copiados)
+
+    Returns:
+        Novo dicionário de stats com os estágios aplicados
+    """
+    packed = pokemon._stages
+    result = dict(stats)
+    for stat in BATTLE_STATS:
+        if stat in stats:
+            code = packed >> _STAT_SHIFT[stat] & _STAT_MASK
+            result[stat] = stats[stat] * STAT_NUMERATORS[code] // STAT_DENOMINATORS[code]
+    return result
+
+
+def effective_stat_many(stat_name: str, packed_stages: Sequence[int], stats: Sequence[int]) -> List[int]:
+    """
+    Aplica os estágios de um stat a muitos Pokémon de uma vez.
+
+    Útil sobre colunas de estágios empacotados (ex: ColumnarTree.slots[slot].stages).
+
+    Args:
+        stat_name: Stat de batalha (ATK, DEF, SATK, SDEF ou SPE)
+        packed_stages: Estágios empacotados de cada Pokémon (como em Pokemon._stages)
+        stats: Stat sem estágios de cada Pokémon
+
+    Returns:
+        Stat com o estágio aplicado, para cada Pokémon
+    """
+    if stat_name not in BATTLE_STATS:
+        raise ValueError(f"Not a battle stat: {stat_name}")
+    shift = _STAT_SHIFT[stat_name]
+    mask = _STAT_MASK
+    numerators, denominators = STAT_NUMERATORS, STAT_DENOMINATORS
+    result = []
+    for packed, stat in zip(packed_stages, stats):
+        code = packed >> shift & mask
+        result.append(stat * numerators[code] // denominators[code])
+    return result
+
+
+def hit_fraction(accuracy: int, attacker: Pokemon, defender: Pokemon) -> Tuple[int, int]:
+    """
+    Calcula a chance de acerto de um golpe como fração (numerador, denominador).
+
+    O estágio combinado (precisão do atacante - evasão do defensor) é limitado a -6..+6
+    antes de consultar a tabela 3/3; a chance é limitada a 100%.
+
+    Args:
+        accuracy: Precisão do golpe em percentual (1-100)
+        attacker: Pokémon que usa o golpe
+        defender: Pokémon alvo
+
+    Returns:
+        Fração (numerador, denominador) da chance de acerto
+    """
+    acc = (attacker._stages >> _STAT_SHIFT["ACC"] & _STAT_MASK)
+    eva = (defender._stages >> _STAT_SHIFT["EVA"] & _STAT_MASK)
+    code = max(0, min(2 * _STAGE_OFFSET, acc - eva + _STAGE_OFFSET))
+    numerator = accuracy * ACCURACY_NUMERATORS[code]
+    denominator = 100 * ACCURACY_DENOMINATORS[code]
+    return min(numerator, denominator), denominator
@@ -1,6 +1,10 @@
+import threading
+from contextlib import contextmanager
 from enum import Enum
-from typing import Optional, Dict
-from pokemon import Pokemon
+from typing import Callable, Optional, Dict, Iterable, Iterator, Tuple
+from pokemon import Pokemon, MajorStatus, MinorStatus
+import zobrist
+from events import POKEMON_CHANGED, WEATHER_CHANGED
 
 
 class Weather(Enum):
@@ -11,13 +15,71 @@ class Weather(Enum):
     SANDSTORM = "Sandstorm"
 
 
+# Ordem fixa dos slots usada em chaves canônicas
+SLOTS = ("Self", "Enemy", "Self2", "Enemy2")
+
+# Desfechos de um estado folha, classificados pela vida dos Pokémon
+OUTCOME_SELF_FAINTED = "Self fainted"
+OUTCOME_ENEMY_FAINTED = "Enemy fainted"
+OUTCOME_BOTH_FAINTED = "Both fainted"
+OUTCOME_UNRESOLVED = "Unresolved"
+OUTCOMES = (OUTCOME_SELF_FAINTED, OUTCOME_ENEMY_FAINTED, OUTCOME_BOTH_FAINTED, OUTCOME_UNRESOLVED)
+
+
+class IdAllocator:
+    """Gera IDs de estado únicos dentro de uma árvore (seguro para uso entre threads)."""
+
+    def __init__(self, start: int = 0):
+        """
+        Inicializa o alocador.
+        
+        Args:
+            start: Primeiro ID a ser gerado
+        """
+        self._next = start
+        self._lock = threading.Lock()
+
+    def allocate(self) -> int:
+        """Retorna um novo ID."""
+        with self._lock:
+            state_id = self._next
+            self._next += 1
+        return state_id
+
+    def allocate_block(self, count: int) -> int:
+        """Reserva `count` IDs consecutivos de uma vez e retorna o primeiro."""
+        with self._lock:
+            first = self._next
+            self._next += count
+        return first
+
+    def reserve(self, state_id: int) -> None:
+        """Garante que um ID já em uso (ex: de um estado criado fora da árvore) não será gerado."""
+        with self._lock:
+            if state_id >= self._next:
+                self._next = state_id + 1
+
+    def __getstate__(self) -> dict:
+        """Estado para pickle/deepcopy: o lock não é serializável e é recriado ao carregar."""
+        return {"_next": self._next}
+
+    def __setstate__(self, data: dict) -> None:
+        self._next = data["_next"]
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"IdAllocator(next={self._next})"
+
+
 class State:
     """Classe que representa um estado na árvore de estados."""
 
-    _id_counter = 0
     _turn_counter = 0  # Contador global de turnos para geração de nomes
 
-    def __init__(self, name: str = None, turn: int = None, battle_type: str = "single"):
+    __slots__ = ("id", "turn", "name", "weather", "battle_type", "pokemons", "_zobrist", "_events")
+
+    def __init__(self, name: str = None, turn: int = None, battle_type: str = "single",
+                 state_id: Optional[int] = None):
         """
         Inicializa um estado.
         
@@ -25,9 +87,10 @@ class State:
             name: Nome/descrição do estado. Se None, será gerado automaticamente baseado no turno.
             turn: Número do turno. Se None, será incrementado automaticamente.
             battle_type: Tipo de batalha - "single" (1x1) ou "double" (2x2)
+            state_id: ID do estado. Se None, o ID é atribuído pela árvore ao adicionar o estado
+                      (ver StateTree.add_state e StateTree.create_state).
         """
-        self.id = State._id_counter
-        State._id_counter += 1
+        self.id = state_id
         
         # Se turno não foi especificado, usar contador global
         if turn is None:
@@ -50,6 +113,12 @@ class State:
             "Self2": None,
             "Enemy2": None
         }
+        
+        # Hash Zobrist mantido incrementalmente (None = precisa ser recalculado)
+        self._zobrist: Optional[int] = zobrist.weather_key(self.weather)
+        
+        # EventBus da árvore que contém o estado (ver StateTree.add_state)
+        self._events = None
     
     @staticmethod
     def reset_turn_counter() -> None:
@@ -70,32 +139,375 @@ class State:
         if slot not in self.pokemons:
             return False
         
-        self.pokemons[slot] = pokemon.copy() if pokemon else None
+        self._set_slot(slot, pokemon.copy() if pokemon else None)
+        return True
+
+    def share_pokemon(self, slot: str, pokemon: Pokemon) -> bool:
+        """
+        Adiciona um Pokémon a um slot sem copiá-lo (copy-on-write).
+        
+        A instância passa a ser compartilhada e só é clonada quando algum estado
+        que a referencia a modifica através de edit_pokemon.
+        
+        Args:
+            slot: Slot do Pokémon (Self, Enemy, Self2, Enemy2)
+            pokemon: Pokémon a ser compartilhado
+            
+        Returns:
+            True se adicionado com sucesso, False caso contrário
+        """
+        if slot not in self.pokemons:
+            return False
+        
+        if pokemon:
+            pokemon._shared = True
+        self._set_slot(slot, pokemon)
         return True
 
+    def share_pokemons(self, pokemons: Dict[str, Pokemon], pokemons_hash: Optional[int] = None) -> None:
+        """
+        Compartilha (copy-on-write) vários Pokémon de uma vez.
+        
+        Args:
+            pokemons: Dicionário slot -> Pokémon
+            pokemons_hash: XOR já conhecido de zobrist.pokemon_hash para esses Pokémon; evita
+                           recalculá-lo quando os mesmos Pokémon são colocados em muitos estados
+        """
+        if pokemons_hash is None or self._zobrist is None or any(self.pokemons.values()):
+            for slot, pokemon in pokemons.items():
+                self.share_pokemon(slot, pokemon)
+            return
+        
+        for slot, pokemon in pokemons.items():
+            pokemon._shared = True
+            self.pokemons[slot] = pokemon
+            if self._events is not None:
+                self._events.emit(POKEMON_CHANGED, state=self, slot=slot)
+        self._zobrist ^= pokemons_hash
+
+    def share_pokemons_from(self, other: "State") -> None:
+        """Compartilha (copy-on-write) todos os Pokémon de outro estado."""
+        if self._zobrist is None or other._zobrist is None or any(self.pokemons.values()):
+            for slot, pokemon in other.pokemons.items():
+                if pokemon:
+                    self.share_pokemon(slot, pokemon)
+            return
+        
+        # Slots vazios: a contribuição dos Pokémon para o hash é a mesma do outro estado
+        for slot, pokemon in other.pokemons.items():
+            if pokemon:
+                pokemon._shared = True
+                self.pokemons[slot] = pokemon
+                if self._events is not None:
+                    self._events.emit(POKEMON_CHANGED, state=self, slot=slot)
+        self._zobrist ^= other._zobrist ^ zobrist.weather_key(other.weather)
+
     def get_pokemon(self, slot: str) -> Optional[Pokemon]:
-        """Obtém um Pokémon de um slot específico."""
+        """Obtém um Pokémon de um slot específico (somente leitura)."""
         return self.pokemons.get(slot)
 
+    @contextmanager
+    def edit_pokemon(self, slot: str) -> Iterator[Optional[Pokemon]]:
+        """
+        Obtém um Pokémon de um slot para modificação, dentro de um bloco with.
+        
+        Se a instância for compartilhada com outros estados, ela é clonada antes
+        de ser entregue, para que a modificação afete apenas este estado. Ao sair do
+        bloco, o evento POKEMON_CHANGED é publicado (os assinantes já veem os novos
+        valores) e, como a modificação é arbitrária, o hash Zobrist é recalculado no
+        próximo acesso.
+        
+        Exemplo:
+            with state.edit_pokemon("Self") as pokemon:
+                pokemon.set_hp_range(10, 20)
+        """
+        pokemon = self._writable_pokemon(slot)
+        try:
+            yield pokemon
+        finally:
+            self._zobrist = None
+            if self._events is not None:
+                self._events.emit(POKEMON_CHANGED, state=self, slot=slot)
+
     def remove_pokemon(self, slot: str) -> bool:
         """Remove um Pokémon de um slot."""
         if slot not in self.pokemons:
             return False
-        self.pokemons[slot] = None
+        self._set_slot(slot, None)
         return True
 
     def set_weather(self, weather: Weather) -> None:
         """Define a condição de clima."""
-        self.weather = weather
+        if weather is self.weather:
+            return
+        self._xor_hash(zobrist.weather_key(self.weather) ^ zobrist.weather_key(weather))
+        old_weather, self.weather = self.weather, weather
+        if self._events is not None:
+            self._events.emit(WEATHER_CHANGED, state=self, old_weather=old_weather)
+
+    def change_pokemon_status(self, slot: str, major_status: Optional[MajorStatus] = None,
+                              minor_status: Optional[MinorStatus] = None) -> None:
+        """Muda os status de um Pokémon, atualizando o hash incrementalmente."""
+        self.apply_pokemon_changes(slot, major_status=major_status, minor_status=minor_status)
+
+    def change_pokemon_hp(self, slot: str, hp_min_delta: float = 0, hp_max_delta: float = 0) -> None:
+        """Soma deltas à faixa de vida de um Pokémon, atualizando o hash incrementalmente."""
+        self.apply_pokemon_changes(slot, hp_min_delta, hp_max_delta)
+
+    def change_pokemon_stat(self, slot: str, stat_name: str, value_delta: int) -> None:
+        """Soma um delta ao estágio de um stat de um Pokémon, atualizando o hash incrementalmente."""
+        self.apply_pokemon_changes(slot, stat_deltas=((stat_name, value_delta),))
+
+    def apply_pokemon_changes(self, slot: str, hp_min_delta: float = 0, hp_max_delta: float = 0,
+                              stat_deltas: Tuple[Tuple[str, int], ...] = (),
+                              major_status: Optional[MajorStatus] = None,
+                              minor_status: Optional[MinorStatus] = None) -> None:
+        """
+        Aplica de uma vez várias mudanças a um Pokémon, atualizando o hash incrementalmente.
+        
+        Args:
+            slot: Slot do Pokémon
+            hp_min_delta: Mudança na vida mínima (em percentual)
+            hp_max_delta: Mudança na vida máxima (em percentual)
+            stat_deltas: Pares (stat, delta) a somar aos estágios
+            major_status: Status principal a aplicar (None mantém o atual)
+            minor_status: Status secundário a aplicar (None mantém o atual)
+        """
+        pokemon = self.pokemons.get(slot)
+        if pokemon is None:
+            return
+        if pokemon._shared:
+            pokemon = self.pokemons[slot] = pokemon.copy()
+        
+        self._xor_hash(State._mutate_pokemon(pokemon, slot, hp_min_delta, hp_max_delta,
+                                             stat_deltas, major_status, minor_status))
+        if self._events is not None:
+            self._events.emit(POKEMON_CHANGED, state=self, slot=slot)
+
+    @staticmethod
+    def apply_pokemon_changes_batch(states: Iterable["State"], slot: str, hp_min_delta: float = 0,
+                                    hp_max_delta: float = 0, stat_deltas: Tuple[Tuple[str, int], ...] = (),
+                                    major_status: Optional[MajorStatus] = None,
+                                    minor_status: Optional[MinorStatus] = None) -> int:
+        """
+        Aplica as mesmas mudanças ao Pokémon de um slot em vários estados de uma vez.
+        
+        Ver mutate_pokemons_batch: a mudança é calculada uma vez por combinação distinta
+        de vida, status e estágios, e não uma vez por estado.
+        
+        Args:
+            states: Estados a modificar
+            slot: Slot do Pokémon
+            (demais argumentos como em apply_pokemon_changes)
+            
+        Returns:
+            Número de combinações distintas de valores efetivamente calculadas
+        """
+        return State.mutate_pokemons_batch(
+            states, slot,
+            lambda pokemon: State._mutate_pokemon(pokemon, slot, hp_min_delta, hp_max_delta,
+                                                  stat_deltas, major_status, minor_status))
+
+    @staticmethod
+    def mutate_pokemons_batch(states: Iterable["State"], slot: str, mutate: Callable[[Pokemon], int]) -> int:
+        """
+        Aplica uma mudança ao Pokémon de um slot em vários estados de uma vez.
+        
+        A mudança só pode depender da vida, dos status e dos estágios do Pokémon: ela é
+        calculada uma vez por combinação distinta desses valores e o resultado (junto com
+        o delta do hash) é copiado para os demais Pokémon com os mesmos valores. Instâncias
+        exclusivas de um estado são alteradas no lugar; instâncias compartilhadas
+        (copy-on-write) são clonadas uma vez e o clone é compartilhado pelos estados que as
+        referenciavam.
+        
+        Args:
+            states: Estados a modificar (cada estado uma única vez)
+            slot: Slot do Pokémon
+            mutate: Função que altera um Pokémon exclusivo e retorna o delta do hash do slot
+                    (como State._mutate_pokemon)
+            
+        Returns:
+            Número de combinações distintas de valores efetivamente calculadas
+        """
+        # (vida mínima, vida máxima, ids dos status, estágios) -> (novos valores, delta)
+        changes: Dict[tuple, Tuple[tuple, int]] = {}
+        # id(original) -> (original, clone, valores originais); o original é mantido vivo para que seu id
+        # não seja reutilizado durante o laço
+        clones: Dict[int, Tuple[Pokemon, Pokemon, tuple]] = {}
+        for state in states:
+            pokemons = state.pokemons
+            pokemon = pokemons.get(slot)
+            if pokemon is None:
+                continue
+            
+            if pokemon._shared:
+                cloned = clones.get(id(pokemon))
+                if cloned is not None:
+                    # Clone já alterado, usado por mais de um estado
+                    pokemon = pokemons[slot] = cloned[1]
+                    pokemon._shared = True
+                    delta = changes[cloned[2]][1]
+                    if state._zobrist is not None:
+                        state._zobrist ^= delta
+                    if state._events is not None:
+                        state._events.emit(POKEMON_CHANGED, state=state, slot=slot)
+                    continue
+                original = pokemon
+                pokemon = pokemons[slot] = pokemon.copy()
+            else:
+                original = None
+            
+            # Membros de enum são únicos, e seus ids são mais baratos de comparar que o hash do Enum
+            key = (pokemon.hp_min_percent, pokemon.hp_max_percent, id(pokemon.major_status),
+                   id(pokemon.minor_status), pokemon._stages)
+            change = changes.get(key)
+            if change is None:
+                delta = mutate(pokemon)
+                changes[key] = ((pokemon.hp_min_percent, pokemon.hp_max_percent, pokemon.major_status,
+                                 pokemon.minor_status, pokemon._stages), delta)
+            else:
+                values, delta = change
+                (pokemon.hp_min_percent, pokemon.hp_max_percent, pokemon.major_status,
+                 pokemon.minor_status, pokemon._stages) = values
+            if original is not None:
+                clones[id(original)] = (original, pokemon, key)
+            
+            if state._zobrist is not None:
+                state._zobrist ^= delta
+            if state._events is not None:
+                state._events.emit(POKEMON_CHANGED, state=state, slot=slot)
+        return len(changes)
+
+    @staticmethod
+    def _mutate_pokemon(pokemon: Pokemon, slot: str, hp_min_delta: float, hp_max_delta: float,
+                        stat_deltas: Tuple[Tuple[str, int], ...],
+                        major_status: Optional[MajorStatus], minor_status: Optional[MinorStatus]) -> int:
+        """Aplica mudanças a um Pokémon (já exclusivo) e retorna o delta do hash Zobrist do slot."""
+        keys = zobrist.slot_keys(slot)
+        delta = 0
+        if hp_min_delta or hp_max_delta:
+            old_min, old_max = pokemon.hp_min_percent, pokemon.hp_max_percent
+            pokemon.set_hp_range(old_min + hp_min_delta, old_max + hp_max_delta)
+            delta ^= (keys.hp_min[old_min] ^ keys.hp_max[old_max]
+                      ^ keys.hp_min[pokemon.hp_min_percent] ^ keys.hp_max[pokemon.hp_max_percent])
+        
+        if major_status and major_status is not pokemon.major_status:
+            delta ^= keys.major[pokemon.major_status] ^ keys.major[major_status]
+            pokemon.major_status = major_status
+        if minor_status and minor_status is not pokemon.minor_status:
+            delta ^= keys.minor[pokemon.minor_status] ^ keys.minor[minor_status]
+            pokemon.minor_status = minor_status
+        
+        if stat_deltas:
+            # Opera direto sobre os estágios empacotados (valor + 6, 4 bits por stat)
+            stages = pokemon._stages
+            top = Pokemon.STAT_MAX - Pokemon.STAT_MIN
+            for stat_name, value_delta in stat_deltas:
+                shift = Pokemon.STAT_SHIFT.get(stat_name)
+                if shift is None:
+                    continue
+                current = (stages >> shift) & Pokemon.STAT_MASK
+                new = min(top, max(0, current + int(value_delta)))
+                if new != current:
+                    stages += (new - current) << shift
+                    stat_keys = keys.stats[stat_name]
+                    delta ^= stat_keys[current] ^ stat_keys[new]
+            pokemon._stages = stages
+        
+        return delta
+
+    @property
+    def zobrist_hash(self) -> int:
+        """
+        Hash Zobrist de 64 bits do estado (slots, clima e tipo de batalha).
+        
+        Mantido incrementalmente pelas operações do estado; só é recalculado do zero
+        depois de edições arbitrárias feitas via edit_pokemon.
+        """
+        if self._zobrist is None:
+            h = zobrist.weather_key(self.weather)
+            for slot, pokemon in self.pokemons.items():
+                h ^= zobrist.pokemon_hash(slot, pokemon)
+            self._zobrist = h
+        return self._zobrist ^ zobrist.battle_type_key(self.battle_type)
+
+    def _writable_pokemon(self, slot: str) -> Optional[Pokemon]:
+        """Retorna o Pokémon de um slot, clonando-o antes se for compartilhado."""
+        pokemon = self.pokemons.get(slot)
+        if pokemon is not None and pokemon._shared:
+            pokemon = pokemon.copy()
+            self.pokemons[slot] = pokemon
+        return pokemon
+
+    def _set_slot(self, slot: str, pokemon: Optional[Pokemon]) -> None:
+        """Substitui o Pokémon de um slot, atualizando o hash."""
+        self._xor_hash(zobrist.pokemon_hash(slot, self.pokemons[slot]) ^ zobrist.pokemon_hash(slot, pokemon))
+        self.pokemons[slot] = pokemon
+        if self._events is not None:
+            self._events.emit(POKEMON_CHANGED, state=self, slot=slot)
+
+    def _xor_hash(self, delta: int) -> None:
+        """Aplica um delta ao hash Zobrist, se ele estiver em dia."""
+        if self._zobrist is not None:
+            self._zobrist ^= delta
 
     def get_active_pokemons(self) -> Dict[str, Pokemon]:
         """Retorna um dicionário dos Pokémon ativos (não None)."""
         return {slot: pokemon for slot, pokemon in self.pokemons.items() if pokemon is not None}
 
+    def get_outcome(self) -> str:
+        """
+        Classifica o estado pelo desfecho da batalha.
+        
+        Um lado está derrotado quando tem Pokémon em campo e todos estão com vida
+        máxima em 0%.
+        
+        Returns:
+            Um dos valores de OUTCOMES
+        """
+        self_fainted = self._side_fainted(("Self", "Self2"))
+        enemy_fainted = self._side_fainted(("Enemy", "Enemy2"))
+        if self_fainted and enemy_fainted:
+            return OUTCOME_BOTH_FAINTED
+        if self_fainted:
+            return OUTCOME_SELF_FAINTED
+        if enemy_fainted:
+            return OUTCOME_ENEMY_FAINTED
+        return OUTCOME_UNRESOLVED
+
+    def _side_fainted(self, slots: Tuple[str, ...]) -> bool:
+        """Verifica se todos os Pokémon em campo de um lado estão com 0% de vida."""
+        pokemons = [self.pokemons[slot] for slot in slots if self.pokemons[slot] is not None]
+        return bool(pokemons) and all(p.hp_max_percent == 0 for p in pokemons)
+
+    def canonical_key(self) -> Tuple:
+        """
+        Retorna a chave canônica da situação de batalha representada pelo estado.
+        
+        Cobre os quatro slots, o clima e o tipo de batalha; nome, turno e ID não fazem
+        parte da chave, então estados alcançados por caminhos diferentes que descrevem
+        a mesma situação têm a mesma chave.
+        """
+        slots = tuple(
+            pokemon.canonical_key() if pokemon is not None else None
+            for pokemon in (self.pokemons[slot] for slot in SLOTS)
+        )
+        return (self.battle_type, self.weather, slots)
+
+    def canonical_hash(self) -> int:
+        """Retorna o hash da chave canônica do estado."""
+        return hash(self.canonical_key())
+
+    def __getstate__(self) -> dict:
+        """Serializa o estado sem o barramento de eventos da árvore."""
+        return {name: getattr(self, name) for name in State.__slots__ if name != "_events"}
+
+    def __setstate__(self, data: dict) -> None:
+        for name, value in data.items():
+            setattr(self, name, value)
+        self._events = None
+
     def __repr__(self) -> str:
         active_pokes = len(self.get_active_pokemons())
         return f"State(id={self.id}, name='{self.name}', weather={self.weather.value}, pokemons={active_pokes})"
 
-    def reset_id_counter() -> None:
-        """Reseta o contador de IDs (usado para testes)."""
-        State._id_counter = 0
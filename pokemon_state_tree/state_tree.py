@@ -1,21 +1,70 @@
-from typing import Dict, List, Optional
-from state import State
-from transition import Transition
+import heapq
+from contextlib import contextmanager
+from itertools import count
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+from state import State, IdAllocator, OUTCOMES
+from events import EventBus, STATE_ADDED, STATE_REMOVED, TRANSITION_ADDED, TRANSITION_REMOVED, \
+    PROBABILITY_CHANGED, POKEMON_CHANGED, WEATHER_CHANGED
+from transition import Action, Transition
+
+
+class TreeBatch:
+    """Alterações acumuladas por StateTree.batch() até o fim do bloco."""
+
+    def __init__(self, normalize: bool, validate: bool):
+        self.normalize = normalize
+        self.validate = validate
+        # Estados de origem cujas transições de saída mudaram
+        self.affected_states: Set[int] = set()
+        # Preenchido no fim do bloco: estados cujas probabilidades não somam 1.0
+        self.invalid_states: List[int] = []
+        self._removed_transitions: Set[int] = set()
+        self._reach_roots: List[int] = []
+        # Estados afetados ainda não normalizados (ver StateTree._flush_batch)
+        self._unnormalized: Set[int] = set()
 
 
 class StateTree:
     """Classe que representa uma árvore de estados com transições."""
 
-    def __init__(self, root_state: State):
+    def __init__(self, root_state: State, id_allocator: Optional[IdAllocator] = None):
         """
         Inicializa a árvore de estados.
         
         Args:
             root_state: Estado raiz da árvore
+            id_allocator: Alocador de IDs dos estados (None = um alocador próprio da árvore)
         """
+        self.id_allocator = id_allocator if id_allocator is not None else IdAllocator()
+        self._bind(root_state)
+        # Eventos de mutação da árvore, dos seus estados e das suas transições
+        self.events = EventBus()
+        self.events.subscribe(self._on_pokemon_changed, POKEMON_CHANGED)
+        self.events.subscribe(self._on_weather_changed, WEATHER_CHANGED)
+        self.events.subscribe(self._on_probability_changed, PROBABILITY_CHANGED)
+        root_state._events = self.events
         self.root_state = root_state
         self.states: Dict[int, State] = {root_state.id: root_state}
         self.transitions: List[Transition] = []
+        # Índices de adjacência: state_id -> transições saindo/chegando
+        self._outgoing: Dict[int, List[Transition]] = {root_state.id: []}
+        self._incoming: Dict[int, List[Transition]] = {root_state.id: []}
+        # Tabela de transposição: hash Zobrist -> ID do estado representante
+        self._transpositions: Dict[int, int] = {root_state.zobrist_hash: root_state.id}
+        # Hash com que cada estado foi registrado, para reindexá-lo quando seu conteúdo muda
+        self._transposition_keys: Dict[int, int] = {root_state.id: root_state.zobrist_hash}
+        # Cache de probabilidades de alcance: state_id -> probabilidade a partir da raiz.
+        # Se um estado não está no cache, nenhum descendente dele está.
+        self._reach: Dict[int, float] = {}
+        # Estados da árvore fora do cache de alcance (novos ou invalidados)
+        self._reach_stale: Set[int] = {root_state.id}
+        # Massa de probabilidade das folhas por desfecho, mantida incrementalmente a partir
+        # da contribuição (desfecho, probabilidade) guardada para cada folha
+        self._outcome_mass: Dict[str, float] = {outcome: 0.0 for outcome in OUTCOMES}
+        self._leaf_contributions: Dict[int, Tuple[str, float]] = {}
+        self._outcome_dirty: set = set()
+        # Lote de edições em andamento (ver batch)
+        self._batch: Optional[TreeBatch] = None
 
     def add_state(self, state: State) -> bool:
         """
@@ -27,11 +76,144 @@ class StateTree:
         Returns:
             True se adicionado com sucesso, False se já existe
         """
-        if state.id in self.states:
+        if state.id is not None and state.id in self.states:
             return False
+        self._bind(state)
         self.states[state.id] = state
+        self._reach_stale.add(state.id)
+        self._outgoing[state.id] = []
+        self._incoming[state.id] = []
+        key = state.zobrist_hash
+        self._transpositions.setdefault(key, state.id)
+        self._transposition_keys[state.id] = key
+        state._events = self.events
+        self.events.emit(STATE_ADDED, state=state)
         return True
 
+    def add_subtree(self, states: List[State], transitions: List[Transition]) -> int:
+        """
+        Adiciona de uma vez estados novos e as transições que os ligam à árvore.
+        
+        Os IDs dos estados sem ID são alocados em um único bloco e os índices são
+        atualizados em massa, sem o trabalho por inserção de add_state/add_transition. As
+        transições podem ligar estados da árvore e estados de `states`; as probabilidades
+        não são renormalizadas.
+        
+        Args:
+            states: Estados a adicionar (nenhum pode já estar na árvore)
+            transitions: Transições entre estados da árvore e/ou de `states`
+            
+        Returns:
+            Número de estados adicionados
+        """
+        all_states = self.states
+        new_states = {id(state) for state in states}
+        for state in states:
+            if state.id is not None and state.id in all_states:
+                raise ValueError(f"State {state.id} is already in the tree")
+        for t in transitions:
+            for end in (t.from_state, t.to_state):
+                if id(end) not in new_states and end.id not in all_states:
+                    raise ValueError(f"Transition {t} links a state outside the tree")
+        
+        next_id = self.id_allocator.allocate_block(sum(1 for state in states if state.id is None))
+        outgoing, incoming = self._outgoing, self._incoming
+        transpositions, transposition_keys = self._transpositions, self._transposition_keys
+        events = self.events
+        for state in states:
+            if state.id is None:
+                state.id = next_id
+                next_id += 1
+            else:
+                self.id_allocator.reserve(state.id)
+            state_id = state.id
+            all_states[state_id] = state
+            outgoing[state_id] = []
+            incoming[state_id] = []
+            key = state.zobrist_hash
+            transpositions.setdefault(key, state_id)
+            transposition_keys[state_id] = key
+            state._events = events
+        self._reach_stale.update(state.id for state in states)
+        
+        reach_roots = []
+        for t in transitions:
+            to_id = t.to_state.id
+            outgoing[t.from_state.id].append(t)
+            incoming[to_id].append(t)
+            if id(t.to_state) not in new_states:
+                reach_roots.append(to_id)
+            t._events = events
+        self.transitions.extend(transitions)
+        sources = {t.from_state.id for t in transitions}
+        self._outcome_dirty.update(sources)
+        if self._batch is not None:
+            self._batch.affected_states.update(sources)
+            self._batch._unnormalized.update(sources)
+            self._batch._reach_roots.extend(reach_roots)
+        else:
+            self._invalidate_reach(reach_roots)
+        
+        if events.has_subscribers(STATE_ADDED):
+            for state in states:
+                events.emit(STATE_ADDED, state=state)
+        if events.has_subscribers(TRANSITION_ADDED):
+            for t in transitions:
+                events.emit(TRANSITION_ADDED, transition=t)
+        return len(states)
+
+    def add_child(self, parent: State, probability: float, action: Action, advance_turn: bool = True) -> State:
+        """
+        Cria um filho de um estado da árvore aplicando uma ação e o liga ao pai.
+        
+        O filho começa com o clima e os Pokémon do pai (compartilhados, copy-on-write) e
+        recebe a ação. A transição guarda uma cópia da ação (ver Action.copy), então editar
+        a ação de uma transição não afeta as irmãs, mesmo quando quem gera os filhos usa
+        sempre a mesma instância.
+        
+        Args:
+            parent: Estado de origem (já na árvore)
+            probability: Probabilidade da transição
+            action: Ação aplicada ao filho
+            advance_turn: Se o filho fica no turno seguinte (False = mesmo turno)
+            
+        Returns:
+            O estado filho
+        """
+        child = State(turn=parent.turn + 1 if advance_turn else parent.turn, battle_type=parent.battle_type)
+        child.set_weather(parent.weather)
+        child.share_pokemons_from(parent)
+        action.execute(child)
+        self.add_state(child)
+        self.add_transition(Transition(parent, child, probability, action=action.copy()))
+        return child
+
+    def create_state(self, name: str = None, turn: int = None, battle_type: str = "single") -> State:
+        """
+        Cria um estado com um ID desta árvore (o estado ainda precisa ser adicionado com add_state).
+        
+        Args:
+            name: Nome/descrição do estado
+            turn: Número do turno
+            battle_type: Tipo de batalha - "single" ou "double"
+        """
+        return State(name=name, turn=turn, battle_type=battle_type, state_id=self.id_allocator.allocate())
+
+    def __setstate__(self, data: dict) -> None:
+        """Restaura a árvore de um pickle/deepcopy, religando estados e transições ao barramento."""
+        self.__dict__.update(data)
+        for state in self.states.values():
+            state._events = self.events
+        for transition in self.transitions:
+            transition._events = self.events
+
+    def _bind(self, state: State) -> None:
+        """Atribui um ID da árvore a um estado sem ID, ou reserva o ID que ele já tem."""
+        if state.id is None:
+            state.id = self.id_allocator.allocate()
+        else:
+            self.id_allocator.reserve(state.id)
+
     def get_state(self, state_id: int) -> Optional[State]:
         """Obtém um estado pelo seu ID."""
         return self.states.get(state_id)
@@ -49,11 +231,37 @@ class StateTree:
         if state_id not in self.states or state_id == self.root_state.id:
             return False
         
+        self._invalidate_reach([state_id])
+        self._reach_stale.discard(state_id)
+        self._outcome_dirty.add(state_id)
+        self._outcome_dirty.update(t.from_state.id for t in self._incoming[state_id])
+        
         # Remover todas as transições que envolvem este estado
-        self.transitions = [t for t in self.transitions 
-                           if t.from_state.id != state_id and t.to_state.id != state_id]
+        removed = self._outgoing.pop(state_id) + self._incoming.pop(state_id)
+        for t in removed:
+            t._events = None
+            if t.from_state.id != state_id:
+                self._outgoing[t.from_state.id].remove(t)
+                self._mark_affected(t.from_state.id)
+            if t.to_state.id != state_id:
+                self._incoming[t.to_state.id].remove(t)
+                self._invalidate_reach_deferred(t.to_state.id)
         
-        del self.states[state_id]
+        if removed:
+            if self._batch is not None:
+                self._batch._removed_transitions.update(id(t) for t in removed)
+            else:
+                removed_ids = {id(t) for t in removed}
+                self.transitions = [t for t in self.transitions if id(t) not in removed_ids]
+        
+        state = self.states.pop(state_id)
+        state._events = None
+        key = self._transposition_keys.pop(state_id)
+        if self._transpositions.get(key) == state_id:
+            del self._transpositions[key]
+        for t in removed:
+            self.events.emit(TRANSITION_REMOVED, transition=t)
+        self.events.emit(STATE_REMOVED, state=state)
         return True
 
     def add_transition(self, transition: Transition) -> bool:
@@ -69,7 +277,18 @@ class StateTree:
         if transition.from_state.id not in self.states or transition.to_state.id not in self.states:
             return False
         
-        self.transitions.append(transition)
+        if self._batch is not None and id(transition) in self._batch._removed_transitions:
+            # Removida e readicionada no mesmo lote: ainda está na lista de transições
+            self._batch._removed_transitions.discard(id(transition))
+        else:
+            self.transitions.append(transition)
+        self._outgoing[transition.from_state.id].append(transition)
+        self._incoming[transition.to_state.id].append(transition)
+        self._invalidate_reach_deferred(transition.to_state.id)
+        self._outcome_dirty.add(transition.from_state.id)
+        self._mark_affected(transition.from_state.id)
+        transition._events = self.events
+        self.events.emit(TRANSITION_ADDED, transition=transition)
         return True
 
     def get_transitions_from(self, state_id: int) -> List[Transition]:
@@ -82,7 +301,7 @@ class StateTree:
         Returns:
             Lista de transições partindo do estado
         """
-        return [t for t in self.transitions if t.from_state.id == state_id]
+        return list(self._outgoing.get(state_id, ()))
 
     def get_transitions_to(self, state_id: int) -> List[Transition]:
         """
@@ -94,7 +313,7 @@ class StateTree:
         Returns:
             Lista de transições chegando ao estado
         """
-        return [t for t in self.transitions if t.to_state.id == state_id]
+        return list(self._incoming.get(state_id, ()))
 
     def remove_transition(self, transition: Transition) -> bool:
         """
@@ -106,11 +325,117 @@ class StateTree:
         Returns:
             True se removida com sucesso
         """
-        try:
-            self.transitions.remove(transition)
-            return True
-        except ValueError:
+        outgoing = self._outgoing.get(transition.from_state.id)
+        if outgoing is None or not any(t is transition for t in outgoing):
             return False
+        
+        if self._batch is not None:
+            self._batch._removed_transitions.add(id(transition))
+        else:
+            self.transitions.remove(transition)
+        outgoing.remove(transition)
+        self._incoming[transition.to_state.id].remove(transition)
+        self._invalidate_reach_deferred(transition.to_state.id)
+        self._outcome_dirty.add(transition.from_state.id)
+        self._mark_affected(transition.from_state.id)
+        transition._events = None
+        self.events.emit(TRANSITION_REMOVED, transition=transition)
+        return True
+
+    # ==================== EDIÇÃO EM LOTE ====================
+
+    @contextmanager
+    def batch(self, normalize: bool = True, validate: bool = False) -> Iterator[TreeBatch]:
+        """
+        Agrupa várias edições, adiando o trabalho feito a cada inserção ou remoção.
+        
+        Dentro do bloco, add_transition, remove_transition e remove_state só atualizam os
+        índices de adjacência; chamadas a auto_adjust_probabilities são apenas registradas.
+        Leituras feitas dentro do bloco (alcance, desfechos, caminhos e
+        update_transition_probability) aplicam antes o trabalho adiado até ali, então sempre
+        veem a árvore atual; cada leitura paga esse custo, então é melhor lê-las no fim.
+        No fim do bloco (mesmo se houver exceção; as edições não são desfeitas), a lista
+        de transições é filtrada uma única vez, o cache de alcance é invalidado uma única
+        vez e cada estado de origem afetado é normalizado e validado uma única vez, já com
+        o conjunto final de suas transições. Blocos aninhados fazem parte do bloco externo.
+        
+        Exemplo:
+            with tree.batch() as changes:
+                for t in transitions:
+                    tree.add_transition(t)
+            print(changes.invalid_states)
+        
+        Args:
+            normalize: Se True, aplica auto_adjust_probabilities aos estados afetados
+            validate: Se True, preenche invalid_states com os estados afetados cujas
+                      probabilidades não somam 1.0
+            
+        Yields:
+            TreeBatch com os estados afetados (e, no fim, os estados inválidos)
+        """
+        if self._batch is not None:
+            yield self._batch
+            return
+        
+        batch = self._batch = TreeBatch(normalize, validate)
+        try:
+            yield batch
+        finally:
+            self._batch = None
+            self._commit_batch(batch)
+
+    def _commit_batch(self, batch: TreeBatch) -> None:
+        """Aplica de uma vez o trabalho adiado por um lote de edições."""
+        if batch._removed_transitions:
+            removed = batch._removed_transitions
+            self.transitions = [t for t in self.transitions if id(t) not in removed]
+        self._invalidate_reach(batch._reach_roots)
+        
+        affected = [state_id for state_id in batch.affected_states if state_id in self.states]
+        if batch.normalize:
+            # Estados normalizados por uma leitura no meio do bloco e não alterados depois
+            # já estão prontos
+            for state_id in affected:
+                if state_id in batch._unnormalized:
+                    self.auto_adjust_probabilities(state_id)
+        if batch.validate:
+            batch.invalid_states = sorted(state_id for state_id in affected
+                                          if not self.validate_probabilities(state_id))
+
+    def _flush_batch(self) -> None:
+        """
+        Aplica o trabalho adiado pelo lote em andamento, sem encerrá-lo.
+        
+        Chamado antes de leituras dentro de um lote, para que elas não vejam alcance
+        desatualizado nem probabilidades ainda não normalizadas.
+        """
+        batch = self._batch
+        if batch._reach_roots:
+            roots, batch._reach_roots = batch._reach_roots, []
+            self._invalidate_reach(roots)
+        if batch.normalize and batch._unnormalized:
+            pending, batch._unnormalized = batch._unnormalized, set()
+            # Fora do lote por um instante, para que a normalização aconteça agora
+            self._batch = None
+            try:
+                for state_id in pending:
+                    if state_id in self.states:
+                        self.auto_adjust_probabilities(state_id)
+            finally:
+                self._batch = batch
+
+    def _mark_affected(self, state_id: int) -> None:
+        """Registra, no lote em andamento, um estado de origem cujas transições mudaram."""
+        if self._batch is not None:
+            self._batch.affected_states.add(state_id)
+            self._batch._unnormalized.add(state_id)
+
+    def _invalidate_reach_deferred(self, state_id: int) -> None:
+        """Invalida o alcance abaixo de um estado agora ou, durante um lote, no fim dele."""
+        if self._batch is not None:
+            self._batch._reach_roots.append(state_id)
+        else:
+            self._invalidate_reach([state_id])
 
     def validate_probabilities(self, state_id: int) -> bool:
         """
@@ -122,7 +447,7 @@ class StateTree:
         Returns:
             True se as probabilidades somam ~1.0, False caso contrário
         """
-        transitions = self.get_transitions_from(state_id)
+        transitions = self._outgoing.get(state_id)
         if not transitions:
             return True
         
@@ -143,11 +468,26 @@ class StateTree:
         Args:
             state_id: ID do estado
         """
-        transitions = self.get_transitions_from(state_id)
+        if self._batch is not None and self._batch.normalize:
+            self._batch.affected_states.add(state_id)
+            self._batch._unnormalized.add(state_id)
+            return
+        
+        transitions = self._outgoing.get(state_id)
         
         if not transitions:
             return
         
+        # O alcance abaixo das transições alteradas é invalidado por _on_probability_changed
+        old_probabilities = [t.probability for t in transitions]
+        self._adjust_probabilities(transitions)
+        for t, old_probability in zip(transitions, old_probabilities):
+            if t.probability != old_probability:
+                self.events.emit(PROBABILITY_CHANGED, transition=t, old_probability=old_probability)
+
+    @staticmethod
+    def _adjust_probabilities(transitions: List[Transition]) -> None:
+        """Aplica a regra de auto_adjust_probabilities a uma lista de transições irmãs."""
         # Separar transições com probabilidade definida vs default (1.0)
         defined_transitions = [t for t in transitions if t.probability < 1.0]
         default_transitions = [t for t in transitions if t.probability == 1.0]
@@ -184,12 +524,460 @@ class StateTree:
             for t in default_transitions:
                 t.probability = equal_default_prob
 
+    def get_incoming_probability(self, state_id: int) -> float:
+        """Retorna a soma das probabilidades das transições que chegam a um estado."""
+        return sum(t.probability for t in self._incoming.get(state_id, ()))
+
+    # ==================== PROBABILIDADES DE ALCANCE ====================
+
+    def get_reach_probabilities(self) -> Dict[int, float]:
+        """
+        Calcula a probabilidade absoluta de alcançar cada estado a partir da raiz.
+        
+        Em um DAG a probabilidade de um estado é a soma, sobre as transições que chegam
+        a ele, de (probabilidade do pai × probabilidade da transição). Os valores ficam
+        em cache; edições de transições invalidam apenas a região abaixo delas, e só essa
+        região é recalculada, em uma passada topológica. Transições que fecham ciclos
+        são ignoradas.
+        
+        Returns:
+            Dicionário (cópia) state_id -> probabilidade de alcance
+        """
+        if self._batch is not None:
+            self._flush_batch()
+        self._refresh_reach()
+        return dict(self._reach)
+
+    def _refresh_reach(self) -> None:
+        """Recalcula o alcance dos estados fora do cache, com custo proporcional a eles."""
+        if not self._reach_stale:
+            return
+        reach = self._reach
+        # Passada topológica (Kahn) restrita aos estados fora do cache
+        missing = self._reach_stale
+        self._reach_stale = set()
+        self._outcome_dirty.update(missing)
+        indegree = {state_id: sum(1 for t in self._incoming[state_id] if t.from_state.id in missing)
+                    for state_id in missing}
+        ready = [state_id for state_id, degree in indegree.items() if degree == 0]
+        
+        while missing:
+            if not ready:
+                # Apenas estados em ciclos restaram: liberar o de menor ID
+                ready.append(min(missing, key=lambda s: (indegree[s], s)))
+            
+            state_id = ready.pop()
+            if state_id not in missing:
+                continue
+            missing.discard(state_id)
+            
+            if state_id == self.root_state.id:
+                reach[state_id] = 1.0
+            else:
+                reach[state_id] = sum(reach.get(t.from_state.id, 0.0) * t.probability
+                                      for t in self._incoming[state_id])
+            
+            for t in self._outgoing[state_id]:
+                child_id = t.to_state.id
+                if child_id in missing:
+                    indegree[child_id] -= 1
+                    if indegree[child_id] == 0:
+                        ready.append(child_id)
+
+    def get_outcome_probabilities(self) -> Dict[str, float]:
+        """
+        Retorna a probabilidade total de terminar em cada desfecho (ver State.get_outcome).
+        
+        A massa de cada desfecho é a soma das probabilidades de alcance das folhas com
+        aquele desfecho. Ela é mantida incrementalmente: depois de uma edição, só as folhas
+        da região afetada têm sua contribuição refeita.
+        
+        Returns:
+            Dicionário desfecho -> probabilidade
+        """
+        if self._batch is not None:
+            self._flush_batch()
+        self._refresh_reach()
+        if self._outcome_dirty:
+            mass = self._outcome_mass
+            contributions = self._leaf_contributions
+            for state_id in self._outcome_dirty:
+                old = contributions.pop(state_id, None)
+                if old is not None:
+                    mass[old[0]] -= old[1]
+                
+                state = self.states.get(state_id)
+                if state is not None and not self._outgoing[state_id]:
+                    outcome = state.get_outcome()
+                    probability = self._reach.get(state_id, 0.0)
+                    contributions[state_id] = (outcome, probability)
+                    mass[outcome] += probability
+            self._outcome_dirty.clear()
+        return dict(self._outcome_mass)
+
+    def invalidate_outcome(self, state_id: int) -> None:
+        """Marca o desfecho de um estado para ser reclassificado (ex: depois de editar seus Pokémon)."""
+        self._outcome_dirty.add(state_id)
+
+    def _on_pokemon_changed(self, event_type: str, state: State, slot: str) -> None:
+        """Reclassifica o desfecho e reindexa a transposição de um estado cujos Pokémon mudaram."""
+        self._outcome_dirty.add(state.id)
+        self._rekey_transposition(state)
+
+    def _on_weather_changed(self, event_type: str, state: State, old_weather) -> None:
+        """Reindexa a transposição de um estado cujo clima mudou."""
+        self._rekey_transposition(state)
+
+    def _on_probability_changed(self, event_type: str, transition: Transition, old_probability: float) -> None:
+        """Invalida o alcance abaixo de uma transição cuja probabilidade mudou."""
+        self._invalidate_reach_deferred(transition.to_state.id)
+        self._outcome_dirty.add(transition.from_state.id)
+
+    def update_transition_probability(self, transition: Transition, probability: float) -> Dict[str, float]:
+        """
+        Altera a probabilidade de uma transição, renormaliza as irmãs e informa o efeito
+        nos desfechos.
+        
+        Apenas a subárvore abaixo do estado de origem é recalculada, usando as contribuições
+        guardadas de cada folha, então o custo é proporcional à região afetada.
+        
+        Args:
+            transition: Transição a alterar
+            probability: Nova probabilidade (antes da renormalização)
+            
+        Returns:
+            Dicionário desfecho -> variação da probabilidade total do desfecho
+        """
+        before = self.get_outcome_probabilities()
+        transition.set_probability(probability)
+        self.auto_adjust_probabilities(transition.from_state.id)
+        after = self.get_outcome_probabilities()
+        return {outcome: after[outcome] - before[outcome] for outcome in OUTCOMES}
+
+    def get_reach_probability(self, state_id: int) -> float:
+        """Retorna a probabilidade absoluta de alcançar um estado a partir da raiz."""
+        if self._batch is not None:
+            self._flush_batch()
+        if state_id in self._reach_stale:
+            self._refresh_reach()
+        return self._reach.get(state_id, 0.0)
+
+    def _invalidate_reach(self, state_ids: List[int]) -> None:
+        """Remove do cache de alcance os estados indicados e todos os seus descendentes."""
+        reach = self._reach
+        stale = self._reach_stale
+        pending = [state_id for state_id in dict.fromkeys(state_ids) if state_id in reach]
+        for state_id in pending:
+            del reach[state_id]
+            stale.add(state_id)
+        while pending:
+            for t in self._outgoing.get(pending.pop(), ()):
+                child_id = t.to_state.id
+                if child_id in reach:
+                    del reach[child_id]
+                    stale.add(child_id)
+                    pending.append(child_id)
+
+    # ==================== TRANSPOSIÇÕES ====================
+
+    def rebuild_transposition_table(self) -> None:
+        """
+        Reconstrói a tabela de transposição a partir do conteúdo atual dos estados.
+        
+        Edições de Pokémon ou clima em estados da árvore já reindexam a tabela (ver
+        _rekey_transposition); a reconstrução escolhe de novo os representantes. O
+        representante de cada chave é o estado de menor ID que possui transições de saída,
+        ou o de menor ID caso nenhum possua.
+        """
+        self._transpositions = {}
+        self._transposition_keys = {}
+        for state_id in sorted(self.states):
+            key = self.states[state_id].zobrist_hash
+            self._transposition_keys[state_id] = key
+            current = self._transpositions.get(key)
+            if current is None or (not self._outgoing[current] and self._outgoing[state_id]):
+                self._transpositions[key] = state_id
+
+    def _rekey_transposition(self, state: State) -> None:
+        """
+        Move um estado para a chave do seu hash atual na tabela de transposição.
+        
+        Se ele representava a chave antiga, a entrada é removida (outros estados com o
+        hash antigo deixam de ser encontrados até rebuild_transposition_table).
+        """
+        old_key = self._transposition_keys.get(state.id)
+        if old_key is None:
+            return
+        key = state.zobrist_hash
+        if key == old_key:
+            return
+        if self._transpositions.get(old_key) == state.id:
+            del self._transpositions[old_key]
+        self._transpositions.setdefault(key, state.id)
+        self._transposition_keys[state.id] = key
+
+    def find_transposition(self, state: State) -> Optional[State]:
+        """
+        Procura na árvore outro estado que represente a mesma situação de batalha.
+        
+        A busca usa o hash Zobrist do estado (O(1)); a chave canônica só é comparada
+        para confirmar um candidato encontrado.
+        
+        Args:
+            state: Estado a procurar (não precisa estar na árvore)
+            
+        Returns:
+            O estado equivalente já presente na árvore, ou None
+        """
+        key = state.zobrist_hash
+        state_id = self._transpositions.get(key)
+        if state_id is None or state_id == state.id:
+            return None
+        
+        candidate = self.states.get(state_id)
+        if candidate is None or candidate.zobrist_hash != key or candidate.canonical_key() != state.canonical_key():
+            # Entrada desatualizada (estado removido ou editado depois de inserido)
+            del self._transpositions[key]
+            return None
+        return candidate
+
+    def get_duplicate_groups(self, same_turn: bool = True) -> List[List[State]]:
+        """
+        Retorna os grupos de estados com a mesma chave canônica (apenas grupos com 2+ estados).
+        
+        Args:
+            same_turn: Se True, só agrupa estados do mesmo turno
+        """
+        groups: Dict[Tuple, List[State]] = {}
+        for state in self.states.values():
+            key = state.canonical_key()
+            if same_turn:
+                key = (state.turn, key)
+            groups.setdefault(key, []).append(state)
+        return [sorted(group, key=lambda s: s.id) for group in groups.values() if len(group) > 1]
+
+    def merge_states(self, keep_id: int, duplicate_id: int) -> bool:
+        """
+        Funde um estado duplicado em outro equivalente, transformando a árvore em um DAG.
+        
+        As transições que chegavam ao duplicado passam a chegar ao estado mantido; se um
+        mesmo pai já levava aos dois, as probabilidades são somadas em uma única transição.
+        Apenas estados sem transições de saída podem ser fundidos, para não descartar subárvores,
+        e nunca em um ancestral, para não criar ciclos.
+        
+        Args:
+            keep_id: ID do estado mantido
+            duplicate_id: ID do estado a fundir (será removido)
+            
+        Returns:
+            True se fundido com sucesso, False caso contrário
+        """
+        if (keep_id == duplicate_id or keep_id not in self.states
+                or duplicate_id not in self.states or duplicate_id == self.root_state.id):
+            return False
+        if self._outgoing[duplicate_id] or self._is_ancestor(keep_id, duplicate_id):
+            return False
+        
+        self._invalidate_reach([keep_id, duplicate_id])
+        self._outcome_dirty.update(t.from_state.id for t in self._incoming[duplicate_id])
+        keep = self.states[keep_id]
+        keep_incoming = self._incoming[keep_id]
+        for t in self._incoming[duplicate_id]:
+            existing = next((k for k in keep_incoming if k.from_state is t.from_state), None)
+            if existing is not None:
+                existing.set_probability(existing.probability + t.probability)
+                self._outgoing[t.from_state.id].remove(t)
+                self.transitions.remove(t)
+                t._events = None
+                self.events.emit(TRANSITION_REMOVED, transition=t)
+            else:
+                # Redirecionada: publicada como removida e adicionada de novo
+                self.events.emit(TRANSITION_REMOVED, transition=t)
+                t.to_state = keep
+                keep_incoming.append(t)
+                self.events.emit(TRANSITION_ADDED, transition=t)
+        self._incoming[duplicate_id] = []
+        
+        return self.remove_state(duplicate_id)
+
+    def merge_duplicates(self) -> int:
+        """
+        Detecta estados duplicados do mesmo turno e funde as folhas duplicadas no
+        representante de cada grupo (o de menor ID com transições de saída, ou o de menor ID).
+        
+        Returns:
+            Número de estados fundidos
+        """
+        merged = 0
+        for group in self.get_duplicate_groups():
+            keep = next((s for s in group if self._outgoing[s.id]), group[0])
+            for state in group:
+                if self.merge_states(keep.id, state.id):
+                    merged += 1
+        self.rebuild_transposition_table()
+        return merged
+
+    # ==================== CAMINHOS ====================
+
+    def iter_most_probable_paths(self, min_probability: float = 0.0) -> Iterator[Tuple[float, List[Transition]]]:
+        """
+        Gera os caminhos da raiz até as folhas em ordem decrescente de probabilidade.
+        
+        Busca best-first com uma fila de prioridade de caminhos parciais: como a probabilidade
+        de um caminho só diminui ao estendê-lo, uma folha retirada da fila é sempre o próximo
+        caminho mais provável. Os caminhos parciais compartilham seus prefixos, então a memória
+        é proporcional à fronteira, e não ao total de caminhos. Transições que fecham ciclos
+        são ignoradas.
+        
+        Args:
+            min_probability: Caminhos (e prefixos) com probabilidade menor que esta são descartados
+            
+        Yields:
+            Tuplas (probabilidade, lista de transições da raiz até a folha)
+        """
+        if self._batch is not None:
+            self._flush_batch()
+        tiebreak = count()
+        # Entradas: (-probabilidade, desempate, state_id, elo do caminho);
+        # o elo é (elo anterior, transição) ou None na raiz
+        frontier = [(-1.0, next(tiebreak), self.root_state.id, None)]
+        while frontier:
+            negative_probability, _, state_id, link = heapq.heappop(frontier)
+            outgoing = self._outgoing[state_id]
+            if not outgoing:
+                yield -negative_probability, self._path_from_link(link)
+                continue
+            
+            for t in outgoing:
+                probability = -negative_probability * t.probability
+                if probability <= 0.0 or probability < min_probability:
+                    continue
+                child_id = t.to_state.id
+                if self._link_visits(link, child_id):
+                    continue
+                heapq.heappush(frontier, (-probability, next(tiebreak), child_id, (link, t)))
+
+    def get_most_probable_paths(self, k: int, min_probability: float = 0.0) -> List[Tuple[float, List[Transition]]]:
+        """
+        Retorna os k caminhos mais prováveis da raiz até as folhas.
+        
+        Args:
+            k: Número de caminhos
+            min_probability: Probabilidade mínima de um caminho
+            
+        Returns:
+            Lista de tuplas (probabilidade, transições), da mais provável para a menos provável
+        """
+        paths = []
+        if k <= 0:
+            return paths
+        for path in self.iter_most_probable_paths(min_probability):
+            paths.append(path)
+            if len(paths) >= k:
+                break
+        return paths
+
+    def iter_paths(self, min_probability: float = 0.0) -> Iterator[Tuple[float, List[Transition]]]:
+        """
+        Gera todos os caminhos da raiz até as folhas, sem ordem de probabilidade.
+        
+        Percorre a árvore em profundidade mantendo só o caminho atual em memória, então
+        serve para processar todos os caminhos em fluxo, sem montar a lista completa.
+        Ramos com probabilidade acumulada menor que min_probability são podados.
+        
+        Args:
+            min_probability: Probabilidade mínima de um caminho
+            
+        Yields:
+            Tuplas (probabilidade, lista de transições da raiz até a folha)
+        """
+        if self._batch is not None:
+            self._flush_batch()
+        path: List[Transition] = []
+        on_path = {self.root_state.id}
+        # Pilha de (iterador das transições de saída, probabilidade acumulada até o estado)
+        stack = [(iter(self._outgoing[self.root_state.id]), 1.0)]
+        if not self._outgoing[self.root_state.id]:
+            yield 1.0, []
+            return
+        
+        while stack:
+            outgoing, probability = stack[-1]
+            t = next(outgoing, None)
+            if t is None:
+                stack.pop()
+                if path:
+                    on_path.discard(path.pop().to_state.id)
+                continue
+            
+            child_probability = probability * t.probability
+            child_id = t.to_state.id
+            if child_probability <= 0.0 or child_probability < min_probability or child_id in on_path:
+                continue
+            
+            path.append(t)
+            if self._outgoing[child_id]:
+                on_path.add(child_id)
+                stack.append((iter(self._outgoing[child_id]), child_probability))
+            else:
+                yield child_probability, list(path)
+                path.pop()
+
+    @staticmethod
+    def _path_from_link(link) -> List[Transition]:
+        """Reconstrói a lista de transições de um caminho a partir do seu último elo."""
+        path = []
+        while link is not None:
+            link, t = link
+            path.append(t)
+        path.reverse()
+        return path
+
+    def _link_visits(self, link, state_id: int) -> bool:
+        """Verifica se um caminho parcial já passa por um estado (para não seguir ciclos)."""
+        if state_id == self.root_state.id:
+            return True
+        while link is not None:
+            link, t = link
+            if t.to_state.id == state_id:
+                return True
+        return False
+
+    def _is_ancestor(self, ancestor_id: int, state_id: int) -> bool:
+        """Verifica se um estado alcança outro seguindo transições."""
+        pending = [state_id]
+        visited = {state_id}
+        while pending:
+            for t in self._incoming[pending.pop()]:
+                parent_id = t.from_state.id
+                if parent_id == ancestor_id:
+                    return True
+                if parent_id not in visited:
+                    visited.add(parent_id)
+                    pending.append(parent_id)
+        return False
+
+    def get_states_by_turn(self, turn: int) -> List[State]:
+        """Retorna todos os estados de um turno."""
+        return [state for state in self.states.values() if state.turn == turn]
+
+    def get_leaf_states(self) -> List[State]:
+        """Retorna os estados sem transições de saída (folhas)."""
+        return [self.states[state_id] for state_id, outgoing in self._outgoing.items() if not outgoing]
+
+    def select_states(self, predicate: Callable[[State], bool]) -> List[State]:
+        """Retorna os estados que satisfazem um filtro."""
+        return [state for state in self.states.values() if predicate(state)]
+
     def get_all_states(self) -> List[State]:
         """Retorna uma lista de todos os estados na árvore."""
         return list(self.states.values())
 
     def get_all_transitions(self) -> List[Transition]:
         """Retorna uma lista de todas as transições na árvore."""
+        if self._batch is not None and self._batch._removed_transitions:
+            removed = self._batch._removed_transitions
+            return [t for t in self.transitions if id(t) not in removed]
         return self.transitions.copy()
 
     def __repr__(self) -> str:
@@ -0,0 +1,9 @@
+"""
+Configuração dos testes: os módulos do projeto são importados pelo nome (ex: `from state
+import State`), como na aplicação.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
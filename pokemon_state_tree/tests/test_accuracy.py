@@ -0,0 +1,91 @@
+"""
+Ramificação de acerto/erro: chances pelos estágios, filhos criados e ações por transição.
+"""
+
+import pytest
+
+from accuracy import AccuracyRule, branch_accuracy
+from expander import TreeExpander
+from pokemon import Pokemon
+from state import State
+from state_tree import StateTree
+from transition import Action
+
+
+def make_tree(enemy_evasion: int = 0) -> StateTree:
+    root = State(turn=0)
+    root.add_pokemon("Self", Pokemon("Pikachu"))
+    root.add_pokemon("Enemy", Pokemon("Charizard"))
+    root.change_pokemon_stat("Enemy", "EVA", enemy_evasion)
+    return StateTree(root)
+
+
+def thunder_hit() -> Action:
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -60, -50)
+    return action
+
+
+def test_branches_follow_accuracy_and_stages():
+    tree = make_tree(enemy_evasion=1)
+    rule = AccuracyRule("Self", "Enemy", 70, thunder_hit())
+    # 70% com evasão +1 (3/4)
+    assert rule.hit_probability(tree.root_state) == pytest.approx(0.525)
+    branches = rule(tree.root_state)
+    assert [p for p, _ in branches] == [pytest.approx(0.525), pytest.approx(0.475)]
+    assert sum(p for p, _ in branches) == 1.0
+
+    sure = AccuracyRule("Self", "Enemy", 100, thunder_hit())
+    assert [p for p, _ in sure(make_tree().root_state)] == [1.0]
+    assert AccuracyRule("Self", "Enemy2", 100, thunder_hit())(tree.root_state) == []
+    with pytest.raises(ValueError):
+        AccuracyRule("Self", "Enemy", 0, thunder_hit())
+
+
+def test_branch_accuracy_creates_hit_and_miss_children():
+    tree = make_tree()
+    rule = AccuracyRule("Self", "Enemy", 70, thunder_hit())
+    assert branch_accuracy(tree, rule) == 2
+    hit, miss = sorted(tree.get_transitions_from(tree.root_state.id), key=lambda t: -t.probability)
+    assert (hit.probability, miss.probability) == (pytest.approx(0.7), pytest.approx(0.3))
+    enemy = hit.to_state.pokemons["Enemy"]
+    assert (enemy.hp_min_percent, enemy.hp_max_percent) == (40, 50)
+    assert miss.to_state.canonical_key() == tree.root_state.canonical_key()
+    assert hit.to_state.turn == 1
+
+    # Segundo golpe no mesmo turno; a folha em que o inimigo desmaiou não é ramificada
+    finisher = Action()
+    finisher.add_pokemon_hp_change("Enemy", -100, -100)
+    assert branch_accuracy(tree, AccuracyRule("Self", "Enemy", 100, finisher), advance_turn=False) == 2
+    assert branch_accuracy(tree, rule) == 0
+    assert {state.turn for state in tree.get_leaf_states()} == {1}
+    assert sum(tree.get_outcome_probabilities().values()) == pytest.approx(1.0)
+
+
+def test_each_transition_owns_its_action():
+    tree = make_tree()
+    shared = thunder_hit()
+    rule = AccuracyRule("Self", "Enemy", 90, shared)
+    branch_accuracy(tree, rule)
+    branch_accuracy(tree, rule)
+    hits = [t for t in tree.get_all_transitions() if t.action.effects]
+    assert len(hits) == 3
+    assert len({id(t.action) for t in tree.get_all_transitions()}) == len(tree.get_all_transitions())
+    assert all(t.action is not shared for t in hits)
+
+    hits[0].action.add_pokemon_stat_change("Self", "ATK", 1)
+    assert all(len(t.action.effects) == 1 for t in hits[1:])
+    assert len(shared.effects) == 1
+
+
+def test_rule_works_with_the_expander():
+    batched, expanded = make_tree(), make_tree()
+    rule = AccuracyRule("Self", "Enemy", 80, thunder_hit())
+    for _ in range(2):
+        branch_accuracy(batched, rule)
+    TreeExpander(expanded, [rule]).expand(2)
+
+    def leaves(tree):
+        reach = tree.get_reach_probabilities()
+        return sorted((s.canonical_key(), round(reach[s.id], 12)) for s in tree.get_leaf_states())
+    assert leaves(batched) == leaves(expanded)
@@ -0,0 +1,82 @@
+"""
+Armazenamento colunar: ida e volta a partir de uma StateTree, consultas e gravação de linhas.
+"""
+
+import pytest
+
+from columnar import ColumnarTree
+from expander import TreeExpander
+from pokemon import MajorStatus
+from state import Weather
+from state_tree import StateTree
+from transition import Transition
+from test_expander import battle_rule, make_tree
+
+
+def build_tree() -> StateTree:
+    tree = make_tree()
+    tree.root_state.set_weather(Weather.RAIN)
+    TreeExpander(tree, [battle_rule]).expand(4)
+    # Estado com nome próprio, ligado por uma transição de escolha
+    leaf = tree.get_leaf_states()[-1]
+    named = tree.create_state(name="Switch", turn=leaf.turn + 1)
+    named.share_pokemons_from(leaf)
+    tree.add_state(named)
+    tree.add_transition(Transition(leaf, named, 1.0, is_choice=True))
+    return tree
+
+
+def content(tree: StateTree) -> dict:
+    return {state.id: (state.name, state.turn, state.weather, state.battle_type, state.canonical_key())
+            for state in tree.states.values()}
+
+
+def edges(tree: StateTree) -> list:
+    return sorted((t.from_state.id, t.to_state.id, t.probability, t.is_choice, repr(t.action.to_list()))
+                  for t in tree.get_all_transitions())
+
+
+def test_round_trip():
+    tree = build_tree()
+    store = ColumnarTree.from_tree(tree)
+    assert len(store) == len(tree.states)
+    assert store.row_of(tree.root_state.id) == 0
+
+    restored = store.to_tree()
+    assert content(restored) == content(tree)
+    assert edges(restored) == edges(tree)
+    # IDs preservados: novos estados da árvore recriada não colidem com eles
+    assert restored.create_state().id not in tree.states
+
+
+def test_queries_match_the_tree():
+    tree = build_tree()
+    store = ColumnarTree.from_tree(tree)
+    reach = tree.get_reach_probabilities()
+    columnar_reach = store.get_reach_probabilities()
+    for state_id, probability in reach.items():
+        assert columnar_reach[store.row_of(state_id)] == pytest.approx(probability)
+
+    outcomes = tree.get_outcome_probabilities()
+    for outcome, probability in store.get_outcome_probabilities().items():
+        assert probability == pytest.approx(outcomes.get(outcome, 0.0))
+    assert [store.ids[row] for row in store.get_leaf_rows()] == \
+        sorted((state.id for state in tree.get_leaf_states()), key=store.row_of)
+
+
+def test_edited_copy_is_written_back():
+    tree = build_tree()
+    store = ColumnarTree.from_tree(tree)
+    row = store.get_leaf_rows()[0]
+    state = store.get_state(row)
+    state.set_weather(Weather.SUNNY)
+    state.change_pokemon_status("Enemy", MajorStatus.BURN)
+    state.change_pokemon_stat("Self", "SPE", 2)
+    # Cópia: as colunas só mudam com set_state
+    assert store.get_state(row).canonical_key() != state.canonical_key()
+
+    store.set_state(row, state)
+    assert store.get_state(row).canonical_key() == state.canonical_key()
+    assert store.get_state(row).id == state.id
+    restored = store.to_tree()
+    assert restored.get_state(state.id).canonical_key() == state.canonical_key()
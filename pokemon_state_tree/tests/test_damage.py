@@ -0,0 +1,101 @@
+"""
+Faixas de dano comparadas com valores calculados à mão pela fórmula das gerações 5+.
+
+Caso base: nível 50, poder 100, ataque 150 contra defesa 100 dá dano base
+(2 * 50 // 5 + 2) * 100 * 150 // 100 // 50 + 2 = 68, e os 16 fatores 85%-100%
+dão os valores de ROLLS abaixo.
+"""
+
+import pytest
+
+from damage import BattleStats, Move, PHYSICAL, SPECIAL, damage_rolls, damage_matrix, damage_range, \
+    add_damage_effect
+from pokemon import Pokemon, MajorStatus
+from state import State, Weather
+from transition import Action
+
+
+ROLLS = [57, 58, 59, 59, 60, 61, 61, 62, 63, 63, 64, 65, 65, 66, 67, 68]
+# Com STAB (1.5, metades arredondadas para baixo)
+STAB_ROLLS = [85, 87, 88, 88, 90, 91, 91, 93, 94, 94, 96, 97, 97, 99, 100, 102]
+
+ATTACKER = BattleStats({"HP": 150, "ATK": 150, "DEF": 100, "SATK": 150, "SDEF": 100, "SPE": 100}, ("Dragon", "Ground"))
+DEFENDER = BattleStats({"HP": 200, "ATK": 100, "DEF": 100, "SATK": 100, "SDEF": 100, "SPE": 100}, ("Normal",))
+TACKLE = Move("Test Strike", 100, "Normal")
+EARTHQUAKE = Move("Earthquake", 100, "Ground", PHYSICAL, is_spread=True)
+
+
+def percent(rolls, hp: int = 200) -> list:
+    return [100.0 * roll / hp for roll in rolls]
+
+
+def rolls(move=TACKLE, attacker=None, defender=None, attacker_stats=ATTACKER, defender_stats=DEFENDER, **kwargs):
+    return damage_rolls(attacker or Pokemon("Garchomp"), attacker_stats, defender or Pokemon("Snorlax"),
+                        defender_stats, move, **kwargs)
+
+
+def test_base_rolls():
+    assert rolls() == pytest.approx(percent(ROLLS))
+
+
+def test_stab_and_effectiveness():
+    assert rolls(EARTHQUAKE) == pytest.approx(percent(STAB_ROLLS))
+    steel = BattleStats(DEFENDER.stats, ("Fire", "Steel"))
+    assert rolls(EARTHQUAKE, defender_stats=steel) == pytest.approx(percent([4 * r for r in STAB_ROLLS]))
+    flying = BattleStats(DEFENDER.stats, ("Flying",))
+    assert rolls(EARTHQUAKE, defender_stats=flying) == [0.0] * 16
+
+
+def test_modifiers():
+    # Alvo múltiplo em batalha dupla: 68 * 0.75 = 51
+    assert rolls(EARTHQUAKE, double_battle=True) == \
+        pytest.approx(percent([int(int(51 * f // 100) * 1.5) for f in range(85, 101)]))
+    # Queimadura reduz golpes físicos à metade (metades para baixo)
+    burned = Pokemon("Garchomp")
+    burned.set_major_status(MajorStatus.BURN)
+    assert rolls(attacker=burned) == pytest.approx(percent([r // 2 for r in ROLLS]))
+    # Golpe especial não é afetado pela queimadura
+    special = Move("Test Beam", 100, "Normal", SPECIAL)
+    assert rolls(special, attacker=burned) == pytest.approx(percent(ROLLS))
+
+
+def test_stages_and_critical():
+    boosted = Pokemon("Garchomp")
+    boosted.set_stat("ATK", 2)
+    lowered = Pokemon("Garchomp")
+    lowered.set_stat("ATK", -1)
+    # +2: ataque 300, dano base 134
+    assert rolls(attacker=boosted) == pytest.approx(percent([134 * f // 100 for f in range(85, 101)]))
+    # Crítico ignora o -1 do atacante e multiplica por 1.5: 68 * 1.5 = 102
+    assert rolls(attacker=lowered, critical=True) == pytest.approx(percent([102 * f // 100 for f in range(85, 101)]))
+
+
+def test_species_stats():
+    garchomp = BattleStats.from_species("Garchomp")
+    assert garchomp.stats["ATK"] == 150
+    heatran = BattleStats(DEFENDER.stats, ("Fire", "Steel"))
+    assert rolls(Move("Earthquake", 100, "Ground"), attacker_stats=garchomp, defender_stats=heatran) == \
+        pytest.approx(percent([4 * r for r in STAB_ROLLS]))
+
+
+def test_matrix_matches_single_calls():
+    attackers = [(Pokemon("Garchomp"), ATTACKER), (Pokemon("Garchomp", item="Life Orb"), ATTACKER)]
+    defenders = [(Pokemon("Snorlax"), DEFENDER), (Pokemon("Heatran"), BattleStats(DEFENDER.stats, ("Fire", "Steel")))]
+    matrix = damage_matrix(attackers, defenders, EARTHQUAKE, weather=Weather.RAIN)
+    for i, (attacker, attacker_stats) in enumerate(attackers):
+        for j, (defender, defender_stats) in enumerate(defenders):
+            assert matrix[i][j] == damage_rolls(attacker, attacker_stats, defender, defender_stats,
+                                                EARTHQUAKE, weather=Weather.RAIN)
+
+
+def test_damage_effect_bounds_the_real_hp():
+    values = rolls()
+    assert damage_range(values) == (28, 34)
+    action = Action()
+    assert add_damage_effect(action, "Enemy", values) == (28, 34)
+
+    state = State(turn=0)
+    state.add_pokemon("Enemy", Pokemon("Snorlax"))
+    action.execute(state)
+    enemy = state.pokemons["Enemy"]
+    assert (enemy.hp_min_percent, enemy.hp_max_percent) == (66, 72)
@@ -0,0 +1,113 @@
+"""
+Eventos publicados pela StateTree, seus estados e suas transições.
+"""
+
+import pytest
+
+from events import STATE_ADDED, STATE_REMOVED, TRANSITION_ADDED, TRANSITION_REMOVED, \
+    PROBABILITY_CHANGED, POKEMON_CHANGED, WEATHER_CHANGED
+from state import Weather
+from state_tree import StateTree
+from transition import Action, Transition
+from test_state_tree import make_state
+
+
+class Recorder:
+    """Assinante que guarda (tipo, dados) de cada evento recebido."""
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event_type, **data):
+        self.events.append((event_type, data))
+
+    def types(self) -> list:
+        types = [event_type for event_type, _ in self.events]
+        self.events.clear()
+        return types
+
+
+@pytest.fixture
+def recorded():
+    root = make_state(0)
+    tree = StateTree(root)
+    recorder = Recorder()
+    tree.events.subscribe(recorder)
+    return tree, recorder
+
+
+def test_structure_events(recorded):
+    tree, recorder = recorded
+    root = tree.root_state
+    child = make_state(1)
+    tree.add_state(child)
+    assert recorder.events == [(STATE_ADDED, {"state": child})]
+    recorder.types()
+
+    transition = Transition(root, child, 0.4)
+    tree.add_transition(transition)
+    assert recorder.types() == [TRANSITION_ADDED]
+
+    transition.set_probability(0.7)
+    assert recorder.events == [(PROBABILITY_CHANGED, {"transition": transition, "old_probability": 0.4})]
+    recorder.types()
+
+    tree.remove_state(child.id)
+    assert recorder.types() == [TRANSITION_REMOVED, STATE_REMOVED]
+
+    # Estados e transições removidos deixam de publicar
+    child.set_weather(Weather.RAIN)
+    transition.set_probability(0.1)
+    assert recorder.types() == []
+
+
+def test_content_events(recorded):
+    tree, recorder = recorded
+    root = tree.root_state
+    root.set_weather(Weather.RAIN)
+    assert recorder.events == [(WEATHER_CHANGED, {"state": root, "old_weather": Weather.NONE})]
+    recorder.types()
+
+    root.change_pokemon_hp("Enemy", -10, -10)
+    with root.edit_pokemon("Self") as pokemon:
+        pokemon.set_hp_range(20, 30)
+    assert recorder.events == [(POKEMON_CHANGED, {"state": root, "slot": "Enemy"}),
+                               (POKEMON_CHANGED, {"state": root, "slot": "Self"})]
+    recorder.types()
+
+    action = Action()
+    action.add_pokemon_stat_change("Self", "ATK", 1)
+    action.add_weather_change(Weather.SUNNY)
+    action.execute(root)
+    assert sorted(recorder.types()) == sorted([POKEMON_CHANGED, WEATHER_CHANGED])
+
+
+def test_normalization_reports_probability_changes(recorded):
+    tree, recorder = recorded
+    root = tree.root_state
+    for probability in (0.2, 0.6):
+        child = make_state(1)
+        tree.add_state(child)
+        tree.add_transition(Transition(root, child, probability))
+    recorder.types()
+
+    tree.auto_adjust_probabilities(root.id)
+    changes = [data for event_type, data in recorder.events if event_type == PROBABILITY_CHANGED]
+    assert [(data["old_probability"], data["transition"].probability) for data in changes] == \
+        [(0.2, pytest.approx(0.25)), (0.6, pytest.approx(0.75))]
+
+
+def test_subscription_management(recorded):
+    tree, recorder = recorded
+    only_added = Recorder()
+    tree.events.subscribe(only_added, STATE_ADDED)
+    assert tree.events.has_subscribers(STATE_ADDED)
+    tree.events.unsubscribe(recorder)
+
+    tree.add_state(make_state(1))
+    tree.root_state.set_weather(Weather.RAIN)
+    assert recorder.types() == []
+    assert only_added.types() == [STATE_ADDED]
+
+    with pytest.raises(ValueError):
+        tree.events.subscribe(recorder, "not_an_event")
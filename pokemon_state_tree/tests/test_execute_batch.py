@@ -0,0 +1,95 @@
+"""
+Execução em lote: execute_batch e ColumnarTree.execute_action dão o mesmo resultado que
+executar a ação estado a estado.
+"""
+
+import random
+
+from columnar import ColumnarTree
+from pokemon import Pokemon, MajorStatus
+from state import State, Weather
+from state_tree import StateTree
+from transition import Action, Transition
+
+from test_zobrist import assert_hash, random_action
+
+
+def make_states(rng: random.Random, count: int) -> list:
+    """Estados com Pokémon exclusivos de valores variados e alguns compartilhados."""
+    shared = Pokemon("Blastoise")
+    shared.set_stat("DEF", 5)
+    states = []
+    for _ in range(count):
+        state = State(turn=1, battle_type="double")
+        for slot in ("Self", "Enemy"):
+            pokemon = Pokemon("Pikachu" if slot == "Self" else "Charizard")
+            pokemon.set_hp_range(rng.choice([0, 5, 40, 100]), 100)
+            pokemon.set_stat("ATK", rng.randint(-6, 6))
+            if rng.random() < 0.3:
+                pokemon.set_major_status(MajorStatus.BURN)
+            state.add_pokemon(slot, pokemon)
+        if rng.random() < 0.5:
+            state.share_pokemon("Self2", shared)
+        states.append(state)
+    return states
+
+
+def test_execute_batch_matches_execute():
+    rng = random.Random(3)
+    for _ in range(100):
+        action = random_action(rng)
+        seed = rng.random()
+        expected = make_states(random.Random(seed), 30)
+        batched = make_states(random.Random(seed), 30)
+        for state in expected:
+            action.execute(state)
+        action.execute_batch(batched + batched[:5])  # estados repetidos contam uma vez
+        for a, b in zip(expected, batched):
+            assert a.canonical_key() == b.canonical_key()
+            assert_hash(b)
+
+
+def test_execute_batch_changes_exclusive_pokemons_in_place():
+    states = make_states(random.Random(1), 10)
+    exclusive = [state.pokemons["Enemy"] for state in states]
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -10, -10)
+    action.execute_batch(states)
+    assert all(state.pokemons["Enemy"] is pokemon for state, pokemon in zip(states, exclusive))
+
+
+def test_execute_batch_clones_shared_pokemons_once():
+    parent = State(turn=0)
+    parent.add_pokemon("Self", Pokemon("Pikachu"))
+    original = parent.pokemons["Self"]
+    children = []
+    for _ in range(5):
+        child = State(turn=1)
+        child.share_pokemons_from(parent)
+        children.append(child)
+    action = Action()
+    action.add_pokemon_stat_change("Self", "SPE", 1)
+    action.execute_batch(children)
+    assert parent.pokemons["Self"] is original and original.get_stat("SPE") == 0
+    clone = children[0].pokemons["Self"]
+    assert clone is not original and clone.get_stat("SPE") == 1
+    assert all(child.pokemons["Self"] is clone for child in children)
+
+
+def test_columnar_execute_action_matches_execute():
+    rng = random.Random(5)
+    for _ in range(50):
+        action = random_action(rng)
+        seed = rng.random()
+        states = make_states(random.Random(seed), 20)
+        tree = StateTree(State(turn=0, battle_type="double"))
+        for state in states:
+            tree.add_state(state)
+            tree.add_transition(Transition(tree.root_state, state, 1 / len(states)))
+        store = ColumnarTree.from_tree(tree)
+        rows = [store.row_of(state.id) for state in states]
+        store.execute_action(action, rows)
+        for state, row in zip(states, rows):
+            action.execute(state)
+            assert store.get_state(row).canonical_key() == state.canonical_key()
+        assert store.get_state(0).weather is Weather.NONE
@@ -0,0 +1,100 @@
+"""
+Expansão automática: poda por probabilidade, feixe e orçamento de nós.
+"""
+
+from expander import TreeExpander
+from pokemon import Pokemon
+from state import State
+from state_tree import StateTree
+from transition import Action
+
+
+def make_tree() -> StateTree:
+    root = State(turn=0)
+    root.add_pokemon("Self", Pokemon("Pikachu"))
+    root.add_pokemon("Enemy", Pokemon("Charizard"))
+    return StateTree(root)
+
+
+def _hit(damage: int) -> Action:
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -damage, -damage)
+    return action
+
+
+def four_way_rule(state):
+    """Quatro ramos com probabilidades distintas, em ordem crescente."""
+    return [(0.1, _hit(1)), (0.2, _hit(2)), (0.3, _hit(3)), (0.4, _hit(4))]
+
+
+def test_unpruned_expansion_counts_everything():
+    tree = make_tree()
+    expander = TreeExpander(tree, [four_way_rule])
+    assert expander.expand(2) == 4 + 16
+    assert expander.candidates_generated == 20
+    assert expander.candidates_pruned == 0
+    assert abs(sum(tree.get_outcome_probabilities().values()) - 1.0) < 1e-9
+
+
+def test_epsilon_prunes_unlikely_candidates():
+    tree = make_tree()
+    expander = TreeExpander(tree, [four_way_rule], epsilon=0.05)
+    added = expander.expand(2)
+    # Turno 2: produtos das probabilidades >= 0.05 (0.1 x 0.4, 0.2 x 0.2... ficam de fora)
+    survivors = sum(1 for a in (0.1, 0.2, 0.3, 0.4) for b in (0.1, 0.2, 0.3, 0.4) if a * b >= 0.05)
+    assert added == 4 + survivors
+    assert expander.candidates_pruned == 16 - survivors
+    assert expander.candidates_generated == added + expander.candidates_pruned
+
+
+def test_beam_keeps_most_likely_and_counts_every_drop():
+    tree = make_tree()
+    expander = TreeExpander(tree, [four_way_rule], beam_width=2)
+    assert expander.expand(1) == 2
+    # Os candidatos chegam em ordem crescente: 0.1 e 0.2 entram no feixe e são expulsos
+    assert expander.candidates_generated == 4
+    assert expander.candidates_pruned == 2
+    probabilities = sorted(t.probability for t in tree.get_transitions_from(tree.root_state.id))
+    assert probabilities == [0.3, 0.4]
+
+
+def test_node_budget_caps_tree_size():
+    tree = make_tree()
+    expander = TreeExpander(tree, [four_way_rule], node_budget=10)
+    expander.expand(5)
+    assert len(tree.states) == 10
+    assert expander.candidates_generated == len(tree.states) - 1 + expander.candidates_pruned
+
+
+def battle_rule(state):
+    """Ramos que levam a desfechos diferentes (os dois lados podem desmaiar)."""
+    hit, trade, miss = Action(), Action(), Action()
+    hit.add_pokemon_hp_change("Enemy", -45, -45)
+    trade.add_pokemon_hp_change("Enemy", -20, -20)
+    trade.add_pokemon_hp_change("Self", -35, -35)
+    miss.add_pokemon_hp_change("Self", -25, -25)
+    return [(0.5, hit), (0.3, trade), (0.2, miss)]
+
+
+def reach_by_content(tree: StateTree) -> list:
+    reach = tree.get_reach_probabilities()
+    return sorted((state.turn, state.canonical_key(), round(reach[state.id], 12))
+                  for state in tree.states.values())
+
+
+def test_parallel_expansion_matches_serial():
+    serial, parallel = make_tree(), make_tree()
+    TreeExpander(serial, [battle_rule]).expand(1)
+    TreeExpander(parallel, [battle_rule]).expand(1)
+
+    serial_added = TreeExpander(serial, [battle_rule]).expand(4)
+    parallel_added = TreeExpander(parallel, [battle_rule]).expand_parallel(4, processes=2)
+    assert parallel_added == serial_added
+    assert len(parallel.states) == len(serial.states) == len({state.id for state in parallel.states.values()})
+    assert reach_by_content(parallel) == reach_by_content(serial)
+
+    serial_outcomes = serial.get_outcome_probabilities()
+    parallel_outcomes = parallel.get_outcome_probabilities()
+    assert parallel_outcomes.keys() == serial_outcomes.keys()
+    for outcome, probability in serial_outcomes.items():
+        assert abs(parallel_outcomes[outcome] - probability) < 1e-9
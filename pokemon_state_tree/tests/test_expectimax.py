@@ -0,0 +1,40 @@
+"""
+Solver expectimax: estados com o mesmo conteúdo mas subárvores diferentes são subjogos distintos.
+"""
+
+from expectimax import ExpectimaxSolver
+from pokemon import Pokemon
+from state import State
+from state_tree import StateTree
+from transition import Transition
+
+
+def make_state(turn: int, self_hp: int = 100, enemy_hp: int = 100) -> State:
+    state = State(turn=turn)
+    pokemon = Pokemon("Pikachu")
+    pokemon.set_hp_range(self_hp, self_hp)
+    state.add_pokemon("Self", pokemon)
+    enemy = Pokemon("Charizard")
+    enemy.set_hp_range(enemy_hp, enemy_hp)
+    state.add_pokemon("Enemy", enemy)
+    return state
+
+
+def test_duplicates_with_different_subtrees_are_solved_separately():
+    root = make_state(0)
+    tree = StateTree(root)
+    x, y = make_state(1), make_state(1)
+    win, loss = make_state(2, enemy_hp=0), make_state(2, self_hp=0)
+    for state in (x, y, win, loss):
+        tree.add_state(state)
+    tree.add_transition(Transition(root, x, 1.0, is_choice=True))
+    tree.add_transition(Transition(root, y, 1.0, is_choice=True))
+    tree.add_transition(Transition(x, win, 1.0, is_choice=True))
+    tree.add_transition(Transition(y, loss, 1.0, is_choice=True))
+
+    solver = ExpectimaxSolver(tree)
+    value_x, best_x = solver.solve(x.id)
+    value_y, best_y = solver.solve(y.id)
+    assert (value_x, value_y) == (1.0, -1.0)
+    assert best_x.from_state is x and best_y.from_state is y
+    assert solver.solve()[1].to_state is x
@@ -0,0 +1,53 @@
+"""
+Probabilidades de absorção da cadeia de Markov comparadas com a massa de desfechos da árvore.
+"""
+
+import pytest
+
+from markov import AbsorbingChain
+from state import OUTCOMES, OUTCOME_ENEMY_FAINTED
+from state_tree import StateTree
+from transition import Transition
+from test_state_tree import make_state
+from test_paths import build_tree
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_root_absorption_matches_tree_outcomes(seed):
+    tree = build_tree(seed)
+    chain = AbsorbingChain(tree)
+    chain.solve()
+    absorption = chain.get_absorption_probabilities(tree.root_state.id)
+    outcomes = tree.get_outcome_probabilities()
+    for outcome in OUTCOMES:
+        assert absorption[outcome] == pytest.approx(outcomes.get(outcome, 0.0), abs=1e-9)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_every_state_is_consistent_with_its_children(seed):
+    tree = build_tree(seed)
+    everything = AbsorbingChain(tree).get_all_absorption_probabilities()
+    for state_id, absorption in everything.items():
+        outgoing = tree.get_transitions_from(state_id)
+        if not outgoing:
+            outcome = tree.states[state_id].get_outcome()
+            assert absorption == {o: 1.0 if o == outcome else 0.0 for o in OUTCOMES}
+            continue
+        for outcome in OUTCOMES:
+            expected = sum(t.probability * everything[t.to_state.id][outcome] for t in outgoing)
+            assert absorption[outcome] == pytest.approx(expected, abs=1e-9)
+
+
+def test_cycles_converge():
+    root = make_state(0)
+    tree = StateTree(root)
+    a, win = make_state(1), make_state(2, enemy_hp=0)
+    tree.add_state(a)
+    tree.add_state(win)
+    tree.add_transition(Transition(root, a, 1.0))
+    tree.add_transition(Transition(a, root, 0.5))
+    tree.add_transition(Transition(a, win, 0.5))
+
+    chain = AbsorbingChain(tree)
+    assert chain.solve() > 2
+    assert chain.get_absorption_probabilities(root.id)[OUTCOME_ENEMY_FAINTED] == pytest.approx(1.0, abs=1e-9)
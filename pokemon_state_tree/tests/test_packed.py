@@ -0,0 +1,74 @@
+"""
+Codificação compacta de estados: ida e volta, leitura direta e tradução entre processos.
+"""
+
+import random
+
+import pytest
+
+import packed
+from packed import pack_state, unpack_state, get_name_tables, translate_packed, packed_turn, packed_hp
+from pokemon import Pokemon
+from state import State, Weather
+from test_zobrist import make_state, random_action, assert_hash
+
+
+def assert_same_content(a: State, b: State) -> None:
+    assert (a.turn, a.weather, a.battle_type) == (b.turn, b.weather, b.battle_type)
+    assert a.canonical_key() == b.canonical_key()
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_round_trip(seed):
+    rng = random.Random(seed)
+    for turn in range(100):
+        state = make_state(turn)
+        state.pokemons["Self"].is_mega = rng.random() < 0.5
+        random_action(rng).execute(state)
+        code = pack_state(state)
+        restored = unpack_state(code)
+        assert_same_content(restored, state)
+        assert_hash(restored)
+        assert pack_state(restored) == code
+        assert packed_turn(code) == turn
+        pokemon = state.pokemons["Enemy"]
+        assert packed_hp(code, "Enemy") == (pokemon.hp_min_percent, pokemon.hp_max_percent)
+
+
+def test_empty_slots_and_unknown_names():
+    state = State(turn=3, battle_type="single")
+    state.set_weather(Weather.SANDSTORM)
+    state.add_pokemon("Enemy", Pokemon("Missingno Test Form", item="Mystery Test Item"))
+    code = pack_state(state)
+    assert code[1] == 0 and code[3] == 0 and code[4] == 0
+    assert_same_content(unpack_state(code), state)
+
+
+def test_translate_from_another_process():
+    state = State(turn=1, battle_type="double")
+    state.add_pokemon("Self", Pokemon("Pikachu", item="Leftovers"))
+    state.add_pokemon("Enemy", Pokemon("Translate Test Species", item="Translate Test Item"))
+    state.add_pokemon("Self2", Pokemon("Translate Other Species"))
+    local = pack_state(state)
+    local_species, local_items = get_name_tables()
+
+    # O outro processo viu os nomes em outra ordem: inverte os códigos extras
+    base = len(packed.POKEMON_LIST)
+    species_order = list(reversed(local_species))
+    item_order = [None] + list(reversed(local_items[1:]))
+
+    def foreign(code: int) -> int:
+        if not code:
+            return code
+        species = code >> packed.SPECIES_SHIFT & packed.SPECIES_MASK
+        if species >= base:
+            species = base + species_order.index(local_species[species - base])
+        item = item_order.index(local_items[code >> packed.ITEM_SHIFT])
+        identity_mask = ~(packed.SPECIES_MASK << packed.SPECIES_SHIFT) & ((1 << packed.ITEM_SHIFT) - 1)
+        return code & identity_mask | species << packed.SPECIES_SHIFT | item << packed.ITEM_SHIFT
+
+    remote = (local[0], *(foreign(code) for code in local[1:]))
+    assert remote != local
+    translated = translate_packed([remote], (tuple(species_order), tuple(item_order)))
+    assert translated == [local]
+    assert_same_content(unpack_state(translated[0]), state)
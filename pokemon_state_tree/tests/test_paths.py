@@ -0,0 +1,70 @@
+"""
+Enumeração best-first dos caminhos mais prováveis comparada com a enumeração completa.
+"""
+
+import random
+
+import pytest
+
+from state_tree import StateTree
+from transition import Transition
+from test_state_tree import make_state, random_edit
+
+
+def build_tree(seed: int) -> StateTree:
+    rng = random.Random(seed)
+    root = make_state(0)
+    tree = StateTree(root)
+    states = [root]
+    for _ in range(60):
+        random_edit(tree, states, rng)
+    return tree
+
+
+def path_key(path) -> tuple:
+    return tuple(id(t) for t in path)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_paths_come_in_decreasing_probability(seed):
+    tree = build_tree(seed)
+    ordered = list(tree.iter_most_probable_paths())
+    probabilities = [probability for probability, _ in ordered]
+    assert probabilities == sorted(probabilities, reverse=True)
+
+    # Mesmos caminhos (com as mesmas probabilidades) que a enumeração em profundidade
+    expected = {path_key(path): probability for probability, path in tree.iter_paths()}
+    assert {path_key(path) for _, path in ordered} == expected.keys()
+    for probability, path in ordered:
+        assert probability == pytest.approx(expected[path_key(path)])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_top_k_is_a_prefix_and_respects_minimum(seed):
+    tree = build_tree(seed)
+    ordered = list(tree.iter_most_probable_paths())
+    top = tree.get_most_probable_paths(3)
+    assert [path_key(path) for _, path in top] == [path_key(path) for _, path in ordered[:3]]
+    assert tree.get_most_probable_paths(0) == []
+
+    threshold = ordered[len(ordered) // 2][0]
+    kept = tree.get_most_probable_paths(len(ordered), min_probability=threshold)
+    assert all(probability >= threshold for probability, _ in kept)
+    assert len(kept) == sum(1 for probability, _ in ordered if probability >= threshold)
+
+
+def test_cycles_are_not_followed():
+    root = make_state(0)
+    tree = StateTree(root)
+    a, b = make_state(1), make_state(2, enemy_hp=0)
+    tree.add_state(a)
+    tree.add_state(b)
+    tree.add_transition(Transition(root, a, 1.0))
+    tree.add_transition(Transition(a, root, 0.5))
+    tree.add_transition(Transition(a, b, 0.5))
+
+    paths = tree.get_most_probable_paths(5)
+    assert len(paths) == 1
+    probability, path = paths[0]
+    assert probability == pytest.approx(0.5)
+    assert [t.to_state for t in path] == [a, b]
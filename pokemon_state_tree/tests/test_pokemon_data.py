@@ -0,0 +1,42 @@
+"""
+Tabela de espécies: o arquivo gerado vem com o projeto e bate com o CSV de origem.
+"""
+
+from build_species_data import build_species_table
+from damage import BattleStats
+from pokemon import Pokemon
+from pokemon_data import SpeciesTable, get_base_stats, get_species_table, get_types
+from type_chart import threat_matrix
+
+
+def test_known_species_have_stats_and_types():
+    assert get_base_stats("Garchomp") == (108, 130, 95, 80, 85, 102)
+    assert get_types("Garchomp") == ("Dragon", "Ground")
+    assert get_base_stats("pikachu") == (35, 55, 40, 50, 50, 90)
+    assert get_types("Pikachu") == ("Electric",)
+
+
+def test_forms_are_separate_rows():
+    assert get_types("Charizard") == ("Fire", "Flying")
+    assert get_types("Charizard-Mega-X") == ("Fire", "Dragon")
+    assert get_base_stats("Charizard-Mega-Y") == (78, 104, 78, 159, 115, 100)
+    assert get_types("Ninetales-Alola") == ("Ice", "Fairy")
+    assert get_base_stats("Not-A-Pokemon") is None
+
+
+def test_shipped_table_matches_csv():
+    assert get_species_table().to_bytes() == build_species_table().to_bytes()
+    assert SpeciesTable.from_bytes(get_species_table().to_bytes()).to_bytes() == get_species_table().to_bytes()
+
+
+def test_battle_stats_from_species():
+    stats = BattleStats.from_species("Garchomp")
+    assert stats.stats["HP"] == 183
+    assert stats.stats["ATK"] == 150
+    assert stats.stats["SPE"] == 122
+    assert stats.types == ("Dragon", "Ground")
+
+
+def test_threat_matrix_uses_species_types():
+    matrix = threat_matrix([Pokemon("Pikachu"), Pokemon("Garchomp")], [Pokemon("Gyarados"), Pokemon("Garchomp")])
+    assert matrix == [[4.0, 0.0], [1.0, 2.0]]
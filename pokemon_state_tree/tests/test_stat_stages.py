@@ -0,0 +1,65 @@
+"""
+Tabelas de multiplicadores de estágios comparadas com os valores do jogo.
+"""
+
+import pytest
+
+from pokemon import Pokemon
+from stat_stages import BATTLE_STATS, stat_multiplier, accuracy_multiplier, apply_stage, effective_stats, \
+    effective_stat_many, hit_fraction
+
+
+STAT_TABLE = {-6: (2, 8), -5: (2, 7), -4: (2, 6), -3: (2, 5), -2: (2, 4), -1: (2, 3), 0: (2, 2),
+              1: (3, 2), 2: (4, 2), 3: (5, 2), 4: (6, 2), 5: (7, 2), 6: (8, 2)}
+ACCURACY_TABLE = {-6: (3, 9), -5: (3, 8), -4: (3, 7), -3: (3, 6), -2: (3, 5), -1: (3, 4), 0: (3, 3),
+                  1: (4, 3), 2: (5, 3), 3: (6, 3), 4: (7, 3), 5: (8, 3), 6: (9, 3)}
+
+
+def test_multiplier_tables():
+    for stage in range(-6, 7):
+        assert stat_multiplier(stage) == STAT_TABLE[stage]
+        assert accuracy_multiplier(stage) == ACCURACY_TABLE[stage]
+
+
+@pytest.mark.parametrize("stage, expected", [(-6, 25), (-2, 50), (-1, 66), (0, 100), (1, 150), (2, 200), (6, 400)])
+def test_apply_stage_rounds_down(stage, expected):
+    assert apply_stage(100, stage) == expected
+
+
+def test_effective_stats_use_every_stage():
+    pokemon = Pokemon("Pikachu")
+    stages = dict(zip(BATTLE_STATS, (2, -1, 1, -3, 6)))
+    for stat, stage in stages.items():
+        pokemon.set_stat(stat, stage)
+    pokemon.set_stat("ACC", -2)
+    stats = {"HP": 95, "ATK": 100, "DEF": 81, "SATK": 97, "SDEF": 70, "SPE": 156}
+    result = effective_stats(pokemon, stats)
+    assert result["HP"] == 95
+    for stat, stage in stages.items():
+        assert result[stat] == apply_stage(stats[stat], stage)
+
+    pokemons = [Pokemon("Pikachu") for _ in range(13)]
+    for stage, other in zip(range(-6, 7), pokemons):
+        other.set_stat("SPE", stage)
+    assert effective_stat_many("SPE", [p._stages for p in pokemons], [156] * 13) == \
+        [apply_stage(156, stage) for stage in range(-6, 7)]
+    with pytest.raises(ValueError):
+        effective_stat_many("ACC", [], [])
+
+
+@pytest.mark.parametrize("accuracy, acc, eva, expected", [
+    (100, 0, 0, 1.0),
+    (100, -1, 0, 0.75),
+    (100, 1, 0, 1.0),        # limitado a 100%
+    (70, 0, 1, 0.525),
+    (90, 2, 2, 0.9),         # precisão e evasão se anulam
+    (100, -6, 6, 1 / 3),     # estágio combinado limitado a -6
+    (50, 6, -6, 1.0),
+])
+def test_hit_fraction(accuracy, acc, eva, expected):
+    attacker, defender = Pokemon("Pikachu"), Pokemon("Charizard")
+    attacker.set_stat("ACC", acc)
+    defender.set_stat("EVA", eva)
+    numerator, denominator = hit_fraction(accuracy, attacker, defender)
+    assert numerator <= denominator
+    assert numerator / denominator == pytest.approx(expected)
@@ -0,0 +1,264 @@
+"""
+Caches incrementais da StateTree (alcance, desfechos) e lotes de edições.
+"""
+
+import copy
+import pickle
+import random
+
+import pytest
+
+from pokemon import Pokemon
+from state import State
+from state_tree import StateTree
+from transition import Transition
+
+
+def scratch_reach(tree: StateTree) -> dict:
+    """Probabilidades de alcance calculadas do zero (passada topológica sobre o DAG)."""
+    reach = {state_id: 0.0 for state_id in tree.states}
+    reach[tree.root_state.id] = 1.0
+    indegree = {state_id: len(tree.get_transitions_to(state_id)) for state_id in tree.states}
+    ready = [state_id for state_id, degree in indegree.items() if degree == 0]
+    while ready:
+        state_id = ready.pop()
+        for t in tree.get_transitions_from(state_id):
+            reach[t.to_state.id] += reach[state_id] * t.probability
+            indegree[t.to_state.id] -= 1
+            if indegree[t.to_state.id] == 0:
+                ready.append(t.to_state.id)
+    return reach
+
+
+def scratch_outcomes(tree: StateTree) -> dict:
+    reach = scratch_reach(tree)
+    mass = {}
+    for state in tree.get_leaf_states():
+        outcome = state.get_outcome()
+        mass[outcome] = mass.get(outcome, 0.0) + reach[state.id]
+    return mass
+
+
+def assert_caches(tree: StateTree) -> None:
+    expected = scratch_reach(tree)
+    actual = tree.get_reach_probabilities()
+    assert actual.keys() == expected.keys()
+    for state_id, probability in expected.items():
+        assert actual[state_id] == pytest.approx(probability, abs=1e-9)
+        assert tree.get_reach_probability(state_id) == pytest.approx(probability, abs=1e-9)
+    outcomes = tree.get_outcome_probabilities()
+    for outcome, probability in scratch_outcomes(tree).items():
+        assert outcomes[outcome] == pytest.approx(probability, abs=1e-9)
+
+
+def make_state(turn: int, self_hp: int = 100, enemy_hp: int = 100) -> State:
+    state = State(turn=turn)
+    pokemon = Pokemon("Pikachu")
+    pokemon.set_hp_range(self_hp, self_hp)
+    state.add_pokemon("Self", pokemon)
+    enemy = Pokemon("Charizard")
+    enemy.set_hp_range(enemy_hp, enemy_hp)
+    state.add_pokemon("Enemy", enemy)
+    return state
+
+
+def random_child(rng: random.Random, turn: int) -> State:
+    return make_state(turn, rng.choice([0, 50, 100]), rng.choice([0, 50, 100]))
+
+
+def random_edit(tree: StateTree, states: list, rng: random.Random, normalize: bool = True) -> None:
+    """Aplica uma edição aleatória (os estados da árvore ficam em `states`)."""
+    op = rng.random()
+    if op < 0.35 or len(states) < 4:
+        parent = rng.choice(states)
+        child = random_child(rng, parent.turn + 1)
+        tree.add_state(child)
+        tree.add_transition(Transition(parent, child, rng.random()))
+        states.append(child)
+    elif op < 0.45:
+        # Aresta extra de um turno para um turno posterior (mantém o DAG)
+        a, b = rng.sample(states, 2)
+        if a.turn < b.turn:
+            tree.add_transition(Transition(a, b, rng.random()))
+    elif op < 0.65:
+        transitions = tree.get_all_transitions()
+        if transitions:
+            rng.choice(transitions).set_probability(rng.random())
+    elif op < 0.75:
+        transitions = tree.get_all_transitions()
+        if transitions:
+            tree.remove_transition(rng.choice(transitions))
+    elif op < 0.85:
+        state = rng.choice(states[1:])
+        tree.remove_state(state.id)
+        states.remove(state)
+    elif op < 0.93:
+        leaves = [s for s in tree.get_leaf_states() if s is not tree.root_state]
+        if len(leaves) >= 2:
+            keep, duplicate = rng.sample(leaves, 2)
+            if tree.merge_states(keep.id, duplicate.id):
+                states.remove(duplicate)
+    elif normalize:
+        tree.auto_adjust_probabilities(rng.choice(states).id)
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_cached_reach_matches_recompute(seed):
+    rng = random.Random(seed)
+    root = make_state(0)
+    tree = StateTree(root)
+    states = [root]
+    for step in range(400):
+        random_edit(tree, states, rng)
+        if step % 5 == 0:
+            assert_caches(tree)
+    assert_caches(tree)
+
+
+def test_direct_probability_change_invalidates_reach():
+    root = make_state(0)
+    tree = StateTree(root)
+    a, b = make_state(1, enemy_hp=0), make_state(1, self_hp=0)
+    tree.add_state(a)
+    tree.add_state(b)
+    ta = Transition(root, a, 0.5)
+    tree.add_transition(ta)
+    tree.add_transition(Transition(root, b, 0.5))
+    assert tree.get_reach_probability(a.id) == pytest.approx(0.5)
+
+    ta.set_probability(0.9)
+    assert tree.get_reach_probability(a.id) == pytest.approx(0.9)
+    assert_caches(tree)
+
+
+def signature(tree: StateTree) -> list:
+    return sorted((t.from_state.id, t.to_state.id, round(t.probability, 12)) for t in tree.get_all_transitions())
+
+
+def build_pair(seed: int):
+    """Duas árvores idênticas (mesmos IDs) para comparar lote e edições uma a uma."""
+    trees = []
+    for _ in range(2):
+        rng = random.Random(seed)
+        root = make_state(0)
+        tree = StateTree(root)
+        states = [root]
+        for _ in range(60):
+            random_edit(tree, states, rng)
+        trees.append((tree, states))
+    return trees
+
+
+@pytest.mark.parametrize("seed", range(4))
+@pytest.mark.parametrize("normalize", [False, True])
+def test_batch_matches_one_by_one(seed, normalize):
+    (sequential, sequential_states), (batched, batched_states) = build_pair(seed)
+    assert signature(sequential) == signature(batched)
+
+    edits = random.Random(seed + 100)
+    with batched.batch(normalize=normalize) as changes:
+        for _ in range(40):
+            random_edit(batched, batched_states, edits, normalize=False)
+
+    edits = random.Random(seed + 100)
+    for _ in range(40):
+        random_edit(sequential, sequential_states, edits, normalize=False)
+    if normalize:
+        # O lote normaliza cada estado de origem afetado uma única vez, no fim
+        for state_id in changes.affected_states:
+            if state_id in sequential.states:
+                sequential.auto_adjust_probabilities(state_id)
+
+    assert sequential.states.keys() == batched.states.keys()
+    assert signature(sequential) == signature(batched)
+    assert [t.to_state.id for t in batched.get_all_transitions()] == \
+        [t.to_state.id for t in sequential.get_all_transitions()]
+    assert_caches(batched)
+
+
+def test_tree_survives_pickle_and_deepcopy():
+    root = make_state(0)
+    tree = StateTree(root)
+    child = make_state(1, enemy_hp=0)
+    tree.add_state(child)
+    tree.add_transition(Transition(root, child, 1.0))
+
+    for clone in (pickle.loads(pickle.dumps(tree)), copy.deepcopy(tree)):
+        new_state = clone.create_state("Extra", 2, "single")
+        assert new_state.id not in clone.states
+        clone.transitions[0].set_probability(0.5)
+        assert clone.get_reach_probability(child.id) == pytest.approx(0.5)
+    assert tree.get_reach_probability(child.id) == pytest.approx(1.0)
+
+
+def test_add_subtree_matches_one_by_one():
+    (bulk, _), (single, _) = build_pair(11)
+    for tree in (bulk, single):
+        assert_caches(tree)
+    anchor_id = max(bulk.states)
+    recorder = []
+    bulk.events.subscribe(lambda event_type, **data: recorder.append(event_type))
+
+    def subtree(tree):
+        anchor = tree.states[anchor_id]
+        children = [make_state(anchor.turn + 1, enemy_hp=hp) for hp in (0, 50, 100)]
+        grandchild = make_state(anchor.turn + 2, self_hp=0)
+        transitions = [Transition(anchor, child, p) for child, p in zip(children, (0.2, 0.3, 0.5))]
+        transitions.append(Transition(children[2], grandchild, 1.0))
+        return children + [grandchild], transitions
+
+    states, transitions = subtree(bulk)
+    assert bulk.add_subtree(states, transitions) == 4
+    states, transitions = subtree(single)
+    for state in states:
+        single.add_state(state)
+    for t in transitions:
+        single.add_transition(t)
+
+    assert signature(bulk) == signature(single)
+    assert sorted(bulk.states) == sorted(single.states)
+    assert recorder.count("state_added") == 4 and recorder.count("transition_added") == 4
+    assert_caches(bulk)
+    assert all(bulk._transposition_keys[state.id] == state.zobrist_hash for state in states)
+
+    with pytest.raises(ValueError):
+        bulk.add_subtree([], [Transition(bulk.root_state, make_state(1), 1.0)])
+
+
+def test_reads_inside_a_batch_see_pending_work():
+    root = make_state(0)
+    tree = StateTree(root)
+    a, b = make_state(1, enemy_hp=0), make_state(1, self_hp=0)
+    tree.add_state(a)
+    tree.add_state(b)
+    ta = Transition(root, a, 0.5)
+    tree.add_transition(ta)
+    tree.add_transition(Transition(root, b, 0.5))
+    assert tree.get_reach_probability(a.id) == pytest.approx(0.5)
+
+    with tree.batch():
+        deltas = tree.update_transition_probability(ta, 0.9)
+        # 0.9 e 0.5 renormalizados: 0.9 / 1.4
+        assert tree.get_reach_probability(a.id) == pytest.approx(0.9 / 1.4)
+        assert deltas["Enemy fainted"] == pytest.approx(0.9 / 1.4 - 0.5)
+        assert deltas["Self fainted"] == pytest.approx(0.5 / 1.4 - 0.5)
+
+        c = make_state(2)
+        tree.add_state(c)
+        tree.add_transition(Transition(a, c, 1.0))
+        assert tree.get_reach_probability(c.id) == pytest.approx(0.9 / 1.4)
+        assert [p for p, _ in tree.get_most_probable_paths(2)] == [pytest.approx(0.9 / 1.4), pytest.approx(0.5 / 1.4)]
+    assert tree.get_reach_probability(a.id) == pytest.approx(0.9 / 1.4)
+    assert_caches(tree)
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_caches_inside_a_batch(seed):
+    (tree, states), _ = build_pair(seed)
+    rng = random.Random(seed + 200)
+    with tree.batch(normalize=False):
+        for step in range(60):
+            random_edit(tree, states, rng, normalize=False)
+            if step % 6 == 0:
+                assert_caches(tree)
+    assert_caches(tree)
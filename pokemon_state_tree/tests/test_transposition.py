@@ -0,0 +1,53 @@
+"""
+A tabela de transposição acompanha as edições feitas em estados que já estão na árvore.
+"""
+
+from pokemon import Pokemon
+from state import State, Weather
+from state_tree import StateTree
+
+
+def test_state_edited_after_insertion_is_found():
+    tree = StateTree(State(turn=0))
+    a = State(turn=1)
+    tree.add_state(a)
+    a.add_pokemon("Self", Pokemon("Pikachu"))
+
+    b = State(turn=1)
+    b.add_pokemon("Self", Pokemon("Pikachu"))
+    assert tree.find_transposition(b) is a
+
+
+def test_edits_move_the_state_between_keys():
+    tree = StateTree(State(turn=0))
+    a = State(turn=1)
+    a.add_pokemon("Self", Pokemon("Pikachu"))
+    tree.add_state(a)
+
+    before = State(turn=1)
+    before.add_pokemon("Self", Pokemon("Pikachu"))
+    a.set_weather(Weather.RAIN)
+    with a.edit_pokemon("Self") as pokemon:
+        pokemon.set_hp_range(50, 60)
+    assert tree.find_transposition(before) is None
+
+    after = State(turn=1)
+    after.set_weather(Weather.RAIN)
+    after.add_pokemon("Self", Pokemon("Pikachu"))
+    with after.edit_pokemon("Self") as pokemon:
+        pokemon.set_hp_range(50, 60)
+    assert tree.find_transposition(after) is a
+
+
+def test_removed_state_leaves_the_table():
+    tree = StateTree(State(turn=0))
+    a = State(turn=1)
+    a.add_pokemon("Self", Pokemon("Pikachu"))
+    tree.add_state(a)
+    tree.remove_state(a.id)
+    assert a.id not in tree._transposition_keys
+    a.change_pokemon_hp("Self", -10, -10)
+
+    b = State(turn=1)
+    b.add_pokemon("Self", Pokemon("Pikachu"))
+    assert tree.find_transposition(b) is None
@@ -0,0 +1,57 @@
+"""
+Tabela de efetividade de tipos: valores conhecidos e consultas em lote.
+"""
+
+import itertools
+
+import pytest
+
+from pokemon_data import TYPES
+from type_chart import effectiveness, effectiveness_many, effectiveness_table
+
+
+@pytest.mark.parametrize("move_type, defender, expected", [
+    ("Electric", ("Water", "Flying"), 4.0),
+    ("Ice", ("Dragon", "Ground"), 4.0),
+    ("Ground", ("Fire", "Steel"), 4.0),
+    ("Ground", ("Flying",), 0.0),
+    ("Fighting", ("Normal", "Ghost"), 0.0),
+    ("Dragon", ("Fairy",), 0.0),
+    ("Fire", ("Water", "Ground"), 0.5),
+    ("Bug", ("Fire", "Flying"), 0.25),
+    ("Fairy", ("Dragon",), 2.0),
+    ("Water", ("Grass", "Ground"), 1.0),
+    ("Psychic", ("Psychic",), 0.5),
+    ("Normal", ("Normal",), 1.0),
+])
+def test_known_matchups(move_type, defender, expected):
+    assert effectiveness(move_type, defender) == expected
+
+
+def test_single_type_counts():
+    # Tabela das gerações 6+: 51 super efetivos, 61 resistências e 8 imunidades
+    values = [effectiveness(move, (defender,)) for move in TYPES for defender in TYPES]
+    assert len(values) == 18 * 18
+    assert values.count(2.0) == 51
+    assert values.count(0.5) == 61
+    assert values.count(0.0) == 8
+
+
+def test_dual_types_multiply_and_ignore_order():
+    for move in TYPES:
+        for first, second in itertools.product(TYPES, repeat=2):
+            expected = effectiveness(move, (first,)) * (1.0 if first == second else effectiveness(move, (second,)))
+            assert effectiveness(move, (first, second)) == expected
+            assert effectiveness(move, (second, first)) == expected
+
+
+def test_batched_lookups_match_single_lookups():
+    moves = list(TYPES)
+    defenders = [(t,) for t in TYPES] + [("Water", "Flying"), ("Steel", "Fairy"), ("Ghost", "Dark")]
+    table = effectiveness_table(moves, defenders)
+    for i, move in enumerate(moves):
+        assert table[i] == [effectiveness(move, defender) for defender in defenders]
+
+    pairs = list(itertools.product(moves, defenders))
+    assert effectiveness_many([move for move, _ in pairs], [defender for _, defender in pairs]) == \
+        [effectiveness(move, defender) for move, defender in pairs]
@@ -0,0 +1,151 @@
+"""
+O hash Zobrist mantido incrementalmente deve ser sempre igual ao recalculado do zero.
+"""
+
+import random
+
+import pytest
+
+import zobrist
+from expander import TreeExpander, pack_subtree, splice_subtree
+from pokemon import Pokemon, MajorStatus, MinorStatus
+from state import State, Weather, SLOTS
+from state_tree import StateTree
+from transition import Action
+
+
+def scratch_hash(state: State) -> int:
+    """Hash Zobrist calculado do zero a partir do conteúdo do estado."""
+    h = zobrist.weather_key(state.weather) ^ zobrist.battle_type_key(state.battle_type)
+    for slot, pokemon in state.pokemons.items():
+        h ^= zobrist.pokemon_hash(slot, pokemon)
+    return h
+
+
+def assert_hash(state: State) -> None:
+    assert state.zobrist_hash == scratch_hash(state)
+
+
+def make_state(turn: int = 0) -> State:
+    state = State(turn=turn, battle_type="double")
+    state.add_pokemon("Self", Pokemon("Pikachu", item="Leftovers"))
+    state.add_pokemon("Enemy", Pokemon("Charizard"))
+    state.add_pokemon("Self2", Pokemon("Blastoise", item="Choice Specs"))
+    return state
+
+
+def random_action(rng: random.Random) -> Action:
+    action = Action()
+    for _ in range(rng.randint(1, 6)):
+        slot = rng.choice(SLOTS)
+        op = rng.random()
+        if op < 0.35:
+            delta = rng.choice([-100, -40, -7, 5, 30, 2.5])
+            action.add_pokemon_hp_change(slot, delta, delta if rng.random() < 0.7 else -delta)
+        elif op < 0.7:
+            action.add_pokemon_stat_change(slot, rng.choice(Pokemon.STAT_NAMES[1:]), rng.randint(-6, 6))
+        elif op < 0.9:
+            action.add_pokemon_status_change(slot, rng.choice(list(MajorStatus)), rng.choice(list(MinorStatus)))
+        else:
+            action.add_weather_change(rng.choice(list(Weather)))
+    return action
+
+
+def test_state_operations_keep_hash():
+    state = make_state()
+    assert_hash(state)
+    state.set_weather(Weather.RAIN)
+    assert_hash(state)
+    state.change_pokemon_hp("Self", -30, -20)
+    assert_hash(state)
+    state.change_pokemon_stat("Enemy", "ATK", -2)
+    assert_hash(state)
+    state.change_pokemon_status("Self2", MajorStatus.BURN, MinorStatus.CONFUSED)
+    assert_hash(state)
+    state.apply_pokemon_changes("Enemy", -10, -5, (("SPE", 1), ("DEF", -1)), MajorStatus.PARALYSIS)
+    assert_hash(state)
+    state.add_pokemon("Enemy2", Pokemon("Gengar"))
+    assert_hash(state)
+    state.share_pokemon("Self", Pokemon("Lapras"))
+    assert_hash(state)
+    state.remove_pokemon("Self2")
+    assert_hash(state)
+    with state.edit_pokemon("Enemy") as pokemon:
+        pokemon.set_hp_range(10, 20)
+        pokemon.set_stat("EVA", 3)
+    assert_hash(state)
+
+
+def test_shared_pokemons_keep_hash():
+    parent = make_state()
+    parent.change_pokemon_stat("Self", "ATK", 2)
+
+    child = State(turn=1, battle_type="double")
+    child.share_pokemons_from(parent)
+    assert_hash(child)
+    # Copy-on-write: alterar o filho não altera o pai
+    child.change_pokemon_hp("Self", -50, -50)
+    assert_hash(child)
+    assert_hash(parent)
+
+    pokemons = {slot: pokemon for slot, pokemon in parent.pokemons.items() if pokemon is not None}
+    known = zobrist.pokemon_hash("Self", pokemons["Self"]) ^ zobrist.pokemon_hash("Enemy", pokemons["Enemy"]) \
+        ^ zobrist.pokemon_hash("Self2", pokemons["Self2"])
+    for pokemons_hash in (None, known):
+        other = State(turn=1, battle_type="double")
+        other.share_pokemons(pokemons, pokemons_hash)
+        assert_hash(other)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_actions_keep_hash(seed):
+    rng = random.Random(seed)
+    for _ in range(200):
+        action = random_action(rng)
+        fused, sequential = make_state(), make_state()
+        action.execute(fused)
+        action.execute_sequential(sequential)
+        assert_hash(fused)
+        assert_hash(sequential)
+        assert fused.canonical_key() == sequential.canonical_key()
+
+
+def test_batch_execution_keeps_hash():
+    rng = random.Random(7)
+    parent = make_state()
+    for _ in range(50):
+        action = random_action(rng)
+        states = []
+        for _ in range(4):
+            state = State(turn=1, battle_type="double")
+            state.share_pokemons_from(parent)
+            states.append(state)
+        action.execute_batch(states)
+        for state in states:
+            assert_hash(state)
+            expected = make_state()
+            action.execute_sequential(expected)
+            assert state.canonical_key()[1:] == expected.canonical_key()[1:]
+
+
+def _rule(state):
+    action = Action()
+    action.add_pokemon_hp_change("Enemy", -25, -15)
+    miss = Action()
+    miss.add_pokemon_stat_change("Self", "ACC", -1)
+    return [(0.6, action), (0.4, miss)]
+
+
+def test_spliced_subtree_keeps_hash():
+    source = StateTree(make_state())
+    TreeExpander(source, [_rule]).expand(3)
+    packed = pack_subtree(source)
+
+    tree = StateTree(make_state())
+    anchor = tree.root_state
+    added = splice_subtree(tree, anchor, packed)
+    assert added == len(source.states) - 1
+    for state in tree.states.values():
+        assert_hash(state)
+    assert sorted(s.zobrist_hash for s in tree.states.values()) == \
+        sorted(s.zobrist_hash for s in source.states.values())
@@ -1,14 +1,46 @@
-from typing import Callable, Optional, List
+from typing import Any, Callable, Dict, Iterable, Optional, List, Tuple
 from state import State, Weather
 from pokemon import Pokemon, MajorStatus, MinorStatus
+from events import PROBABILITY_CHANGED
+
+
+# Registro de efeito: (código da operação, slot ou None, argumentos)
+Effect = Tuple[str, Optional[str], Tuple[Any, ...]]
+
+
+def _apply_weather(state: State, slot: Optional[str], weather: Weather) -> None:
+    state.set_weather(weather)
 
 
 class Action:
-    """Classe que representa uma ação que afeta o estado ou Pokémon."""
+    """
+    Classe que representa uma ação que afeta o estado ou Pokémon.
+    
+    Os efeitos são guardados como registros declarativos (op, slot, args), e não como
+    funções, para que possam ser inspecionados, salvos, comparados e enviados a outros
+    processos. Um único laço de despacho os interpreta em execute().
+    """
+
+    OP_STATUS = "status"
+    OP_HP = "hp"
+    OP_STAT = "stat"
+    OP_WEATHER = "weather"
+
+    # Código da operação -> função (state, slot, *args)
+    _HANDLERS = {
+        OP_STATUS: State.change_pokemon_status,
+        OP_HP: State.change_pokemon_hp,
+        OP_STAT: State.change_pokemon_stat,
+        OP_WEATHER: _apply_weather,
+    }
 
     def __init__(self):
         """Inicializa uma ação."""
-        self.effects: List[Callable[[State], None]] = []
+        self.effects: List[Effect] = []
+        # Plano e função compilados a partir dos efeitos, e o número de efeitos que cobrem
+        self._plan: Optional[Tuple[tuple, Optional[Weather], Dict[str, tuple]]] = None
+        self._compiled: Optional[Callable[[State], None]] = None
+        self._compiled_count = 0
 
     def add_pokemon_status_change(self, slot: str, major_status: Optional[MajorStatus] = None, minor_status: Optional[MinorStatus] = None) -> None:
         """
@@ -19,15 +51,8 @@ class Action:
             major_status: Status principal a ser aplicado
             minor_status: Status secundário a ser aplicado
         """
-        def effect(state: State):
-            pokemon = state.get_pokemon(slot)
-            if pokemon:
-                if major_status:
-                    pokemon.set_major_status(major_status)
-                if minor_status:
-                    pokemon.set_minor_status(minor_status)
-        
-        self.effects.append(effect)
+        self._plan = None
+        self.effects.append((self.OP_STATUS, slot, (major_status, minor_status)))
 
     def add_pokemon_hp_change(self, slot: str, hp_min_delta: float = 0, hp_max_delta: float = 0) -> None:
         """
@@ -38,14 +63,8 @@ class Action:
             hp_min_delta: Mudança na vida mínima (em percentual)
             hp_max_delta: Mudança na vida máxima (em percentual)
         """
-        def effect(state: State):
-            pokemon = state.get_pokemon(slot)
-            if pokemon:
-                new_min = pokemon.hp_min_percent + hp_min_delta
-                new_max = pokemon.hp_max_percent + hp_max_delta
-                pokemon.set_hp_range(new_min, new_max)
-        
-        self.effects.append(effect)
+        self._plan = None
+        self.effects.append((self.OP_HP, slot, (hp_min_delta, hp_max_delta)))
 
     def add_pokemon_stat_change(self, slot: str, stat_name: str, value_delta: int) -> None:
         """
@@ -56,14 +75,8 @@ class Action:
             stat_name: Nome do stat (HP, ATK, DEF, SATK, SDEF, SPE, ACC, EVA)
             value_delta: Mudança no valor do stat
         """
-        def effect(state: State):
-            pokemon = state.get_pokemon(slot)
-            if pokemon:
-                current_value = pokemon.get_stat(stat_name) or 0
-                new_value = current_value + value_delta
-                pokemon.set_stat(stat_name, new_value)
-        
-        self.effects.append(effect)
+        self._plan = None
+        self.effects.append((self.OP_STAT, slot, (stat_name, value_delta)))
 
     def add_weather_change(self, weather: Weather) -> None:
         """
@@ -72,10 +85,8 @@ class Action:
         Args:
             weather: Nova condição de clima
         """
-        def effect(state: State):
-            state.set_weather(weather)
-        
-        self.effects.append(effect)
+        self._plan = None
+        self.effects.append((self.OP_WEATHER, None, (weather,)))
 
     def execute(self, state: State) -> None:
         """
@@ -84,8 +95,291 @@ class Action:
         Args:
             state: Estado a ser modificado
         """
+        self.compile()(state)
+
+    def execute_sequential(self, state: State) -> None:
+        """
+        Executa os efeitos um a um, na ordem em que foram adicionados.
+        
+        Cada efeito limita vida e estágios ao intervalo válido imediatamente. O resultado
+        é sempre igual ao de execute(), que só agrupa deltas quando isso não muda nada.
+        
+        Args:
+            state: Estado a ser modificado
+        """
+        handlers = self._HANDLERS
+        for op, slot, args in self.effects:
+            handlers[op](state, slot, *args)
+
+    def execute_batch(self, states: Iterable[State]) -> None:
+        """
+        Executa a ação em vários estados em uma única passada por slot.
+        
+        Usa o mesmo plano compilado de execute(), mas cada passo de slot é calculado uma
+        vez por combinação distinta de vida, status e estágios (ver
+        State.mutate_pokemons_batch) e copiado para os demais Pokémon com os mesmos
+        valores; a guarda do slot também é verificada uma vez por combinação.
+        
+        Args:
+            states: Estados a modificar (ex: StateTree.get_states_by_turn ou get_leaf_states)
+        """
+        states = list(dict.fromkeys(states))  # Cada estado uma única vez
+        steps, weather, guards = self.compile_plan()
+        for step in steps:
+            guard = guards.get(step[0])
+            State.mutate_pokemons_batch(states, step[0],
+                                        lambda pokemon, step=step, guard=guard: Action.apply_step(pokemon, step, guard))
+        if weather is not None:
+            for state in states:
+                state.set_weather(weather)
+
+    def compile_plan(self) -> Tuple[tuple, Optional[Weather], Dict[str, tuple]]:
+        """
+        Agrupa os efeitos em um plano por slot.
+        
+        Deltas de vida e de cada stat são somados e o último status aplicado prevalece;
+        vida e estágios são limitados uma única vez, no final. Somar só é equivalente a
+        aplicar os efeitos um a um quando nenhum valor intermediário é limitado (ex: ATK
+        +6, +6, -2 termina em +4 efeito a efeito), então slots com mais de um delta de
+        vida ou do mesmo stat recebem uma guarda, verificada contra os valores atuais do
+        Pokémon antes de usar o passo agrupado. O plano fica em cache até que um novo
+        efeito seja adicionado.
+        
+        Returns:
+            Tupla (passos, clima, guardas), onde cada passo contém os argumentos de
+            State.apply_pokemon_changes, clima é o último clima aplicado (ou None) e
+            guardas mapeia slot -> (limites de vida, limites de stats, efeitos do slot)
+        """
+        if self._plan is not None and self._compiled_count == len(self.effects):
+            return self._plan
+        
+        # slot -> [hp_min_delta, hp_max_delta, {stat: delta}, major_status, minor_status]
+        plans: Dict[str, list] = {}
+        slot_effects: Dict[str, List[Effect]] = {}
+        weather = None
         for effect in self.effects:
-            effect(state)
+            op, slot, args = effect
+            if op == self.OP_WEATHER:
+                weather = args[0]
+                continue
+            
+            plan = plans.setdefault(slot, [0, 0, {}, None, None])
+            slot_effects.setdefault(slot, []).append(effect)
+            if op == self.OP_HP:
+                plan[0] += args[0]
+                plan[1] += args[1]
+            elif op == self.OP_STAT:
+                stat_name, value_delta = args
+                plan[2][stat_name] = plan[2].get(stat_name, 0) + value_delta
+            elif op == self.OP_STATUS:
+                major_status, minor_status = args
+                plan[3] = major_status or plan[3]
+                plan[4] = minor_status or plan[4]
+            else:
+                raise ValueError(f"Unknown action op: {op}")
+        
+        steps = tuple(
+            (slot, hp_min_delta, hp_max_delta,
+             tuple((stat, delta) for stat, delta in stat_deltas.items() if delta),
+             major_status, minor_status)
+            for slot, (hp_min_delta, hp_max_delta, stat_deltas, major_status, minor_status) in plans.items()
+        )
+        guards = {}
+        for slot, effects in slot_effects.items():
+            guard = Action._fold_guard(effects)
+            if guard is not None:
+                guards[slot] = guard
+        
+        self._plan = (steps, weather, guards)
+        self._compiled = None
+        self._compiled_count = len(self.effects)
+        return self._plan
+
+    @staticmethod
+    def _fold_guard(effects: List[Effect]) -> Optional[tuple]:
+        """
+        Calcula os limites que os valores de um slot precisam respeitar para que os deltas
+        possam ser somados (None se o slot não tem deltas repetidos).
+        
+        Só os valores intermediários importam: o último efeito é limitado da mesma forma
+        nos dois caminhos.
+        
+        Returns:
+            (limites de vida, limites de stats, efeitos), onde limites de vida é None (um
+            único delta), False (deltas fracionários, nunca somar) ou (menor e maior soma
+            parcial da vida mínima, idem da vida máxima, menor diferença entre elas), e
+            limites de stats são (deslocamento, menor soma parcial, maior soma parcial)
+        """
+        hp_deltas = [args for op, _, args in effects if op == Action.OP_HP]
+        stat_deltas: Dict[str, List[int]] = {}
+        for op, _, args in effects:
+            if op == Action.OP_STAT and args[0] in Pokemon.STAT_SHIFT:
+                stat_deltas.setdefault(args[0], []).append(int(args[1]))
+        
+        hp_limits = None
+        if len(hp_deltas) > 1:
+            intermediate = hp_deltas[:-1]
+            if any(not float(delta).is_integer() for pair in intermediate for delta in pair):
+                # set_hp_range trunca a cada efeito
+                hp_limits = False
+            else:
+                min_sums, max_sums = [], []
+                min_sum = max_sum = 0
+                for hp_min_delta, hp_max_delta in intermediate:
+                    min_sum += hp_min_delta
+                    max_sum += hp_max_delta
+                    min_sums.append(min_sum)
+                    max_sums.append(max_sum)
+                hp_limits = (min(min_sums), max(min_sums), min(max_sums), max(max_sums),
+                             min(high - low for low, high in zip(min_sums, max_sums)))
+        
+        stat_limits = []
+        for stat_name, deltas in stat_deltas.items():
+            if len(deltas) > 1:
+                sums = []
+                total = 0
+                for delta in deltas[:-1]:
+                    total += delta
+                    sums.append(total)
+                stat_limits.append((Pokemon.STAT_SHIFT[stat_name], min(sums), max(sums)))
+        
+        if hp_limits is None and not stat_limits:
+            return None
+        return hp_limits, tuple(stat_limits), tuple(effects)
+
+    @staticmethod
+    def _can_fold(pokemon: Pokemon, guard: tuple) -> bool:
+        """Verifica se os deltas de um slot podem ser somados sem saturar um valor intermediário."""
+        hp_limits, stat_limits, _ = guard
+        if hp_limits is False:
+            return False
+        if hp_limits is not None:
+            min_low, min_high, max_low, max_high, gap = hp_limits
+            low, high = pokemon.hp_min_percent, pokemon.hp_max_percent
+            if (low + min_low < 0 or low + min_high > 100 or high + max_low < 0 or high + max_high > 100
+                    or high - low + gap < 0):
+                return False
+        stages = pokemon._stages
+        top = Pokemon.STAT_MAX - Pokemon.STAT_MIN
+        for shift, low, high in stat_limits:
+            current = (stages >> shift) & Pokemon.STAT_MASK
+            if current + low < 0 or current + high > top:
+                return False
+        return True
+
+    @staticmethod
+    def apply_step(pokemon: Pokemon, step: tuple, guard: Optional[tuple]) -> int:
+        """
+        Aplica um passo do plano de compile_plan a um Pokémon avulso (já exclusivo).
+        
+        Se a guarda do slot falha nos valores atuais, os efeitos do slot são aplicados um
+        a um, como em execute_sequential.
+        
+        Args:
+            pokemon: Pokémon a modificar
+            step: Passo do plano (argumentos de State.apply_pokemon_changes)
+            guard: Guarda do slot (None se o slot não tem deltas repetidos)
+            
+        Returns:
+            Delta do hash Zobrist do slot
+        """
+        if guard is None or Action._can_fold(pokemon, guard):
+            return State._mutate_pokemon(pokemon, *step)
+        delta = 0
+        for op, slot, args in guard[2]:
+            if op == Action.OP_HP:
+                delta ^= State._mutate_pokemon(pokemon, slot, args[0], args[1], (), None, None)
+            elif op == Action.OP_STAT:
+                delta ^= State._mutate_pokemon(pokemon, slot, 0, 0, (args,), None, None)
+            else:
+                delta ^= State._mutate_pokemon(pokemon, slot, 0, 0, (), args[0], args[1])
+        return delta
+
+    def compile(self) -> Callable[[State], None]:
+        """
+        Compila os efeitos em uma única função que aplica tudo de uma vez.
+        
+        A função aplica o plano de compile_plan: uma chamada por slot afetado, mais a
+        mudança de clima. Slots cuja guarda falha nos valores atuais são aplicados efeito
+        a efeito. O resultado fica em cache até que um novo efeito seja adicionado.
+        
+        Returns:
+            Função que recebe um estado e aplica a ação a ele
+        """
+        steps, weather, guards = self.compile_plan()
+        if self._compiled is not None:
+            return self._compiled
+        handlers = self._HANDLERS
+        
+        def compiled(state: State) -> None:
+            for step in steps:
+                guard = guards.get(step[0])
+                if guard is not None:
+                    pokemon = state.pokemons.get(step[0])
+                    if pokemon is not None and not Action._can_fold(pokemon, guard):
+                        for op, slot, args in guard[2]:
+                            handlers[op](state, slot, *args)
+                        continue
+                state.apply_pokemon_changes(*step)
+            if weather is not None:
+                state.set_weather(weather)
+        
+        self._compiled = compiled
+        return compiled
+
+    def copy(self) -> "Action":
+        """
+        Cria uma cópia independente da ação.
+        
+        A lista de efeitos é copiada; o plano e a função compilados não dependem da
+        instância e são reaproveitados, então a cópia não precisa ser recompilada.
+        """
+        action = Action()
+        action.effects = list(self.effects)
+        action._plan, action._compiled, action._compiled_count = self._plan, self._compiled, self._compiled_count
+        return action
+
+    def __getstate__(self) -> dict:
+        """Estado para pickle: o plano e a função compilados (locais) não são serializados."""
+        data = self.__dict__.copy()
+        data["_plan"] = None
+        data["_compiled"] = None
+        data["_compiled_count"] = 0
+        return data
+
+    def to_list(self) -> List[list]:
+        """
+        Converte os efeitos para uma lista serializável em JSON.
+        
+        Returns:
+            Lista de [op, slot, args], com enums representados pelo nome
+        """
+        return [[op, slot, [arg.name if isinstance(arg, (MajorStatus, MinorStatus, Weather)) else arg
+                            for arg in args]]
+                for op, slot, args in self.effects]
+
+    @staticmethod
+    def from_list(data: List[list]) -> "Action":
+        """
+        Cria uma ação a partir da lista gerada por to_list.
+        
+        Args:
+            data: Lista de [op, slot, args]
+            
+        Returns:
+            Nova ação com os efeitos carregados
+        """
+        action = Action()
+        for op, slot, args in data:
+            if op == Action.OP_STATUS:
+                major, minor = args
+                args = (MajorStatus[major] if major else None, MinorStatus[minor] if minor else None)
+            elif op == Action.OP_WEATHER:
+                args = (Weather[args[0]],)
+            elif op not in Action._HANDLERS:
+                raise ValueError(f"Unknown action op: {op}")
+            action.effects.append((op, slot, tuple(args)))
+        return action
 
     def __repr__(self) -> str:
         return f"Action(effects={len(self.effects)})"
@@ -94,7 +388,10 @@ class Action:
 class Transition:
     """Classe que representa uma transição entre estados."""
 
-    def __init__(self, from_state: State, to_state: State, probability: float):
+    _events = None  # EventBus da árvore que contém a transição (ver StateTree.add_transition)
+
+    def __init__(self, from_state: State, to_state: State, probability: float, is_choice: bool = False,
+                 action: Optional["Action"] = None):
         """
         Inicializa uma transição.
         
@@ -102,15 +399,22 @@ class Transition:
             from_state: Estado de origem
             to_state: Estado de destino
             probability: Probabilidade da transição (0.0 a 1.0)
+            is_choice: Se True, a transição é uma decisão do jogador (golpe, troca...)
+                       e não um evento de chance
+            action: Ação da transição (None = ação vazia)
         """
         self.from_state = from_state
         self.to_state = to_state
         self.probability = max(0.0, min(1.0, probability))  # Garantir intervalo 0-1
-        self.action = Action()
+        self.is_choice = is_choice
+        self.action = action if action is not None else Action()
 
     def set_probability(self, probability: float) -> None:
         """Define a probabilidade da transição."""
+        old_probability = self.probability
         self.probability = max(0.0, min(1.0, probability))
+        if self._events is not None and self.probability != old_probability:
+            self._events.emit(PROBABILITY_CHANGED, transition=self, old_probability=old_probability)
 
     def get_action(self) -> Action:
         """Retorna a ação associada a esta transição."""
@@ -130,5 +434,12 @@ class Transition:
         self.action.execute(self.to_state)
         return self.to_state
 
+    def __getstate__(self) -> dict:
+        """Serializa a transição sem o barramento de eventos da árvore."""
+        data = self.__dict__.copy()
+        data.pop("_events", None)
+        return data
+
     def __repr__(self) -> str:
-        return f"Transition({self.from_state.name} -> {self.to_state.name}, probability={self.probability:.2f})"
+        kind = ", choice" if self.is_choice else ""
+        return f"Transition({self.from_state.name} -> {self.to_state.name}, probability={self.probability:.2f}{kind})"
@@ -0,0 +1,182 @@
+"""
+Tabela de efetividade de tipos (18 × 18) com consultas em lote.
+
+A tabela é pré-calculada para todas as combinações de tipo do golpe × tipo(s) do
+defensor, então o multiplicador de um defensor de tipo único ou duplo é uma única
+indexação. Os valores da tabela dupla são guardados em quartos (0, 1, 2, 4, 8, 16 =
+0x, 0.25x, 0.5x, 1x, 2x, 4x) em um array de bytes.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from pokemon import Pokemon
+from pokemon_data import TYPES, TYPE_ID, NO_TYPE, SPECIES_ID, get_species_table
+
+
+# Exceções à efetividade neutra: tipo do golpe -> {tipo do defensor: multiplicador}
+_CHART: Dict[str, Dict[str, float]] = {
+    "Normal": {"Rock": 0.5, "Ghost": 0, "Steel": 0.5},
+    "Fire": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 2, "Bug": 2, "Rock": 0.5, "Dragon": 0.5,
+             "Steel": 2},
+    "Water": {"Fire": 2, "Water": 0.5, "Grass": 0.5, "Ground": 2, "Rock": 2, "Dragon": 0.5},
+    "Electric": {"Water": 2, "Electric": 0.5, "Grass": 0.5, "Ground": 0, "Flying": 2, "Dragon": 0.5},
+    "Grass": {"Fire": 0.5, "Water": 2, "Grass": 0.5, "Poison": 0.5, "Ground": 2, "Flying": 0.5,
+              "Bug": 0.5, "Rock": 2, "Dragon": 0.5, "Steel": 0.5},
+    "Ice": {"Fire": 0.5, "Water": 0.5, "Grass": 2, "Ice": 0.5, "Ground": 2, "Flying": 2, "Dragon": 2,
+            "Steel": 0.5},
+    "Fighting": {"Normal": 2, "Ice": 2, "Poison": 0.5, "Flying": 0.5, "Psychic": 0.5, "Bug": 0.5,
+                 "Rock": 2, "Ghost": 0, "Dark": 2, "Steel": 2, "Fairy": 0.5},
+    "Poison": {"Grass": 2, "Poison": 0.5, "Ground": 0.5, "Rock": 0.5, "Ghost": 0.5, "Steel": 0,
+               "Fairy": 2},
+    "Ground": {"Fire": 2, "Electric": 2, "Grass": 0.5, "Poison": 2, "Flying": 0, "Bug": 0.5, "Rock": 2,
+               "Steel": 2},
+    "Flying": {"Electric": 0.5, "Grass": 2, "Fighting": 2, "Bug": 2, "Rock": 0.5, "Steel": 0.5},
+    "Psychic": {"Fighting": 2, "Poison": 2, "Psychic": 0.5, "Dark": 0, "Steel": 0.5},
+    "Bug": {"Fire": 0.5, "Grass": 2, "Fighting": 0.5, "Poison": 0.5, "Flying": 0.5, "Psychic": 2,
+            "Ghost": 0.5, "Dark": 2, "Steel": 0.5, "Fairy": 0.5},
+    "Rock": {"Fire": 2, "Ice": 2, "Fighting": 0.5, "Ground": 0.5, "Flying": 2, "Bug": 2, "Steel": 0.5},
+    "Ghost": {"Normal": 0, "Psychic": 2, "Ghost": 2, "Dark": 0.5},
+    "Dragon": {"Dragon": 2, "Steel": 0.5, "Fairy": 0},
+    "Dark": {"Fighting": 0.5, "Psychic": 2, "Ghost": 2, "Dark": 0.5, "Fairy": 0.5},
+    "Steel": {"Fire": 0.5, "Water": 0.5, "Electric": 0.5, "Ice": 2, "Rock": 2, "Steel": 0.5, "Fairy": 2},
+    "Fairy": {"Fire": 0.5, "Fighting": 2, "Poison": 0.5, "Dragon": 2, "Dark": 2, "Steel": 0.5},
+}
+
+_TYPE_COUNT = len(TYPES)
+# Segundo tipo do defensor: um código de TYPES ou _TYPE_COUNT (tipo único)
+_SECOND_TYPES = _TYPE_COUNT + 1
+# Defensores por tipo de golpe na tabela dupla
+_STRIDE = _TYPE_COUNT * _SECOND_TYPES
+
+
+def _build_tables() -> Tuple[array, array]:
+    """Monta as tabelas simples (18 × 18, em metades) e dupla (18 × 18 × 19, em quartos)."""
+    single = array("B", [2] * (_TYPE_COUNT * _TYPE_COUNT))
+    for move_type, row in _CHART.items():
+        for defender_type, multiplier in row.items():
+            single[TYPE_ID[move_type] * _TYPE_COUNT + TYPE_ID[defender_type]] = int(multiplier * 2)
+
+    dual = array("B", bytes(_TYPE_COUNT * _STRIDE))
+    for move_type in range(_TYPE_COUNT):
+        base = move_type * _TYPE_COUNT
+        for first in range(_TYPE_COUNT):
+            for second in range(_SECOND_TYPES):
+                value = single[base + first] * (2 if second == _TYPE_COUNT else single[base + second])
+                dual[move_type * _STRIDE + first * _SECOND_TYPES + second] = value
+    return single, dual
+
+
+_SINGLE, _DUAL = _build_tables()
+
+
+def defender_code(types: Sequence[str]) -> int:
+    """
+    Codifica o(s) tipo(s) de um defensor como índice da tabela dupla.
+
+    Calcular o código uma vez por defensor evita repetir a conversão em consultas em lote.
+
+    Args:
+        types: 1 ou 2 nomes de tipos
+
+    Returns:
+        Código do defensor
+    """
+    first = TYPE_ID[types[0]]
+    if len(types) == 1 or types[1] == types[0]:
+        return first * _SECOND_TYPES + _TYPE_COUNT
+    return first * _SECOND_TYPES + TYPE_ID[types[1]]
+
+
+def _defender_code_from_ids(type_ids: Sequence[int]) -> int:
+    """Mesmo que defender_code, a partir de códigos de TYPES (como na tabela de espécies)."""
+    if len(type_ids) == 1 or type_ids[1] == NO_TYPE or type_ids[1] == type_ids[0]:
+        return type_ids[0] * _SECOND_TYPES + _TYPE_COUNT
+    return type_ids[0] * _SECOND_TYPES + type_ids[1]
+
+
+def effectiveness(move_type: str, defender_types: Sequence[str]) -> float:
+    """
+    Retorna o multiplicador de efetividade de um golpe contra um defensor.
+
+    Args:
+        move_type: Tipo do golpe
+        defender_types: 1 ou 2 tipos do defensor
+
+    Returns:
+        Multiplicador (0, 0.25, 0.5, 1, 2 ou 4)
+    """
+    return _DUAL[TYPE_ID[move_type] * _STRIDE + defender_code(defender_types)] / 4
+
+
+def effectiveness_many(move_types: Sequence[str], defenders: Sequence[Sequence[str]]) -> List[float]:
+    """
+    Calcula a efetividade de vários pares (tipo do golpe, tipos do defensor) de uma vez.
+
+    Args:
+        move_types: Tipo do golpe de cada par
+        defenders: Tipos do defensor de cada par
+
+    Returns:
+        Multiplicador de cada par
+    """
+    dual = _DUAL
+    return [dual[TYPE_ID[move_type] * _STRIDE + defender_code(types)] / 4
+            for move_type, types in zip(move_types, defenders)]
+
+
+def effectiveness_table(move_types: Sequence[str], defenders: Sequence[Sequence[str]]) -> List[List[float]]:
+    """
+    Calcula a efetividade de cada tipo de golpe contra cada defensor.
+
+    Returns:
+        Matriz [tipo do golpe][defensor] de multiplicadores
+    """
+    codes = [defender_code(types) for types in defenders]
+    dual = _DUAL
+    table = []
+    for move_type in move_types:
+        base = TYPE_ID[move_type] * _STRIDE
+        table.append([dual[base + code] / 4 for code in codes])
+    return table
+
+
+def pokemon_type_ids(pokemon: Pokemon) -> Optional[Tuple[int, ...]]:
+    """Retorna os códigos dos tipos de um Pokémon pela tabela de espécies (None se não há dados)."""
+    species_id = SPECIES_ID.get(pokemon.name.lower())
+    table = get_species_table()
+    if species_id is None or not table.has_data(species_id):
+        return None
+    return table.get_type_ids(species_id)
+
+
+def threat_matrix(attackers: Iterable[Pokemon], defenders: Iterable[Pokemon]) -> List[List[float]]:
+    """
+    Calcula, para cada par atacante × defensor, a melhor efetividade dos golpes STAB do atacante.
+
+    Os tipos vêm da tabela de espécies (pokemon_data.get_species_table). Pares em que
+    algum dos dois não tem dados recebem 1.0. Útil para cruzar uma Box inteira com os
+    Pokémon de um treinador ou de toda a EnemyLibrary.
+
+    Args:
+        attackers: Pokémon atacantes (ex: box.pokemons.values())
+        defenders: Pokémon defensores (ex: trainer.pokemons)
+
+    Returns:
+        Matriz [atacante][defensor] de multiplicadores
+    """
+    codes = []
+    for defender in defenders:
+        type_ids = pokemon_type_ids(defender)
+        codes.append(None if type_ids is None else _defender_code_from_ids(type_ids))
+
+    dual = _DUAL
+    matrix = []
+    for attacker in attackers:
+        type_ids = pokemon_type_ids(attacker)
+        if type_ids is None:
+            matrix.append([1.0] * len(codes))
+            continue
+        bases = [type_id * _STRIDE for type_id in type_ids]
+        matrix.append([1.0 if code is None else max(dual[base + code] for base in bases) / 4
+                       for code in codes])
+    return matrix
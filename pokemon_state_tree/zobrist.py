@@ -0,0 +1,110 @@
+"""
+Hash incremental (estilo Zobrist) de estados de batalha.
+
+Cada característica de um estado (slot × espécie, slot × faixa de vida, slot × status,
+slot × estágio de stat, clima...) recebe uma chave aleatória de 64 bits. O hash de um
+estado é o XOR das chaves de todas as suas características, então uma mudança em uma
+única característica é aplicada com dois XORs (remove a chave antiga, adiciona a nova).
+
+As chaves são derivadas de forma determinística da própria característica, portanto
+são as mesmas em todos os processos e execuções.
+"""
+
+import hashlib
+from typing import Dict, Optional, Tuple
+from pokemon import Pokemon, MajorStatus, MinorStatus
+
+
+_keys: Dict[Tuple, int] = {}
+
+
+def feature_key(*feature) -> int:
+    """
+    Retorna a chave de 64 bits de uma característica.
+
+    Args:
+        feature: Partes que identificam a característica (ex: "hp_min", "Self", 50)
+    """
+    key = _keys.get(feature)
+    if key is None:
+        digest = hashlib.blake2b(repr(feature).encode("utf-8"), digest_size=8).digest()
+        key = _keys[feature] = int.from_bytes(digest, "little")
+    return key
+
+
+class _SlotKeys:
+    """Tabelas pré-calculadas das chaves de um slot, para evitar buscas por tupla no laço interno."""
+
+    __slots__ = ("hp_min", "hp_max", "major", "minor", "stats")
+
+    def __init__(self, slot: str):
+        self.hp_min = [feature_key("hp_min", slot, hp) for hp in range(101)]
+        self.hp_max = [feature_key("hp_max", slot, hp) for hp in range(101)]
+        self.major = {status: feature_key("major", slot, status.name) for status in MajorStatus}
+        self.minor = {status: feature_key("minor", slot, status.name) for status in MinorStatus}
+        # Estágio 0 não contribui para o hash
+        self.stats = {
+            stat: [0 if stage == 0 else feature_key("stat", slot, stat, stage)
+                   for stage in range(Pokemon.STAT_MIN, Pokemon.STAT_MAX + 1)]
+            for stat in Pokemon.STAT_NAMES
+        }
+
+
+_slot_keys: Dict[str, _SlotKeys] = {}
+
+
+def slot_keys(slot: str) -> _SlotKeys:
+    """Retorna as tabelas de chaves de um slot."""
+    keys = _slot_keys.get(slot)
+    if keys is None:
+        keys = _slot_keys[slot] = _SlotKeys(slot)
+    return keys
+
+
+def hp_keys(slot: str, hp_min: int, hp_max: int) -> int:
+    """Chave da faixa de vida de um slot."""
+    keys = slot_keys(slot)
+    return keys.hp_min[hp_min] ^ keys.hp_max[hp_max]
+
+
+def status_keys(slot: str, major_status: MajorStatus, minor_status: MinorStatus) -> int:
+    """Chave dos status principal e secundário de um slot."""
+    keys = slot_keys(slot)
+    return keys.major[major_status] ^ keys.minor[minor_status]
+
+
+def stat_key(slot: str, stat_name: str, stage: int) -> int:
+    """Chave de um estágio de stat de um slot (estágio 0 não contribui para o hash)."""
+    return slot_keys(slot).stats[stat_name][stage - Pokemon.STAT_MIN]
+
+
+_weather_keys: Dict = {}
+
+
+def weather_key(weather) -> int:
+    """Chave do clima."""
+    key = _weather_keys.get(weather)
+    if key is None:
+        key = _weather_keys[weather] = feature_key("weather", weather.name)
+    return key
+
+
+def battle_type_key(battle_type: str) -> int:
+    """Chave do tipo de batalha."""
+    return feature_key("battle_type", battle_type)
+
+
+def pokemon_hash(slot: str, pokemon: Optional[Pokemon]) -> int:
+    """Calcula do zero a contribuição de um Pokémon em um slot para o hash do estado."""
+    if pokemon is None:
+        return 0
+
+    h = (feature_key("species", slot, pokemon.name)
+         ^ feature_key("item", slot, pokemon.item)
+         ^ feature_key("mega", slot, pokemon.is_mega)
+         ^ hp_keys(slot, pokemon.hp_min_percent, pokemon.hp_max_percent)
+         ^ status_keys(slot, pokemon.major_status, pokemon.minor_status))
+    if pokemon._stages != Pokemon.NEUTRAL_STAGES:
+        for stat in Pokemon.STAT_NAMES:
+            h ^= stat_key(slot, stat, pokemon.get_stat(stat))
+    return h